@@ -4,10 +4,12 @@
 Actions to take on resources
 """
 import logging
+import uuid
 
 from c7n.element import Element
 from c7n.exceptions import PolicyValidationError, ClientError
 from c7n.registry import PluginRegistry
+from c7n.utils import parse_url_config
 
 
 class ActionRegistry(PluginRegistry):
@@ -76,6 +78,20 @@ class Action(Element):
 BaseAction = Action
 
 
+def offload_payload(client, location, policy_name, body, extension='json'):
+    """Stage a payload too large for its transport in s3, returning its s3 url.
+
+    The object is keyed by the location's path, the policy name and a
+    unique id.
+    """
+    location = parse_url_config(location)
+    key = '/'.join(filter(None, (
+        location['path'].strip('/'), policy_name,
+        '%s.%s' % (uuid.uuid4().hex, extension))))
+    client.put_object(Bucket=location['netloc'], Key=key, Body=body)
+    return 's3://%s/%s' % (location['netloc'], key)
+
+
 class EventAction(BaseAction):
     """Actions which receive lambda event if present
     """
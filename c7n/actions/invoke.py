@@ -6,7 +6,8 @@ try:
 except ImportError:
     from c7n.config import Bag as Config  # pragma: no cover
 
-from .core import EventAction
+from .core import EventAction, offload_payload
+from c7n.exceptions import ClientError
 from c7n import utils
 from c7n.manager import resources
 from c7n.version import version as VERSION
@@ -23,16 +24,26 @@ class LambdaInvoke(EventAction):
      - event / cloud trail event if any
      - version / version of custodian invoking the lambda
 
-    We automatically batch into sets of 250 for invocation,
-    We try to utilize async invocation by default, this imposes
-    some greater size limits of 128kb which means we batch
-    invoke.
+    We automatically batch into sets of up to 250 resources for
+    invocation, within lambda's payload size limits (256kb for
+    async invocation, which is used by default, and 6mb for sync).
+    Batches are invoked concurrently, up to the function's reserved
+    concurrency if it has any.
+
+    A resource too large for a payload by itself can be staged in s3
+    by specifying an ``offload`` url, the function is then invoked
+    with a payload referring to the s3 object with the full payload,
+    ie. ``{"payload": "s3://bucket/prefix/policy-name/id.json"}``.
 
     Example::
 
      - type: invoke-lambda
        function: my-function
 
+     - type: invoke-lambda
+       function: my-function
+       offload: s3://my-bucket/invoke
+
     Note if your synchronously invoking the lambda, you may also need
     to configure the timeout, to avoid multiple invokes. The default
     is 90s, if the lambda doesn't respond within that time the boto
@@ -54,19 +65,33 @@ class LambdaInvoke(EventAction):
             'batch_size': {'type': 'integer'},
             'timeout': {'type': 'integer'},
             'vars': {'type': 'object'},
+            'offload': {'type': 'string'},
         }
     }
 
     permissions = ('lambda:InvokeFunction',
+               'lambda:GetFunctionConcurrency',
                'iam:ListAccountAliases',)
 
+    max_async_payload = 256 * 1024
+    max_sync_payload = 6 * 1024 * 1024
+    max_workers = 8
+
+    def get_permissions(self):
+        perms = self.permissions
+        if self.data.get('offload'):
+            perms += ('s3:PutObject',)
+        return perms
+
     def process(self, resources, event=None):
         params = dict(FunctionName=self.data['function'])
         if self.data.get('qualifier'):
-            params['Qualifier'] = self.data['Qualifier']
+            params['Qualifier'] = self.data['qualifier']
 
+        limit = self.max_sync_payload
         if self.data.get('async', True):
             params['InvocationType'] = 'Event'
+            limit = self.max_async_payload
 
         config = Config(read_timeout=self.data.get(
             'timeout', 90), region_name=self.data.get('region', None))
@@ -84,16 +109,75 @@ class LambdaInvoke(EventAction):
             'action': self.data,
             'policy': self.manager.data}
 
-        results = []
-        for resource_set in utils.chunks(resources, self.data.get('batch_size', 250)):
-            payload['resources'] = resource_set
-            params['Payload'] = utils.dumps(payload)
-            result = client.invoke(**params)
-            result['Payload'] = result['Payload'].read()
-            if isinstance(result['Payload'], bytes):
-                result['Payload'] = result['Payload'].decode('utf-8')
-            results.append(result)
-        return results
+        bodies = []
+        for resource_set in self.get_resource_sets(payload, resources, limit):
+            body = utils.dumps(dict(payload, resources=resource_set))
+            if len(body.encode('utf8')) > limit:
+                body = self.offload(body)
+            if body is not None:
+                bodies.append(body)
+
+        if len(bodies) < 2:
+            return [self.invoke(client, params, body) for body in bodies]
+        with self.executor_factory(
+                max_workers=self.get_concurrency(client, params)) as w:
+            return list(w.map(lambda body: self.invoke(client, params, body), bodies))
+
+    def get_resource_sets(self, payload, resources, limit):
+        """Split resources into sets whose payloads fit within the size limit.
+
+        A resource too large for a payload by itself is yielded on its own.
+        """
+        batch_size = self.data.get('batch_size', 250)
+        base_size = len(utils.dumps(dict(payload, resources=[])).encode('utf8'))
+        resource_set, size = [], base_size
+        for r in resources:
+            # serialized size plus the list item separator
+            r_size = len(utils.dumps(r).encode('utf8')) + 2
+            if resource_set and (
+                    len(resource_set) == batch_size or size + r_size > limit):
+                yield resource_set
+                resource_set, size = [], base_size
+            resource_set.append(r)
+            size += r_size
+        if resource_set:
+            yield resource_set
+
+    def get_concurrency(self, client, params):
+        """Number of concurrent invocations, bounded by the function's reserved concurrency."""
+        try:
+            reserved = client.get_function_concurrency(
+                FunctionName=params['FunctionName']).get('ReservedConcurrentExecutions')
+        except ClientError as e:
+            self.log.debug(
+                "unable to get reserved concurrency for %s: %s" % (params['FunctionName'], e))
+            reserved = None
+        if reserved is None:
+            return self.max_workers
+        return max(1, min(self.max_workers, reserved))
+
+    def invoke(self, client, params, body):
+        result = client.invoke(Payload=body, **params)
+        if params.get('InvocationType') == 'Event':
+            # async invocations don't have a response payload
+            result.pop('Payload', None)
+            return result
+        result['Payload'] = result['Payload'].read()
+        if isinstance(result['Payload'], bytes):
+            result['Payload'] = result['Payload'].decode('utf-8')
+        return result
+
+    def offload(self, body):
+        """Stage an oversized payload in s3, returning a payload referencing it."""
+        location = self.data.get('offload')
+        if not location:
+            self.log.error(
+                "policy:%s invoke-lambda resource exceeds the function's payload size,"
+                " specify an offload location to send it" % (self.manager.data['name']))
+            return None
+        client = utils.local_session(self.manager.session_factory).client('s3')
+        return utils.dumps({'payload': offload_payload(
+            client, location, self.manager.data['name'], body.encode('utf8'))})
 
     @classmethod
     def register_resources(klass, registry, resource_class):
@@ -4,11 +4,13 @@
 
 import base64
 import copy
+import time
 import zlib
+from concurrent.futures import as_completed
 
-from .core import EventAction
+from .core import EventAction, offload_payload
 from c7n import utils
-from c7n.exceptions import PolicyValidationError
+from c7n.exceptions import PolicyExecutionError, PolicyValidationError
 from c7n.manager import resources as aws_resources
 from c7n.resolver import ValuesFrom
 from c7n.version import version
@@ -102,10 +104,42 @@ class Notify(BaseNotify):
                        attributes:
                           attribute_key: attribute_value
                           attribute_key_2: attribute_value_2
+
+    Resources are packed into as few messages as the transport's size
+    limit allows. To shrink messages, ``resource_fields`` limits the
+    resource fields sent to the given top level keys (the resource id is
+    always included). A resource too large for a message by itself can be
+    offloaded to s3 by specifying an ``offload`` url on the transport, the
+    message then refers to the s3 object with the full message.
+
+    .. code-block:: yaml
+
+              policies:
+                - name: iam-role-notify
+                  resource: iam-role
+                  actions:
+                   - type: notify
+                     to:
+                      - email@address
+                     template: policy-template
+                     resource_fields:
+                      - RoleName
+                      - Arn
+                      - Tags
+                     transport:
+                       type: sqs
+                       queue: xyz
+                       offload: s3://my-bucket/notify
     """
 
     C7N_DATA_MESSAGE = "maidmsg/1.0"
 
+    # sqs and sns limit the size of a message including its attributes, as
+    # well as the total size of a batch of messages.
+    max_message_size = 256 * 1024
+    max_batch_messages = 10
+    max_workers = 4
+
     schema_alias = True
     schema = {
         'type': 'object',
@@ -123,17 +157,20 @@ class Notify(BaseNotify):
             'from': {'type': 'string'},
             'subject': {'type': 'string'},
             'template': {'type': 'string'},
+            'resource_fields': {'type': 'array', 'items': {'type': 'string'}},
             'transport': {
                 'oneOf': [
                     {'type': 'object',
                      'required': ['type', 'queue'],
                      'properties': {
                          'queue': {'type': 'string'},
+                         'offload': {'type': 'string'},
                          'type': {'enum': ['sqs']}}},
                     {'type': 'object',
                      'required': ['type', 'topic'],
                      'properties': {
                          'topic': {'type': 'string'},
+                         'offload': {'type': 'string'},
                          'type': {'enum': ['sns']},
                          'attributes': {'type': 'object'},
                      }}]
@@ -155,11 +192,14 @@ class Notify(BaseNotify):
         return self
 
     def get_permissions(self):
+        perms = ()
         if self.data.get('transport', {}).get('type') == 'sns':
-            return ('sns:Publish',)
+            perms = ('sns:Publish',)
         if self.data.get('transport', {'type': 'sqs'}).get('type') == 'sqs':
-            return ('sqs:SendMessage',)
-        return ()
+            perms = ('sqs:SendMessage',)
+        if perms and self.data.get('transport', {}).get('offload'):
+            perms += ('s3:PutObject',)
+        return perms
 
     def process(self, resources, event=None):
         alias = utils.get_account_alias_from_sts(
@@ -177,12 +217,62 @@ class Notify(BaseNotify):
             'policy': self.manager.data}
         message['action'] = self.expand_variables(message)
 
-        for batch in utils.chunks(resources, self.batch_size):
-            message['resources'] = self.prepare_resources(batch)
-            receipt = self.send_data_message(message)
+        limit = self.max_message_size - self.get_attributes_size()
+        bodies = list(self.pack_resources(
+            message, self.project_resources(self.prepare_resources(resources)), limit))
+        for receipt, count in self.send_data_messages(message, bodies):
             self.log.info("sent message:%s policy:%s template:%s count:%s" % (
                 receipt, self.manager.data['name'],
-                self.data.get('template', 'default'), len(batch)))
+                self.data.get('template', 'default'), count))
+
+    def pack_resources(self, message, resources, limit):
+        """Pack resources into messages filled up to the size limit.
+
+        Yields tuples of the packed message body and the number of
+        resources in it, a resource too large for a message by itself is
+        offloaded to s3 if the transport specifies an offload location.
+        """
+        while resources:
+            count = min(len(resources), self.batch_size)
+            body = self.pack(dict(message, resources=resources[:count]))
+            if len(body) > limit:
+                # bisect for the most resources fitting in a message.
+                fits, over, body = 0, count, None
+                while over - fits > 1:
+                    mid = (fits + over) // 2
+                    candidate = self.pack(dict(message, resources=resources[:mid]))
+                    if len(candidate) > limit:
+                        over = mid
+                    else:
+                        fits, body = mid, candidate
+                count = max(fits, 1)
+                if body is None:
+                    body = self.offload(dict(message, resources=resources[:1]))
+            if body is not None:
+                yield body, count
+            resources = resources[count:]
+
+    def project_resources(self, resources):
+        fields = self.data.get('resource_fields')
+        if not fields:
+            return resources
+        fields = set(fields)
+        fields.add(self.manager.resource_type.id)
+        return [{k: v for k, v in r.items() if k in fields} for r in resources]
+
+    def offload(self, message):
+        """Store an oversized message in s3, returning a message body referencing it."""
+        location = self.data['transport'].get('offload')
+        if not location:
+            self.log.error(
+                "policy:%s notify resource exceeds the %s transport's message size,"
+                " specify an offload location to send it" % (
+                    self.manager.data['name'], self.data['transport']['type']))
+            return None
+        client = self.manager.session_factory(assume=self.assume_role).client('s3')
+        return self.pack({'payload': offload_payload(
+            client, location.format(**message), self.manager.data['name'],
+            zlib.compress(utils.dumps(message).encode('utf8')), 'json.zlib')})
 
     def prepare_resources(self, resources):
         """Resources preparation for transport.
@@ -220,44 +310,124 @@ class Notify(BaseNotify):
                 r.pop('c7n:user-data')
         return resources
 
-    def send_data_message(self, message):
+    def send_data_message(self, message, body=None):
         if self.data['transport']['type'] == 'sqs':
-            return self.send_sqs(message)
+            return self.send_sqs(message, body)
         elif self.data['transport']['type'] == 'sns':
-            return self.send_sns(message)
+            return self.send_sns(message, body)
 
-    def send_sns(self, message):
-        topic = self.data['transport']['topic'].format(**message)
-        user_attributes = self.data['transport'].get('attributes')
-        if topic.startswith('arn:'):
-            region = region = topic.split(':', 5)[3]
-            topic_arn = topic
-        else:
-            region = message['region']
-            topic_arn = utils.generate_arn(
-                service='sns', resource=topic,
-                account_id=message['account_id'],
-                region=message['region'])
-        client = self.manager.session_factory(
-            region=region, assume=self.assume_role).client('sns')
+    def send_data_messages(self, message, bodies):
+        """Send packed message bodies, yielding each message's id and resource count.
+
+        Messages are sent concurrently in batches, of up to ten messages
+        within the transport's size limit.
+        """
+        if len(bodies) == 1:
+            body, count = bodies[0]
+            yield self.send_data_message(message, body), count
+            return
+
+        with self.executor_factory(max_workers=self.max_workers) as w:
+            futures = {}
+            for batch in self.batch_messages(bodies):
+                futures[w.submit(self.send_batch, message, batch)] = batch
+            for f in as_completed(futures):
+                yield from f.result()
+
+    def batch_messages(self, bodies):
+        attrs_size = self.get_attributes_size()
+        batch, size = [], 0
+        for body, count in bodies:
+            if batch and (len(batch) == self.max_batch_messages or
+                          size + len(body) + attrs_size > self.max_message_size):
+                yield batch
+                batch, size = [], 0
+            batch.append((body, count))
+            size += len(body) + attrs_size
+        if batch:
+            yield batch
+
+    def send_batch(self, message, batch):
+        """Send a batch of message bodies, returning each message's id and resource count.
+
+        Entries failing due to the service are retried with backoff, an
+        error is raised for entries that still couldn't be sent.
+        """
+        entries = {str(idx): (body, count) for idx, (body, count) in enumerate(batch)}
+        attrs = self.get_message_attributes()
+        sent, errors = [], []
+        delays = utils.backoff_delays(1, 8, jitter=True)
+        while entries:
+            result = self.send_entries(message, entries, attrs)
+            sent.extend(
+                (r['MessageId'], entries[r['Id']][1]) for r in result.get('Successful', ()))
+            failed = result.get('Failed', ())
+            errors.extend(f for f in failed if f.get('SenderFault'))
+            retry = [f for f in failed if not f.get('SenderFault')]
+            delay = next(delays, None) if retry else None
+            if delay is None:
+                errors.extend(retry)
+                break
+            time.sleep(delay)
+            entries = {f['Id']: entries[f['Id']] for f in retry}
+        if errors:
+            raise PolicyExecutionError(
+                "policy:%s notify failed to send %d messages: %s" % (
+                    self.manager.data['name'], len(errors), ", ".join(
+                        "%s:%s" % (f['Code'], f.get('Message', '')) for f in errors)))
+        return sent
+
+    def send_entries(self, message, entries, attrs):
+        if self.data['transport']['type'] == 'sqs':
+            region, queue_url = self.get_sqs_queue(message)
+            return self.get_client(region, 'sqs').send_message_batch(
+                QueueUrl=queue_url,
+                Entries=[{'Id': idx, 'MessageBody': body, 'MessageAttributes': attrs}
+                         for idx, (body, count) in entries.items()])
+        region, topic_arn = self.get_sns_topic(message)
+        return self.get_client(region, 'sns').publish_batch(
+            TopicArn=topic_arn,
+            PublishBatchRequestEntries=[
+                {'Id': idx, 'Message': body, 'MessageAttributes': attrs}
+                for idx, (body, count) in entries.items()])
+
+    def get_client(self, region, service):
+        return self.manager.session_factory(
+            region=region, assume=self.assume_role).client(service)
+
+    def get_message_attributes(self):
         attrs = {
             'mtype': {
                 'DataType': 'String',
                 'StringValue': self.C7N_DATA_MESSAGE,
             },
         }
-        if user_attributes:
+        user_attributes = self.data['transport'].get('attributes')
+        if self.data['transport']['type'] == 'sns' and user_attributes:
             for k, v in user_attributes.items():
                 if k != 'mtype':
                     attrs[k] = {'DataType': 'String', 'StringValue': v}
-        result = client.publish(
-            TopicArn=topic_arn,
-            Message=self.pack(message),
-            MessageAttributes=attrs
-        )
-        return result['MessageId']
+        return attrs
+
+    def get_attributes_size(self):
+        return sum(
+            len(k) + len(v['DataType']) + len(v['StringValue'].encode('utf8'))
+            for k, v in self.get_message_attributes().items())
 
-    def send_sqs(self, message):
+    def get_sns_topic(self, message):
+        topic = self.data['transport']['topic'].format(**message)
+        if topic.startswith('arn:'):
+            region = topic.split(':', 5)[3]
+            topic_arn = topic
+        else:
+            region = message['region']
+            topic_arn = utils.generate_arn(
+                service='sns', resource=topic,
+                account_id=message['account_id'],
+                region=message['region'])
+        return region, topic_arn
+
+    def get_sqs_queue(self, message):
         queue = self.data['transport']['queue'].format(**message)
         if queue.startswith('https://queue.amazonaws.com'):
             region = 'us-east-1'
@@ -281,18 +451,23 @@ class Notify(BaseNotify):
             queue_name = queue
             queue_url = "https://sqs.%s.amazonaws.com/%s/%s" % (
                 region, owner_id, queue_name)
-        client = self.manager.session_factory(
-            region=region, assume=self.assume_role).client('sqs')
-        attrs = {
-            'mtype': {
-                'DataType': 'String',
-                'StringValue': self.C7N_DATA_MESSAGE,
-            },
-        }
-        result = client.send_message(
+        return region, queue_url
+
+    def send_sns(self, message, body=None):
+        region, topic_arn = self.get_sns_topic(message)
+        result = self.get_client(region, 'sns').publish(
+            TopicArn=topic_arn,
+            Message=body or self.pack(message),
+            MessageAttributes=self.get_message_attributes()
+        )
+        return result['MessageId']
+
+    def send_sqs(self, message, body=None):
+        region, queue_url = self.get_sqs_queue(message)
+        result = self.get_client(region, 'sqs').send_message(
             QueueUrl=queue_url,
-            MessageBody=self.pack(message),
-            MessageAttributes=attrs)
+            MessageBody=body or self.pack(message),
+            MessageAttributes=self.get_message_attributes())
         return result['MessageId']
 
     @classmethod
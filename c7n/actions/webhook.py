@@ -6,10 +6,14 @@ try:
 except ImportError:
     certifi = None
 
+import time
+from collections import Counter
+
 import jmespath
 
 import urllib3
 from urllib import parse
+from urllib3.util.retry import Retry
 
 from c7n import utils
 from .core import EventAction
@@ -32,8 +36,23 @@ class Webhook(EventAction):
                  query-params:
                     resource_name: resource.name
                     policy_name: policy.name
+
+    Calls are made concurrently, by default with up to 8 calls in flight,
+    which can be set via ``concurrency``. Calls responded to with 429
+    or 5xx statuses, or failing to connect, are retried up to ``retries``
+    times (default 3) with exponential backoff by a factor of
+    ``retry-delay`` seconds (default 1), respecting any ``Retry-After``
+    header. Calls failing while reading the response are only retried
+    for idempotent methods (PUT, GET and DELETE), as the endpoint may
+    already have processed them.
+
+    The status and latency of each call are recorded in the policy's
+    output as ``action-webhook``.
     """
 
+    retry_statuses = frozenset([429] + list(range(500, 600)))
+    idempotent_methods = frozenset(['PUT', 'GET', 'DELETE'])
+
     schema_alias = True
     schema = utils.type_schema(
         'webhook',
@@ -43,6 +62,9 @@ class Webhook(EventAction):
             'body': {'type': 'string'},
             'batch': {'type': 'boolean'},
             'batch-size': {'type': 'number'},
+            'concurrency': {'type': 'integer', 'minimum': 1},
+            'retries': {'type': 'integer', 'minimum': 0},
+            'retry-delay': {'type': 'number', 'minimum': 0},
             'method': {'type': 'string', 'enum': ['PUT', 'POST', 'GET', 'PATCH', 'DELETE']},
             'query-params': {
                 "type": "object",
@@ -71,6 +93,7 @@ class Webhook(EventAction):
         self.query_params = self.data.get('query-params', {})
         self.headers = self.data.get('headers', {})
         self.method = self.data.get('method', 'POST')
+        self.concurrency = self.data.get('concurrency', 8)
         self.lookup_data = None
 
     def process(self, resources, event=None):
@@ -86,15 +109,22 @@ class Webhook(EventAction):
         self.http = self._build_http_manager()
 
         if self.batch:
-            for chunk in utils.chunks(resources, self.batch_size):
-                resource_data = self.lookup_data
-                resource_data['resources'] = chunk
-                self._process_call(resource_data)
+            payloads = [dict(self.lookup_data, resources=chunk)
+                        for chunk in utils.chunks(resources, self.batch_size)]
         else:
-            for r in resources:
-                resource_data = self.lookup_data
-                resource_data['resource'] = r
-                self._process_call(resource_data)
+            payloads = [dict(self.lookup_data, resource=r) for r in resources]
+
+        with self.executor_factory(max_workers=self.concurrency) as w:
+            calls = list(w.map(self._process_call, payloads))
+
+        if calls:
+            latencies = sorted(c['latency'] for c in calls)
+            self.log.info(
+                "policy:%s webhook calls:%d statuses:%s latency p50:%0.2f max:%0.2f" % (
+                    self.manager.data['name'], len(calls),
+                    dict(Counter(c['status'] for c in calls)),
+                    latencies[len(latencies) // 2], latencies[-1]))
+        return calls
 
     def _process_call(self, resource):
         prepared_url = self._build_url(resource)
@@ -104,22 +134,35 @@ class Webhook(EventAction):
         if prepared_body:
             prepared_headers['Content-Type'] = 'application/json'
 
+        call = {'url': prepared_url, 'status': None, 'retries': 0}
+        t = time.time()
         try:
             res = self.http.request(
                 method=self.method,
                 url=prepared_url,
                 body=prepared_body,
                 headers=prepared_headers)
+            call['status'] = res.status
+            if res.retries is not None:
+                call['retries'] = len(res.retries.history)
 
             self.log.info("%s got response %s with URL %s" %
                           (self.method, res.status, prepared_url))
         except urllib3.exceptions.HTTPError as e:
-            self.log.error("Error calling %s. Code: %s" % (prepared_url, e.reason))
+            call['error'] = str(getattr(e, 'reason', None) or e)
+            self.log.error("Error calling %s. Code: %s" % (
+                prepared_url, getattr(e, 'reason', e)))
+        call['latency'] = time.time() - t
+        return call
 
     def _build_http_manager(self):
         pool_kwargs = {
             'cert_reqs': 'CERT_REQUIRED',
-            'ca_certs': certifi and certifi.where() or None
+            'ca_certs': certifi and certifi.where() or None,
+            # keep a connection alive per concurrent call
+            'maxsize': self.concurrency,
+            'block': True,
+            'retries': self._build_retry(),
         }
 
         proxy_url = utils.get_proxy_url(self.url)
@@ -128,6 +171,19 @@ class Webhook(EventAction):
         else:
             return urllib3.PoolManager(**pool_kwargs)
 
+    def _build_retry(self):
+        return Retry(
+            total=self.data.get('retries', 3),
+            # a failed read may follow the endpoint processing the call.
+            read=None if self.method in self.idempotent_methods else 0,
+            backoff_factor=self.data.get('retry-delay', 1),
+            status_forcelist=self.retry_statuses,
+            # retry any method on status, the endpoint signaled the call
+            # wasn't processed.
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False)
+
     def _build_headers(self, resource):
         return {k: jmespath.search(v, resource) for k, v in self.headers.items()}
 
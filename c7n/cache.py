@@ -5,14 +5,20 @@ multiple policies on the same resource type.
 """
 import pickle  # nosec nosemgrep
 
+import contextlib
 import os
 import logging
+import sqlite3
+import threading
 import time
 
 log = logging.getLogger('custodian.cache')
 
 CACHE_NOTIFY = False
 
+# The active in-run resource snapshot store, if any.
+SNAPSHOTS = None
+
 
 def factory(config):
 
@@ -31,6 +37,11 @@ def factory(config):
             log.debug("Using in-memory cache")
             CACHE_NOTIFY = True
         return InMemoryCache()
+    elif config.cache.startswith(SqlKvCache.scheme):
+        if not CACHE_NOTIFY:
+            log.debug("Using sqlite cache")
+            CACHE_NOTIFY = True
+        return SqlKvCache(config)
 
     return FileCacheManager(config)
 
@@ -123,3 +134,227 @@ class FileCacheManager:
 
     def size(self):
         return os.path.exists(self.cache_path) and os.path.getsize(self.cache_path) or 0
+
+
+class SqlKvCache:
+    """Sqlite backed cache storing one row per cache key.
+
+    Selected with a ``sqlite://`` prefix on the cache path, ie.
+    ``--cache sqlite://~/.cache/cloud-custodian.db``.
+
+    Unlike the file cache, saving a key only writes that key's entry,
+    and lookups only deserialize the requested key. Entries expire
+    individually after the cache period, and if a max size (in
+    megabytes) is configured the least recently used entries are
+    evicted once the cache grows past it. Sqlite's file locking
+    makes it safe to share across c7n-org worker processes.
+    """
+
+    scheme = 'sqlite://'
+
+    create_table = """
+    create table if not exists c7n_cache (
+       key blob primary key,
+       value blob,
+       size integer,
+       create_date real,
+       access_date real
+    )
+    """
+
+    # seconds to wait on a lock held by another process
+    lock_timeout = 60
+
+    def __init__(self, config):
+        self.config = config
+        self.cache_period = config.cache_period
+        self.cache_max_size = getattr(config, 'cache_max_size', 0) or 0
+        self.cache_path = os.path.abspath(
+            os.path.expanduser(
+                os.path.expandvars(
+                    config.cache[len(self.scheme):])))
+        self.conn = None
+        self.conn_pid = None
+
+    def __getstate__(self):
+        # connections aren't serializable or safe to share across processes
+        state = dict(self.__dict__)
+        state['conn'] = state['conn_pid'] = None
+        return state
+
+    def connect(self):
+        if self.conn is not None and self.conn_pid == os.getpid():
+            return self.conn
+        directory = os.path.dirname(self.cache_path)
+        if not os.path.exists(directory):
+            log.info('Generating Cache directory: %s.' % directory)
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(
+            self.cache_path, timeout=self.lock_timeout,
+            check_same_thread=False, isolation_level=None)
+        self.conn_pid = os.getpid()
+        self.conn.execute('pragma journal_mode=wal')
+        self.conn.execute(self.create_table)
+        self.expire()
+        return self.conn
+
+    def expire(self):
+        with self.conn:
+            self.conn.execute(
+                'delete from c7n_cache where create_date < ?',
+                (self.get_expiration(),))
+
+    def get_expiration(self):
+        return time.time() - self.cache_period * 60
+
+    def load(self):
+        try:
+            self.connect()
+        except sqlite3.Error as e:
+            log.warning("Could not open cache %s err: %s" % (self.cache_path, e))
+            return False
+        log.debug("Using cache file %s" % self.cache_path)
+        return True
+
+    def get(self, key):
+        k = sqlite3.Binary(pickle.dumps(key))  # nosemgrep
+        conn = self.connect()
+        row = conn.execute(
+            'select value from c7n_cache where key = ? and create_date >= ?',
+            (k, self.get_expiration())).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute(
+                'update c7n_cache set access_date = ? where key = ?',
+                (time.time(), k))
+        return pickle.loads(row[0])  # nosec nosemgrep
+
+    def save(self, key, data):
+        value = pickle.dumps(data, protocol=2)  # nosemgrep
+        now = time.time()
+        try:
+            conn = self.connect()
+            with conn:
+                conn.execute(
+                    'replace into c7n_cache '
+                    '(key, value, size, create_date, access_date) '
+                    'values (?, ?, ?, ?, ?)',
+                    (sqlite3.Binary(pickle.dumps(key)),  # nosemgrep
+                     sqlite3.Binary(value), len(value), now, now))
+            self.evict()
+        except sqlite3.Error as e:
+            log.warning("Could not save cache %s err: %s" % (
+                self.cache_path, e))
+
+    def evict(self):
+        """Remove least recently used entries beyond the max cache size."""
+        if not self.cache_max_size:
+            return
+        max_bytes = self.cache_max_size * 1024 * 1024
+        conn = self.connect()
+        with conn:
+            conn.execute(
+                'delete from c7n_cache where key in ('
+                '  select key from ('
+                '    select key, sum(size) over ('
+                '      order by access_date desc, create_date desc'
+                '      rows unbounded preceding) as total'
+                '    from c7n_cache)'
+                '  where total > ?)',
+                (max_bytes,))
+
+    def size(self):
+        if not os.path.exists(self.cache_path):
+            return 0
+        row = self.connect().execute(
+            'select coalesce(sum(size), 0) from c7n_cache').fetchone()
+        return row[0]
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = self.conn_pid = None
+
+
+class ResourceSnapshots:
+    """In-run store of fetched and augmented resources.
+
+    Shares a single fetch of each (account, region, resource type,
+    query) across all the policies in a run. Each caller gets a
+    view of the snapshot with its own copy of every resource's top
+    level, so annotations added by one policy don't leak into
+    another, while nested values are shared and must be treated as
+    read only.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.derived = {}
+
+    def key_lock(self, key):
+        with self.lock:
+            return self.locks.setdefault(pickle.dumps(key), threading.Lock())  # nosemgrep
+
+    def get(self, key, execution_id=None):
+        resources = self.data.get(pickle.dumps(key))  # nosemgrep
+        if resources is None:
+            return None
+        with self.lock:
+            stats = self.get_stats(execution_id, create=True)
+            stats['hits'] += 1
+            stats['resources-reused'] += len(resources)
+        return self.view(resources)
+
+    def save(self, key, resources, execution_id=None):
+        self.data[pickle.dumps(key)] = resources  # nosemgrep
+        with self.lock:
+            self.get_stats(execution_id, create=True)['fetches'] += 1
+        return self.view(resources)
+
+    def view(self, resources):
+        return [dict(r) for r in resources]
+
+    def memo(self, key, func):
+        """Return a value derived from snapshot resources, computed once per run.
+
+        Derived values are shared as is and must be treated as read only.
+        """
+        pkey = pickle.dumps(key)  # nosemgrep
+        with self.key_lock(key):
+            if pkey not in self.derived:
+                self.derived[pkey] = func()
+            return self.derived[pkey]
+
+    def get_stats(self, execution_id, create=False):
+        stats = self.stats.get(execution_id)
+        if stats is None:
+            stats = {'fetches': 0, 'hits': 0, 'resources-reused': 0}
+            if create:
+                self.stats[execution_id] = stats
+        return stats
+
+
+def get_snapshots():
+    return SNAPSHOTS
+
+
+@contextlib.contextmanager
+def resource_snapshots(config=None):
+    """Share resource fetches across policies for the duration of the block.
+
+    Snapshots are skipped when caching is disabled via config.
+    """
+    global SNAPSHOTS
+    if SNAPSHOTS is not None or (
+            config is not None and not (config.cache and config.cache_period)):
+        yield SNAPSHOTS
+        return
+    SNAPSHOTS = ResourceSnapshots()
+    try:
+        yield SNAPSHOTS
+    finally:
+        SNAPSHOTS = None
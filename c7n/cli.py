@@ -21,7 +21,7 @@ except ImportError:
     def setproctitle(t):
         return None
 
-from c7n import deprecated
+from c7n import deprecated, ratelimit
 from c7n.config import Config
 
 DEFAULT_REGION = 'us-east-1'
@@ -92,10 +92,15 @@ def _default_options(p, exclude=[]):
     if 'cache' not in exclude:
         p.add_argument(
             "-f", "--cache", default="~/.cache/cloud-custodian.cache",
-            help="Cache file (default %(default)s)")
+            help="Cache file, prefix with sqlite:// for a per key sqlite cache "
+            "(default %(default)s)")
         p.add_argument(
             "--cache-period", default=15, type=int,
             help="Cache validity in minutes (default %(default)i)")
+        p.add_argument(
+            "--cache-max-size", default=0, type=int,
+            help="Max sqlite cache size in megabytes, least recently used "
+            "entries are evicted past it (default unbounded)")
     else:
         p.add_argument("--cache", default=None, help=argparse.SUPPRESS)
 
@@ -125,6 +130,10 @@ def _report_options(p):
     p.add_argument(
         '--all-findings', default=False, action="store_true",
         help="Outputs all findings per resource. Defaults to a single finding per resource. ")
+    p.add_argument(
+        '--record-cache', metavar='DIR',
+        help="Keep fetched s3 records in a local directory, subsequent reports "
+        "only fetch new records")
 
 
 def _metrics_options(p):
@@ -182,6 +191,14 @@ def _dryrun_option(p):
         help="Don't execute actions but filter resources")
 
 
+def _rate_limit(value):
+    try:
+        ratelimit.parse_rate(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
 def _key_val_pair(value):
     """
     Type checker to ensure that --field values are of the format key=val
@@ -226,6 +243,37 @@ def setup_parser():
         "--skip-validation",
         action="store_true",
         help="Skips validation of policies (assumes you've run the validate command seperately).")
+    run.add_argument(
+        "--parallel", type=int, default=0, metavar="N",
+        help="Execute policies across N worker processes, policies for the same "
+        "resource type and region run in the same worker to share resource "
+        "fetches. Uses an in-memory resource cache per worker unless a "
+        "sqlite:// cache is given.")
+    run.add_argument(
+        "--adaptive-concurrency", action="store_true",
+        help="Size worker pools and bound concurrent api calls per service "
+        "endpoint and region, adjusting to observed latency and throttling.")
+    run.add_argument(
+        "--stream-batch-size", type=int, default=0, metavar="N",
+        help="Process resources in batches of N as they're fetched, running "
+        "filters and actions per batch instead of on the full resource set. "
+        "Policies with set level filters (ie. reduce) or resource limits "
+        "process the full set.")
+    run.add_argument(
+        "--resources-format", default="json",
+        choices=("json", "json.gz", "jsonl", "jsonl.gz"),
+        help="Format of the matched resources file, a json array or json "
+        "lines, optionally gzip compressed. Resources are encoded as a stream.")
+    run.add_argument(
+        "--rate-limit", action="append", default=[], type=_rate_limit,
+        metavar="KEY=RATE",
+        help="Limit api calls per second per account and region, keyed by "
+        "service.Operation, service or default (ie. ec2.DescribeInstances=5). "
+        "May be specified multiple times.")
+    run.add_argument(
+        "--rate-limit-dir", default=None, metavar="DIR",
+        help="Share rate limit state across processes via files in DIR, "
+        "also enables rate limiting with the default rates.")
 
     metrics_help = ("Emit metrics to provider metrics. Specify 'aws', 'gcp', or 'azure'. "
             "For more details on aws metrics options, see: "
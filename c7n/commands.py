@@ -1,6 +1,7 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 from collections import Counter, defaultdict
+from concurrent.futures import as_completed
 from datetime import timedelta, datetime
 from functools import wraps
 import json
@@ -13,8 +14,10 @@ import yaml
 from yaml.constructor import ConstructorError
 
 from c7n import deprecated
+from c7n.cache import resource_snapshots
 from c7n.exceptions import ClientError, PolicyValidationError
 from c7n.loader import SourceLocator
+from c7n.output import background_uploads
 from c7n.provider import clouds
 from c7n.policy import Policy, PolicyCollection, load as policy_load
 from c7n.schema import ElementSchema, StructureParser, generate
@@ -295,24 +298,104 @@ def run(options, policies):
             log.exception("Unable to assume role %s", options.assume_role)
             sys.exit(1)
 
-    errored_policies = []
-    for policy in policies:
-        try:
-            policy()
-        except Exception:
-            exit_code = 2
-            errored_policies.append(policy.name)
-            if options.debug:
-                raise
-            log.exception(
-                "Error while executing policy %s, continuing" % (
-                    policy.name))
+    if getattr(options, 'parallel', 0) > 1:
+        errored_policies = run_parallel(options, policies)
+    else:
+        errored_policies = run_policies(options, policies)
+
+    if errored_policies:
+        exit_code = 2
     if exit_code != 0:
         log.error("The following policies had errors while executing\n - %s" % (
             "\n - ".join(errored_policies)))
         sys.exit(exit_code)
 
 
+def run_policies(options, policies):
+    """Execute policies serially, returning the names of any that errored.
+
+    Resource fetches are shared across the policies via run snapshots,
+    and output uploads may run in the background until all the policies
+    have executed, policies whose uploads failed are also errored.
+    """
+    errored_policies = []
+    with resource_snapshots(options), background_uploads() as failed_uploads:
+        for policy in policies:
+            try:
+                policy()
+            except Exception:
+                errored_policies.append(policy.name)
+                if options.debug:
+                    raise
+                log.exception(
+                    "Error while executing policy %s, continuing" % (
+                        policy.name))
+    for name in failed_uploads:
+        if name not in errored_policies:
+            errored_policies.append(name)
+    return errored_policies
+
+
+def group_policies(policies):
+    """Group policies by region and resource type, preserving order.
+
+    Policies within a group run serially in one worker so they can
+    reuse the same resource fetch via the resource cache.
+    """
+    groups = {}
+    for p in policies:
+        groups.setdefault((p.options.region, p.resource_type), []).append(p)
+    return list(groups.values())
+
+
+def run_parallel(options, policies):
+    """Execute groups of policies concurrently in worker processes.
+
+    Policies are shipped to workers as data and options, and rebuilt
+    there with the provider's default session factory.
+    """
+    from c7n.executor import MainThreadExecutor, ProcessPoolExecutor
+    # the file cache isn't safe for concurrent writers, so workers
+    # share fetches through their own in-memory cache instead, unless
+    # caching was disabled outright.
+    cache_options = {}
+    if options.cache_period and (
+            not options.cache or not options.cache.startswith('sqlite://')):
+        cache_options = {'cache': 'memory'}
+
+    executor = options.debug and MainThreadExecutor or ProcessPoolExecutor
+    errored_policies = []
+    with executor(max_workers=options.parallel) as w:
+        futures = {}
+        for group in group_policies(policies):
+            futures[w.submit(
+                run_policy_group,
+                [(p.data, p.options.copy(**cache_options)) for p in group],
+                options.debug)] = group
+        for f in as_completed(futures):
+            if f.exception():
+                if options.debug:
+                    raise f.exception()
+                log.error(
+                    "Error executing policies %s: %s",
+                    ", ".join(p.name for p in futures[f]), f.exception())
+                errored_policies.extend(p.name for p in futures[f])
+                continue
+            errored_policies.extend(f.result())
+    return errored_policies
+
+
+def run_policy_group(policy_group, debug=False):
+    """Worker entry point for parallel runs."""
+    load_resources({data['resource'] for data, _ in policy_group})
+    policies = [Policy(data, p_options) for data, p_options in policy_group]
+    options = policies[0].options
+    if not options.get('skip_validation'):
+        for p in policies:
+            p.validate()
+    return run_policies(options.copy(debug=debug), policies)
+
+
 @policy_command
 def report(options, policies):
     from c7n.reports import report as do_report
@@ -42,6 +42,7 @@ class Config(Bag):
             'metrics': None,
             'output_dir': '',
             'cache_period': 0,
+            'cache_max_size': 0,
             'dryrun': False,
             'authorization_file': None})
         d.update(kw)
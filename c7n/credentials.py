@@ -60,7 +60,15 @@ class SessionFactory:
         return session
 
     def set_subscribers(self, subscribers):
-        self._subscribers = subscribers
+        self._subscribers = list(subscribers)
+
+    def add_subscriber(self, subscriber):
+        if subscriber not in self._subscribers:
+            self._subscribers.append(subscriber)
+
+    def remove_subscriber(self, subscriber):
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
 
 
 def assumed_session(role_arn, session_name, session=None, region=None, external_id=None):
@@ -5,6 +5,7 @@ import uuid
 import os
 
 
+from c7n.cache import get_snapshots
 from c7n.output import (
     api_stats_outputs,
     blob_outputs,
@@ -13,7 +14,7 @@ from c7n.output import (
     sys_stats_outputs,
     tracer_outputs)
 
-from c7n.utils import reset_session_cache, dumps, local_session
+from c7n.utils import reset_session_cache, dumps, local_session, tag_index
 from c7n.version import version
 
 
@@ -80,6 +81,8 @@ class ExecutionContext:
 
         self.api_stats.__enter__()
         self.tracer.__enter__()
+        self.tag_index = tag_index()
+        self.tag_index.__enter__()
 
         # Api stats and user agent modification by policy require updating
         # in place the cached session thread local.
@@ -89,20 +92,24 @@ class ExecutionContext:
         return self
 
     def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
-        if exc_type is not None and self.metrics:
-            self.metrics.put_metric('PolicyException', 1, "Count")
-        self.policy._write_file(
-            'metadata.json', dumps(self.get_metadata(), indent=2))
-        self.api_stats.__exit__(exc_type, exc_value, exc_traceback)
-
-        with self.tracer.subsegment('output'):
-            self.metrics.flush()
-            self.logs.__exit__(exc_type, exc_value, exc_traceback)
-            if self.output_logs:
-                self.output_logs.__exit__(exc_type, exc_value, exc_traceback)
-            self.output.__exit__(exc_type, exc_value, exc_traceback)
-
-        self.tracer.__exit__()
+        try:
+            if exc_type is not None and self.metrics:
+                self.metrics.put_metric('PolicyException', 1, "Count")
+            self.policy._write_file(
+                'metadata.json', dumps(self.get_metadata(), indent=2))
+            self.api_stats.__exit__(exc_type, exc_value, exc_traceback)
+
+            with self.tracer.subsegment('output'):
+                self.metrics.flush()
+                self.logs.__exit__(exc_type, exc_value, exc_traceback)
+                if self.output_logs:
+                    self.output_logs.__exit__(exc_type, exc_value, exc_traceback)
+                self.output.__exit__(exc_type, exc_value, exc_traceback)
+
+            self.tracer.__exit__()
+        finally:
+            # don't leak cached tag maps into the next policy
+            self.tag_index.__exit__(exc_type, exc_value, exc_traceback)
 
         self.session_factory.policy_name = None
         # IMPORTANT: multi-account execution (c7n-org and others) need
@@ -131,4 +138,7 @@ class ExecutionContext:
             md['api-stats'] = self.api_stats.get_metadata()
         if 'metrics' in include and self.metrics:
             md['metrics'] = self.metrics.get_metadata()
+        snapshots = get_snapshots()
+        if snapshots is not None:
+            md['resource-snapshots'] = snapshots.get_stats(self.execution_id)
         return md
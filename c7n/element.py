@@ -5,7 +5,7 @@
 import jmespath
 
 from c7n import deprecated
-from c7n.executor import ThreadPoolExecutor
+from c7n.executor import AdaptiveThreadPoolExecutor
 
 
 class Element:
@@ -15,7 +15,7 @@ class Element:
     permissions = ()
     metrics = ()
 
-    executor_factory = ThreadPoolExecutor
+    executor_factory = AdaptiveThreadPoolExecutor
 
     schema = {'type': 'object'}
     # schema aliases get hoisted into a jsonschema definition
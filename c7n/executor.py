@@ -2,7 +2,11 @@
 # SPDX-License-Identifier: Apache-2.0
 from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor)  # noqa
 
+import logging
 import threading
+import time
+
+log = logging.getLogger('custodian.executor')
 
 
 class MainThreadExecutor:
@@ -68,3 +72,120 @@ class MainThreadFuture:
 
     def add_done_callback(self, fn):
         return fn(self)
+
+
+class AdaptiveLimit:
+    """An AIMD concurrency limit for calls to a single api endpoint.
+
+    The limit grows additively, by roughly one per limit's worth of
+    successful calls, while observed latency stays near the best seen.
+    On throttling it's cut multiplicatively, at most once per cooldown
+    so a burst of throttled responses is treated as a single signal.
+    Callers beyond the limit block in acquire until a slot frees up.
+    """
+
+    backoff = 0.5
+    cooldown = 1.0
+    # ewma latency beyond this multiple of the best seen holds the limit.
+    latency_tolerance = 2.0
+
+    def __init__(self, key, initial=4, min_limit=1, max_limit=32):
+        self.key = key
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.active = 0
+        self.latency = None
+        self.min_latency = None
+        self.throttled_at = None
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while self.active >= int(self.limit):
+                self.cond.wait()
+            self.active += 1
+
+    def release(self, latency=None, throttled=False):
+        with self.cond:
+            self.active -= 1
+            if throttled:
+                self.throttle()
+            elif latency is not None:
+                self.observe(latency)
+            self.cond.notify_all()
+
+    def observe(self, latency):
+        if self.latency is None:
+            self.latency = self.min_latency = latency
+        else:
+            self.latency = 0.8 * self.latency + 0.2 * latency
+            self.min_latency = min(self.min_latency, latency)
+        if self.latency <= self.min_latency * self.latency_tolerance:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def throttle(self):
+        with self.cond:
+            now = time.monotonic()
+            if self.throttled_at is not None and now - self.throttled_at < self.cooldown:
+                return
+            self.throttled_at = now
+            limit = max(self.min_limit, self.limit * self.backoff)
+            if int(limit) != int(self.limit):
+                log.debug("throttled %s concurrency %d -> %d",
+                          self.key, int(self.limit), int(limit))
+            self.limit = limit
+
+
+class ConcurrencyController:
+    """Process wide adaptive concurrency limits, per api endpoint and region.
+
+    Provider hooks report api call outcomes via the per key
+    :class:`AdaptiveLimit`, executor pools are sized from the current
+    limits when enabled.
+    """
+
+    def __init__(self, initial=4, max_limit=32):
+        self.initial = initial
+        self.max_limit = max_limit
+        self.enabled = False
+        self.limits = {}
+        self.lock = threading.Lock()
+
+    def get_limit(self, key):
+        limit = self.limits.get(key)
+        if limit is not None:
+            return limit
+        with self.lock:
+            return self.limits.setdefault(
+                key, AdaptiveLimit(key, self.initial, max_limit=self.max_limit))
+
+    def pool_size(self, max_workers=None):
+        """Size of a worker pool, given the pool's requested size.
+
+        When enabled pools are sized to the largest current endpoint
+        limit instead, growing as the limits increase and shrinking on
+        throttling. Serial pools of a single worker are left as is.
+        Per endpoint call concurrency is bounded by the limits themselves.
+        """
+        if not self.enabled or not self.limits or max_workers == 1:
+            return max_workers
+        return max(1, max(int(l.limit) for l in list(self.limits.values())))
+
+    def reset(self):
+        with self.lock:
+            self.limits = {}
+
+
+concurrency = ConcurrencyController()
+
+
+class AdaptiveThreadPoolExecutor(ThreadPoolExecutor):
+    """Thread pool sized by the process concurrency controller.
+
+    Behaves as a plain thread pool of max_workers unless adaptive
+    concurrency is enabled.
+    """
+
+    def __init__(self, max_workers=None, *args, **kw):
+        super().__init__(concurrency.pool_size(max_workers), *args, **kw)
@@ -7,6 +7,7 @@ import copy
 import datetime
 from datetime import timedelta
 import fnmatch
+import functools
 import ipaddress
 import logging
 import operator
@@ -14,7 +15,6 @@ import re
 
 from dateutil.tz import tzutc
 from dateutil.parser import parse
-from distutils import version
 from random import sample
 import jmespath
 
@@ -22,7 +22,8 @@ from c7n.element import Element
 from c7n.exceptions import PolicyValidationError
 from c7n.registry import PluginRegistry
 from c7n.resolver import ValuesFrom
-from c7n.utils import set_annotation, type_schema, parse_cidr, parse_date
+from c7n.utils import (
+    set_annotation, type_schema, parse_cidr, parse_date, get_tag_map)
 from c7n.manager import iter_filters
 
 
@@ -101,6 +102,12 @@ VALUE_TYPES = [
     'cidr', 'cidr_size', 'swap', 'resource_count', 'expr',
     'unique_size', 'date', 'version']
 
+# Value types which only convert the resource value, and so can be
+# compiled with a static sentinel.
+COMPILED_VALUE_TYPES = {
+    None, 'integer', 'normalize', 'size', 'cidr_size', 'unique_size',
+    'date', 'version'}
+
 
 class FilterRegistry(PluginRegistry):
 
@@ -181,6 +188,11 @@ class Filter(Element):
 
     log = logging.getLogger('custodian.filters')
 
+    # whether the filter's result for a resource depends on the rest of
+    # the resource set, such filters need the full set materialized and
+    # can't be applied to a stream of resource batches.
+    set_level = False
+
     def __init__(self, data, manager=None):
         self.data = data
         self.manager = manager
@@ -232,10 +244,7 @@ class BaseValueFilter(Filter):
         if k.startswith('tag:'):
             tk = k.split(':', 1)[1]
             if 'Tags' in i:
-                for t in i.get("Tags", []):
-                    if t.get('Key') == tk:
-                        r = t.get('Value')
-                        break
+                r = get_tag_map(i).get(tk)
             # GCP schema: 'labels': {'key': 'value'}
             elif 'labels' in i:
                 r = i.get('labels', {}).get(tk, None)
@@ -433,20 +442,31 @@ class AnnotationSweeper:
             self.resource_map[rid].update(self.ra_map[rid])
 
 
-# The default LooseVersion will fail on comparing present strings, used
-# in the value as shorthand for certain options.
-class ComparableVersion(version.LooseVersion):
-    def __eq__(self, other):
-        try:
-            return super(ComparableVersion, self).__eq__(other)
-        except TypeError:
-            return False
+@functools.lru_cache(maxsize=None)
+def _comparable_version():
+    # distutils is imported on first use, its import is relatively slow.
+    from distutils import version
+
+    # The default LooseVersion will fail on comparing present strings, used
+    # in the value as shorthand for certain options.
+    class ComparableVersion(version.LooseVersion):
+        def __eq__(self, other):
+            try:
+                return super(ComparableVersion, self).__eq__(other)
+            except TypeError:
+                return False
+
+    return ComparableVersion
+
+
+def ComparableVersion(value):
+    return _comparable_version()(value)
 
 
 class ValueFilter(BaseValueFilter):
     """Generic value filter using jmespath
     """
-    op = v = vtype = None
+    op = v = vtype = matcher = None
 
     schema = {
         'type': 'object',
@@ -469,6 +489,11 @@ class ValueFilter(BaseValueFilter):
     annotate = True
     required_keys = {'value', 'key'}
 
+    @property
+    def set_level(self):
+        # resource_count compares against the size of the whole set
+        return self.data.get('value_type') == 'resource_count'
+
     def _validate_resource_count(self):
         """ Specific validation for `resource_count` type
 
@@ -556,9 +581,23 @@ class ValueFilter(BaseValueFilter):
         return super(ValueFilter, self).get_resource_value(k, i, self.data.get('value_regex'))
 
     def match(self, i):
-        if self.v is None and len(self.data) == 1:
+        if self.matcher is None:
+            self.matcher = self.compile()
+        if i is None:
+            return False
+        return self.matcher(i)
+
+    def compile(self):
+        """Compile the filter into a matching function.
+
+        Resolves the sentinel value and value_from once, and for the
+        common cases specializes value extraction and comparison, with
+        pre-compiled jmespath expressions and regexes, and pre-parsed
+        sentinels, so the per resource cost is only the comparison.
+        """
+        if len(self.data) == 1:
             [(self.k, self.v)] = self.data.items()
-        elif self.v is None and not hasattr(self, 'content_initialized'):
+        else:
             self.k = self.data.get('key')
             self.op = self.data.get('op')
             if 'value_from' in self.data:
@@ -569,9 +608,106 @@ class ValueFilter(BaseValueFilter):
             self.content_initialized = True
             self.vtype = self.data.get('value_type')
 
-        if i is None:
-            return False
+        if self.vtype not in COMPILED_VALUE_TYPES:
+            return self.match_value
 
+        get_value = self.compile_value_getter()
+        convert, v = self.compile_value_type()
+        op = self.compile_operator(v)
+        null_value = () if self.op in ('in', 'not-in') else None
+
+        absent, present = v == 'absent', v == 'present'
+        not_null, empty = v == 'not-null', v == 'empty'
+
+        def matcher(i):
+            r = get_value(i)
+            if r is None:
+                r = null_value
+            if convert is not None:
+                r = convert(r)
+
+            if r is None and absent:
+                return True
+            elif r is not None and present:
+                return True
+            elif not_null and r:
+                return True
+            elif empty and not r:
+                return True
+            elif op is not None:
+                try:
+                    return op(r, v)
+                except TypeError:
+                    return False
+            return r == v
+        return matcher
+
+    def compile_value_getter(self):
+        k = self.k
+        # subclasses may redirect value lookup (ie. to an annotation)
+        if type(self).get_resource_value is not ValueFilter.get_resource_value:
+            return functools.partial(self.get_resource_value, k)
+        regex = self.data.get('value_regex')
+        if regex:
+            regex = ValueRegex(regex)
+            return lambda i: regex.get_resource_value(
+                BaseValueFilter.get_resource_value(self, k, i))
+        if k.startswith('tag:'):
+            tk = k.split(':', 1)[1]
+
+            def get_tag(i):
+                if 'Tags' in i:
+                    return get_tag_map(i).get(tk)
+                return BaseValueFilter.get_resource_value(self, k, i)
+            return get_tag
+
+        def get_value(i):
+            if k in i:
+                return i.get(k)
+            # keys present on every resource may not be valid expressions
+            expr = self.expr.get(k)
+            if expr is None:
+                expr = self.expr[k] = jmespath.compile(k)
+            return expr.search(i)
+        return get_value
+
+    def compile_value_type(self):
+        """Return a resource value converter and the converted sentinel."""
+        if self.vtype is None:
+            return None, self.v
+        elif self.vtype == 'date':
+            return parse_date, parse_date(self.v)
+        elif self.vtype == 'version':
+            return ComparableVersion, ComparableVersion(self.v)
+
+        def convert(value):
+            return self.process_value_type(self.v, value, None)[1]
+        return convert, self.v
+
+    def compile_operator(self, v):
+        if not self.op:
+            return None
+        op = OPERATORS[self.op]
+        if self.op in ('regex', 'regex-case') and isinstance(v, str):
+            flags = self.op == 'regex' and re.IGNORECASE or 0
+            pattern = re.compile(v, flags)
+            return lambda r, v: isinstance(r, str) and bool(pattern.match(r))
+        elif self.op in ('in', 'not-in', 'ni') and isinstance(v, (list, tuple, set)):
+            try:
+                vset = frozenset(v)
+            except TypeError:
+                return op
+
+            def match_set(r, v):
+                try:
+                    found = r in vset
+                except TypeError:
+                    found = r in v
+                return found if op is operator_in else not found
+            return match_set
+        return op
+
+    def match_value(self, i):
         # value extract
         r = self.get_resource_value(self.k, i)
 
@@ -765,12 +901,13 @@ class ValueRegex:
 
     def __init__(self, expr):
         self.expr = expr
+        self.pattern = re.compile(expr)
 
     def get_resource_value(self, resource):
         if resource is None:
             return resource
         try:
-            capture = re.match(self.expr, resource)
+            capture = self.pattern.match(resource)
         except (ValueError, TypeError):
             return None
         if capture is None:  # regex didn't capture anything
@@ -815,6 +952,7 @@ class ReduceFilter(BaseValueFilter):
 
     """
     annotate = False
+    set_level = True
 
     schema = {
         'type': 'object',
@@ -5,6 +5,7 @@ CloudWatch Metrics suppport for resources
 """
 from concurrent.futures import as_completed
 from datetime import datetime, timedelta
+import math
 
 from c7n.exceptions import PolicyValidationError
 from c7n.filters.core import Filter, OPERATORS
@@ -64,6 +65,26 @@ class MetricsFilter(Filter):
     policy to treat their request counts as 0.
 
     Note the default statistic for metrics is Average.
+
+    The "batch" key retrieves metrics with GetMetricData, packing up
+    to 500 resources into each api call instead of issuing one
+    GetMetricStatistics call per resource, which is substantially
+    faster on large resource sets. The period is rounded up to a
+    multiple of 60 seconds as required by the api.
+
+    .. code-block:: yaml
+
+      - name: ebs-unused
+        resource: ebs
+        filters:
+          - type: metrics
+            name: VolumeReadOps
+            statistics: Sum
+            days: 14
+            value: 0
+            missing-value: 0
+            op: eq
+            batch: true
     """
 
     schema = type_schema(
@@ -84,12 +105,15 @@ class MetricsFilter(Filter):
            'attr-multiplier': {'type': 'number'},
            'percent-attr': {'type': 'string'},
            'missing-value': {'type': 'number'},
+           'batch': {'type': 'boolean'},
            'required': ('value', 'name')})
     schema_alias = True
     permissions = ("cloudwatch:GetMetricStatistics",)
 
     MAX_QUERY_POINTS = 50850
     MAX_RESULT_POINTS = 1440
+    # GetMetricData limit on queries per request
+    MAX_METRIC_DATA_QUERIES = 500
 
     # Default per service, for overloaded services like ec2
     # we do type specific default namespace annotation
@@ -147,12 +171,17 @@ class MetricsFilter(Filter):
         self.namespace = ns
 
         self.log.debug("Querying metrics for %d", len(resources))
+        if self.data.get('batch'):
+            batch_size, process_set = (
+                self.MAX_METRIC_DATA_QUERIES, self.process_metric_data_set)
+        else:
+            batch_size, process_set = 50, self.process_resource_set
+
         matched = []
         with self.executor_factory(max_workers=3) as w:
             futures = []
-            for resource_set in chunks(resources, 50):
-                futures.append(
-                    w.submit(self.process_resource_set, resource_set))
+            for resource_set in chunks(resources, batch_size):
+                futures.append(w.submit(process_set, resource_set))
 
             for f in as_completed(futures):
                 if f.exception():
@@ -162,6 +191,11 @@ class MetricsFilter(Filter):
                 matched.extend(f.result())
         return matched
 
+    def get_permissions(self):
+        if self.data.get('batch'):
+            return ("cloudwatch:GetMetricData",)
+        return self.permissions
+
     def get_dimensions(self, resource):
         return [{'Name': self.model.dimension,
                  'Value': resource[self.model.dimension]}]
@@ -174,25 +208,29 @@ class MetricsFilter(Filter):
             dims.append({'Name': k, 'Value': v})
         return dims
 
+    def get_metric_key(self):
+        # Note this annotation cache is policy scoped, not across
+        # policies, still the lack of full qualification on the key
+        # means multiple filters within a policy using the same metric
+        # across different periods or dimensions would be problematic.
+        return "%s.%s.%s" % (self.namespace, self.metric, self.statistics)
+
+    def get_resource_dimensions(self, resource):
+        # if we overload dimensions with multiple resources we get
+        # the statistics/average over those resources.
+        dimensions = self.get_dimensions(resource)
+        # Merge in any filter specified metrics, get_dimensions is
+        # commonly overridden so we can't do it there.
+        dimensions.extend(self.get_user_dimensions())
+        return dimensions
+
     def process_resource_set(self, resource_set):
         client = local_session(
             self.manager.session_factory).client('cloudwatch')
 
-        matched = []
+        key = self.get_metric_key()
         for r in resource_set:
-            # if we overload dimensions with multiple resources we get
-            # the statistics/average over those resources.
-            dimensions = self.get_dimensions(r)
-            # Merge in any filter specified metrics, get_dimensions is
-            # commonly overridden so we can't do it there.
-            dimensions.extend(self.get_user_dimensions())
-
             collected_metrics = r.setdefault('c7n.metrics', {})
-            # Note this annotation cache is policy scoped, not across
-            # policies, still the lack of full qualification on the key
-            # means multiple filters within a policy using the same metric
-            # across different periods or dimensions would be problematic.
-            key = "%s.%s.%s" % (self.namespace, self.metric, self.statistics)
             if key not in collected_metrics:
                 collected_metrics[key] = client.get_metric_statistics(
                     Namespace=self.namespace,
@@ -201,32 +239,76 @@ class MetricsFilter(Filter):
                     StartTime=self.start,
                     EndTime=self.end,
                     Period=self.period,
-                    Dimensions=dimensions)['Datapoints']
-
-            # In certain cases CloudWatch reports no data for a metric.
-            # If the policy specifies a fill value for missing data, add
-            # that here before testing for matches. Otherwise, skip
-            # matching entirely.
-            if len(collected_metrics[key]) == 0:
-                if 'missing-value' not in self.data:
-                    continue
-                collected_metrics[key].append({
-                    'Timestamp': self.start,
-                    self.statistics: self.data['missing-value'],
-                    'c7n:detail': 'Fill value for missing data'
-                })
-
-            if self.data.get('percent-attr'):
-                rvalue = r[self.data.get('percent-attr')]
-                if self.data.get('attr-multiplier'):
-                    rvalue = rvalue * self.data['attr-multiplier']
-                percent = (collected_metrics[key][0][self.statistics] /
-                           rvalue * 100)
-                if self.op(percent, self.value):
-                    matched.append(r)
-            elif self.op(collected_metrics[key][0][self.statistics], self.value):
-                matched.append(r)
-        return matched
+                    Dimensions=self.get_resource_dimensions(r))['Datapoints']
+        return [r for r in resource_set if self.match_metrics(r, key)]
+
+    def process_metric_data_set(self, resource_set):
+        """Retrieve metrics for up to 500 resources per GetMetricData call.
+
+        Datapoints are annotated in the same shape GetMetricStatistics
+        returns them, so matching is shared with the unbatched path.
+        """
+        client = local_session(
+            self.manager.session_factory).client('cloudwatch')
+
+        key = self.get_metric_key()
+        period = int(math.ceil(self.period / 60.0)) * 60
+        queries, query_resources = [], {}
+        for idx, r in enumerate(resource_set):
+            if key in r.setdefault('c7n.metrics', {}):
+                continue
+            qid = 'm%d' % idx
+            query_resources[qid] = r
+            r['c7n.metrics'][key] = []
+            queries.append({
+                'Id': qid,
+                'MetricStat': {
+                    'Metric': {
+                        'Namespace': self.namespace,
+                        'MetricName': self.metric,
+                        'Dimensions': self.get_resource_dimensions(r)},
+                    'Period': period,
+                    'Stat': self.statistics},
+                'ReturnData': True})
+
+        if queries:
+            paginator = client.get_paginator('get_metric_data')
+            results = paginator.paginate(
+                MetricDataQueries=queries,
+                StartTime=self.start,
+                EndTime=self.end,
+                ScanBy='TimestampDescending')
+            for page in results:
+                for result in page['MetricDataResults']:
+                    datapoints = query_resources[result['Id']]['c7n.metrics'][key]
+                    for ts, value in zip(result['Timestamps'], result['Values']):
+                        datapoints.append({'Timestamp': ts, self.statistics: value})
+        return [r for r in resource_set if self.match_metrics(r, key)]
+
+    def match_metrics(self, r, key):
+        collected_metrics = r['c7n.metrics']
+
+        # In certain cases CloudWatch reports no data for a metric.
+        # If the policy specifies a fill value for missing data, add
+        # that here before testing for matches. Otherwise, skip
+        # matching entirely.
+        if len(collected_metrics[key]) == 0:
+            if 'missing-value' not in self.data:
+                return False
+            collected_metrics[key].append({
+                'Timestamp': self.start,
+                self.statistics: self.data['missing-value'],
+                'c7n:detail': 'Fill value for missing data'
+            })
+
+        if self.data.get('percent-attr'):
+            rvalue = r[self.data.get('percent-attr')]
+            if self.data.get('attr-multiplier'):
+                rvalue = rvalue * self.data['attr-multiplier']
+            percent = (collected_metrics[key][0][self.statistics] /
+                       rvalue * 100)
+            return self.op(percent, self.value)
+        return self.op(collected_metrics[key][0][self.statistics], self.value)
 
 
 class ShieldMetrics(MetricsFilter):
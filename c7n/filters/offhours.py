@@ -231,6 +231,7 @@ might look like:
 """
 # note we have to module import for our testing mocks
 import datetime
+import functools
 import logging
 from os.path import join
 
@@ -238,7 +239,7 @@ from dateutil import zoneinfo, tz as tzutil
 
 from c7n.exceptions import PolicyValidationError
 from c7n.filters import Filter
-from c7n.utils import type_schema, dumps
+from c7n.utils import type_schema, dumps, get_tag_map
 from c7n.resolver import ValuesFrom
 
 log = logging.getLogger('custodian.offhours')
@@ -252,6 +253,62 @@ def parens_removed(u):
     return u.translate({ord('('): None, ord(')'): None})
 
 
+@functools.lru_cache(maxsize=256)
+def _get_tz(name):
+    return tzutil.gettz(name)
+
+
+class TimeZoneAliases(dict):
+    """Timezone aliases, along with lower case forms of the zone names
+    that aren't title case.
+
+    The zone names are added on first lookup, reading the zone database
+    is otherwise a noticeable part of import time.
+    """
+
+    loaded = False
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        z_names = zoneinfo.get_zonefile_instance().zones
+        self.update({z.lower(): z for z in z_names
+                     if z.title() != z and not dict.__contains__(self, z.lower())})
+
+    def get(self, key, default=None):
+        self.load()
+        return super().get(key, default)
+
+    def __getitem__(self, key):
+        self.load()
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self.load()
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self.load()
+        return super().__iter__()
+
+    def __len__(self):
+        self.load()
+        return super().__len__()
+
+    def keys(self):
+        self.load()
+        return super().keys()
+
+    def items(self):
+        self.load()
+        return super().items()
+
+    def values(self):
+        self.load()
+        return super().values()
+
+
 class Time(Filter):
     """
     Schedule offhours for resources see :ref:`offhours <offhours>`
@@ -278,7 +335,10 @@ class Time(Filter):
     DEFAULT_TAG = "maid_offhours"
     DEFAULT_TZ = 'et'
 
-    TZ_ALIASES = {
+    # Max distinct tag values with resolved schedules kept per filter
+    SCHEDULE_CACHE_SIZE = 1024
+
+    TZ_ALIASES = TimeZoneAliases({
         'pdt': 'America/Los_Angeles',
         'pt': 'America/Los_Angeles',
         'pst': 'America/Los_Angeles',
@@ -307,14 +367,7 @@ class Time(Filter):
         'brt': 'America/Sao_Paulo',
         'nzst': 'Pacific/Auckland',
         'utc': 'Etc/UTC',
-    }
-
-    z_names = list(zoneinfo.get_zonefile_instance().zones)
-    non_title_case_zones = (
-        lambda aliases=TZ_ALIASES.keys(), z_names=z_names:
-        {z.lower(): z for z in z_names
-            if z.title() != z and z.lower() not in aliases})()
-    TZ_ALIASES.update(non_title_case_zones)
+    })
 
     def __init__(self, data, manager=None):
         super(Time, self).__init__(data, manager)
@@ -325,7 +378,10 @@ class Time(Filter):
         self.tag_key = self.data.get('tag', self.DEFAULT_TAG).lower()
         self.fallback_schedule = self.data.get('fallback-schedule', None)
         self.default_schedule = self.get_default_schedule()
-        self.parser = ScheduleParser(self.default_schedule)
+        self.parser = ScheduleParser(
+            self.default_schedule, cache_size=self.SCHEDULE_CACHE_SIZE)
+        self.schedules = {}
+        self.skip_days = None
 
         self.id_key = None
 
@@ -349,6 +405,7 @@ class Time(Filter):
         return self
 
     def process(self, resources, event=None):
+        self.skip_days = self.get_skip_days()
         resources = super(Time, self).process(resources)
         if self.parse_errors and self.manager and self.manager.ctx.log_dir:
             self.log.warning("parse errors %d", len(self.parse_errors))
@@ -397,28 +454,12 @@ class Time(Filter):
     def process_resource_schedule(self, i, value, time_type):
         """Does the resource tag schedule and policy match the current time."""
         rid = i[self.id_key]
-        # this is to normalize trailing semicolons which when done allows
-        # dateutil.parser.parse to process: value='off=(m-f,1);' properly.
-        # before this normalization, some cases would silently fail.
-        value = ';'.join(filter(None, value.split(';')))
-        if self.parser.has_resource_schedule(value, time_type):
-            schedule = self.parser.parse(value)
-        elif self.parser.keys_are_valid(value):
-            # respect timezone from tag
-            raw_data = self.parser.raw_data(value)
-            if 'tz' in raw_data:
-                schedule = dict(self.default_schedule)
-                schedule['tz'] = raw_data['tz']
-            else:
-                schedule = self.default_schedule
-        else:
-            schedule = None
+        schedule, tz = self.resolve_schedule(value, time_type)
         if schedule is None:
             log.warning(
                 "Invalid schedule on resource:%s value:%s", rid, value)
             self.parse_errors.append((rid, value))
             return False
-        tz = self.get_tz(schedule['tz'])
         if not tz:
             log.warning(
                 "Could not resolve tz on resource:%s value:%s", rid, value)
@@ -427,15 +468,49 @@ class Time(Filter):
         now = datetime.datetime.now(tz).replace(
             minute=0, second=0, microsecond=0)
         now_str = now.strftime("%Y-%m-%d")
-        if 'skip-days-from' in self.data:
-            values = ValuesFrom(self.data['skip-days-from'], self.manager)
-            self.skip_days = values.get_values()
-        else:
-            self.skip_days = self.data.get('skip-days', [])
+        if self.skip_days is None:
+            self.skip_days = self.get_skip_days()
         if now_str in self.skip_days:
             return False
         return self.match(now, schedule)
 
+    def resolve_schedule(self, value, time_type):
+        """Resolve a tag value to its schedule and timezone.
+
+        Resources commonly share a small number of distinct schedules,
+        so resolutions are memoized by tag value.
+        """
+        if value in self.schedules:
+            return self.schedules[value]
+        if len(self.schedules) >= self.SCHEDULE_CACHE_SIZE:
+            self.schedules.pop(next(iter(self.schedules)))
+
+        # this is to normalize trailing semicolons which when done allows
+        # dateutil.parser.parse to process: value='off=(m-f,1);' properly.
+        # before this normalization, some cases would silently fail.
+        normalized = ';'.join(filter(None, value.split(';')))
+        if self.parser.has_resource_schedule(normalized, time_type):
+            schedule = self.parser.parse(normalized)
+        elif self.parser.keys_are_valid(normalized):
+            # respect timezone from tag
+            raw_data = self.parser.raw_data(normalized)
+            if 'tz' in raw_data:
+                schedule = dict(self.default_schedule)
+                schedule['tz'] = raw_data['tz']
+            else:
+                schedule = self.default_schedule
+        else:
+            schedule = None
+        tz = schedule and self.get_tz(schedule['tz']) or None
+        self.schedules[value] = (schedule, tz)
+        return schedule, tz
+
+    def get_skip_days(self):
+        if 'skip-days-from' in self.data:
+            values = ValuesFrom(self.data['skip-days-from'], self.manager)
+            return set(values.get_values())
+        return set(self.data.get('skip-days', []))
+
     def match(self, now, schedule):
         time = schedule.get(self.time_type, ())
         for item in time:
@@ -447,11 +522,8 @@ class Time(Filter):
     def get_tag_value(self, i):
         """Get the resource's tag value specifying its schedule."""
         # Look for the tag, Normalize tag key and tag value
-        found = self.fallback_schedule
-        for t in i.get('Tags', ()):
-            if t['Key'].lower() == self.tag_key:
-                found = t['Value']
-                break
+        found = get_tag_map(i, case_sensitive=False).get(
+            self.tag_key, self.fallback_schedule)
         if found in (False, None):
             return False
         # enforce utf8, or do translate tables via unicode ord mapping
@@ -465,8 +537,8 @@ class Time(Filter):
     def get_tz(cls, tz):
         found = cls.TZ_ALIASES.get(tz)
         if found:
-            return tzutil.gettz(found)
-        return tzutil.gettz(tz.title())
+            return _get_tz(found)
+        return _get_tz(tz.title())
 
     def get_default_schedule(self):
         raise NotImplementedError("use subclass")
@@ -568,9 +640,10 @@ class ScheduleParser:
     DAY_MAP = {'m': 0, 't': 1, 'w': 2, 'h': 3, 'f': 4, 's': 5, 'u': 6}
     VALID_HOURS = tuple(range(24))
 
-    def __init__(self, default_schedule):
+    def __init__(self, default_schedule, cache_size=None):
         self.default_schedule = default_schedule
         self.cache = {}
+        self.cache_size = cache_size
 
     @staticmethod
     def raw_data(tag_value):
@@ -626,7 +699,9 @@ class ScheduleParser:
         if not schedule.get('tz'):
             schedule['tz'] = self.default_schedule['tz']
 
-        # cache
+        # cache, evicting the oldest entry when bounded and full
+        if self.cache_size and len(self.cache) >= self.cache_size:
+            self.cache.pop(next(iter(self.cache)))
         self.cache[tag_value] = schedule
         return schedule
 
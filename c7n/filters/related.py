@@ -11,6 +11,8 @@ from c7n.query import ChildResourceQuery
 class RelatedResourceFilter(ValueFilter):
 
     schema_alias = False
+    # resource_count here counts each resource's related ids
+    set_level = False
 
     RelatedResource = None
     RelatedIdsExpression = None
@@ -28,6 +28,7 @@ class SchemaValidator:
         # mostly useful for interactive debugging
         self.schema = None
         self.validator = None
+        self.element_validator = None
 
     def validate(self, policy_data, resource_types=None):
         # before calling validate, gen_schema needs to be invoked
@@ -39,6 +40,8 @@ class SchemaValidator:
         return errors or []
 
     def _validate(self, policy_data):
+        if self.element_validator.is_valid(policy_data):
+            return schema.check_unique(policy_data) or []
         errors = list(self.validator.iter_errors(policy_data))
         if not errors:
             return schema.check_unique(policy_data) or []
@@ -61,18 +64,19 @@ class SchemaValidator:
         ]))
 
     def gen_schema(self, resource_types):
-        self.validator = v = self._gen_schema(resource_types)
+        self.validator, self.element_validator = self._gen_schema(resource_types)
         # alias for debugging
-        self.schema = v.schema
+        self.schema = self.validator.schema
         return self.validator
 
     @lru_cache(maxsize=32)
     def _gen_schema(self, resource_types):
         if schema is None:
             raise RuntimeError("missing jsonschema dependency")
-        rt_schema = schema.generate(resource_types)
-        schema.JsonSchemaValidator.check_schema(rt_schema)
-        return schema.JsonSchemaValidator(rt_schema)
+        rt_schema = schema.get_schema(
+            resource_types, os.environ.get('C7N_SCHEMA_CACHE'))
+        return (schema.JsonSchemaValidator(rt_schema),
+                schema.ElementValidator(rt_schema))
 
 
 class PolicyLoader:
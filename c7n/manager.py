@@ -4,7 +4,7 @@ from collections import deque
 import logging
 
 from c7n import cache, deprecated
-from c7n.executor import ThreadPoolExecutor
+from c7n.executor import AdaptiveThreadPoolExecutor
 from c7n.provider import clouds
 from c7n.registry import PluginRegistry
 from c7n.resources import load_resources
@@ -36,7 +36,7 @@ class ResourceManager:
 
     filter_registry = None
     action_registry = None
-    executor_factory = ThreadPoolExecutor
+    executor_factory = AdaptiveThreadPoolExecutor
     retry = None
     permissions = ()
 
@@ -7,6 +7,7 @@ a variety of sinks.
 See docs/usage/outputs.rst
 
 """
+from concurrent.futures import as_completed
 import contextlib
 import datetime
 import gzip
@@ -14,11 +15,13 @@ import logging
 import os
 import shutil
 import tempfile
+import threading
 import time
 import uuid
 
 
 from c7n.exceptions import InvalidOutputConfig
+from c7n.executor import ThreadPoolExecutor
 from c7n.registry import PluginRegistry
 from c7n.utils import parse_url_config
 
@@ -433,11 +436,17 @@ class DirectoryOutput:
         # downloading tar and extracting.
         for root, dirs, files in os.walk(self.root_dir):
             for f in files:
-                fp = os.path.join(root, f)
-                with gzip.open(fp + ".gz", "wb", compresslevel=7) as zfh:
-                    with open(fp, "rb") as sfh:
-                        shutil.copyfileobj(sfh, zfh, length=2**15)
-                    os.remove(fp)
+                # resources may already be written as a compressed stream.
+                if f.endswith('.gz'):
+                    continue
+                self.compress_file(os.path.join(root, f))
+
+    def compress_file(self, fp):
+        with gzip.open(fp + ".gz", "wb", compresslevel=7) as zfh:
+            with open(fp, "rb") as sfh:
+                shutil.copyfileobj(sfh, zfh, length=2**15)
+            os.remove(fp)
+        return fp + ".gz"
 
     def get_output_path(self, output_url):
         if '{' not in output_url:
@@ -455,9 +464,27 @@ class DirectoryOutput:
 
 
 class BlobOutput(DirectoryOutput):
+    """Ship policy output files to object storage.
+
+    Files are compressed and uploaded concurrently, with the pool size
+    set via an ``upload_workers`` url parameter. With ``async_upload=true``
+    uploads within a :func:`background_uploads` block happen in the
+    background, so the next policy can start. Elsewhere the upload always
+    completes before the output is closed.
+    """
 
     log = logging.getLogger('custodian.output.blob')
 
+    executor_factory = ThreadPoolExecutor
+    upload_workers = 4
+
+    # background uploads, shared across outputs, pending maps upload
+    # futures to their policy name and is only set within a
+    # background_uploads block.
+    async_executor = None
+    async_lock = threading.Lock()
+    pending = None
+
     def __init__(self, ctx, config):
         self.ctx = ctx
         # we allow format strings in output urls so reparse config
@@ -474,24 +501,90 @@ class BlobOutput(DirectoryOutput):
             self.key_prefix)
 
     def get_output_path(self, output_url):
+        # keep url parameters out of the key path
+        output_url, sep, params = output_url.partition('?')
         if '{' not in output_url:
             date_path = datetime.datetime.utcnow().strftime('%Y/%m/%d/%H')
-            return "/".join([s.strip('/') for s in [
+            output_path = "/".join([s.strip('/') for s in [
                 output_url, self.ctx.policy.name, date_path]])
-        return output_url.format(**self.get_output_vars()).rstrip('/')
+        else:
+            output_path = output_url.format(**self.get_output_vars()).rstrip('/')
+        return output_path + sep + params
 
     def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
+        with self.async_lock:
+            if (BlobOutput.pending is not None and
+                    self.config.get('async_upload', '').lower() in ('true', 'yes')):
+                if BlobOutput.async_executor is None:
+                    BlobOutput.async_executor = self.executor_factory(
+                        max_workers=self.upload_workers)
+                BlobOutput.pending[
+                    BlobOutput.async_executor.submit(self.ship)] = self.ctx.policy.name
+                return
+        return self.ship()
+
+    def ship(self):
         self.log.debug("%s: uploading policy logs", self.type)
-        self.compress()
-        self.upload()
-        shutil.rmtree(self.root_dir)
+        try:
+            self.upload(compress=True)
+        finally:
+            shutil.rmtree(self.root_dir)
         self.log.debug("%s: policy logs uploaded", self.type)
 
-    def upload(self):
-        for root, dirs, files in os.walk(self.root_dir):
-            for f in files:
-                key = "/".join(filter(None, [self.key_prefix, root[len(self.root_dir):], f]))
-                self.upload_file(os.path.join(root, f), key)
+    def upload(self, compress=False):
+        """Upload output files concurrently, optionally compressing them."""
+        paths = [os.path.join(root, f)
+                 for root, dirs, files in os.walk(self.root_dir) for f in files]
+        workers = int(self.config.get('upload_workers', self.upload_workers))
+        with self.executor_factory(max_workers=workers) as w:
+            futures = [w.submit(self.upload_path, p, compress) for p in paths]
+            for f in as_completed(futures):
+                f.result()
+
+    def upload_path(self, path, compress=False):
+        if compress and not path.endswith('.gz'):
+            path = self.compress_file(path)
+        root, f = os.path.split(path)
+        key = "/".join(filter(None, [self.key_prefix, root[len(self.root_dir):], f]))
+        self.upload_file(path, key)
 
     def upload_file(self, path, key):
         raise NotImplementedError("subclass responsibility")
+
+
+def wait_uploads():
+    """Wait for background output uploads, returning the policies whose uploads failed."""
+    with BlobOutput.async_lock:
+        pending = BlobOutput.pending or {}
+        if BlobOutput.pending is not None:
+            BlobOutput.pending = {}
+    failed = []
+    for f in as_completed(pending):
+        if f.exception():
+            failed.append(pending[f])
+            log.error("Error uploading policy:%s output: %s", pending[f], f.exception())
+    return failed
+
+
+@contextlib.contextmanager
+def background_uploads():
+    """Allow outputs to upload in the background for the duration of the block.
+
+    Pending uploads are waited on when the block exits. Yields a list
+    that the outermost block extends with the names of the policies
+    whose uploads failed.
+    """
+    failed = []
+    with BlobOutput.async_lock:
+        nested = BlobOutput.pending is not None
+        if not nested:
+            BlobOutput.pending = {}
+    if nested:
+        yield failed
+        return
+    try:
+        yield failed
+    finally:
+        failed.extend(wait_uploads())
+        with BlobOutput.async_lock:
+            BlobOutput.pending = None
@@ -1,5 +1,6 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import contextlib
 from datetime import datetime
 import json
 import fnmatch
@@ -278,12 +279,12 @@ class PullMode(PolicyExecutionMode):
         if not self.policy.is_runnable():
             return []
 
+        batch_size = self.policy.options.get('stream_batch_size')
+        if batch_size and self.can_stream():
+            return self.run_stream(batch_size)
+
         with self.policy.ctx:
-            self.policy.log.debug(
-                "Running policy:%s resource:%s region:%s c7n:%s",
-                self.policy.name, self.policy.resource_type,
-                self.policy.options.region or 'default',
-                version)
+            self.log_start()
 
             s = time.time()
             try:
@@ -294,19 +295,8 @@ class PullMode(PolicyExecutionMode):
                     'ResourceLimitExceeded', e.selection_count, "Count")
                 raise
 
-            rt = time.time() - s
-            self.policy.log.info(
-                "policy:%s resource:%s region:%s count:%d time:%0.2f" % (
-                    self.policy.name,
-                    self.policy.resource_type,
-                    self.policy.options.region,
-                    len(resources), rt))
-            self.policy.ctx.metrics.put_metric(
-                "ResourceCount", len(resources), "Count", Scope="Policy")
-            self.policy.ctx.metrics.put_metric(
-                "ResourceTime", rt, "Seconds", Scope="Policy")
-            self.policy._write_file(
-                'resources.json', utils.dumps(resources, indent=2))
+            self.record_resources(resources, time.time() - s)
+            self.policy._write_resources(resources)
 
             if not resources:
                 return []
@@ -317,22 +307,80 @@ class PullMode(PolicyExecutionMode):
 
             at = time.time()
             for a in self.policy.resource_manager.actions:
-                s = time.time()
-                with self.policy.ctx.tracer.subsegment('action:%s' % a.type):
-                    results = a.process(resources)
-                self.policy.log.info(
-                    "policy:%s action:%s"
-                    " resources:%d"
-                    " execution_time:%0.2f" % (
-                        self.policy.name, a.name,
-                        len(resources), time.time() - s))
-                if results:
-                    self.policy._write_file(
-                        "action-%s" % a.name, utils.dumps(results))
+                self.process_action(a, resources)
             self.policy.ctx.metrics.put_metric(
                 "ActionTime", time.time() - at, "Seconds", Scope="Policy")
             return resources
 
+    def log_start(self, batch_size=None):
+        self.policy.log.debug(
+            "Running policy:%s resource:%s region:%s c7n:%s%s",
+            self.policy.name, self.policy.resource_type,
+            self.policy.options.region or 'default',
+            version, batch_size and " stream:%d" % batch_size or "")
+
+    def record_resources(self, resources, rt):
+        self.policy.log.info(
+            "policy:%s resource:%s region:%s count:%d time:%0.2f" % (
+                self.policy.name,
+                self.policy.resource_type,
+                self.policy.options.region,
+                len(resources), rt))
+        self.policy.ctx.metrics.put_metric(
+            "ResourceCount", len(resources), "Count", Scope="Policy")
+        self.policy.ctx.metrics.put_metric(
+            "ResourceTime", rt, "Seconds", Scope="Policy")
+
+    def process_action(self, a, resources, results_suffix=""):
+        s = time.time()
+        with self.policy.ctx.tracer.subsegment('action:%s' % a.type):
+            results = a.process(resources)
+        self.policy.log.info(
+            "policy:%s action:%s"
+            " resources:%d"
+            " execution_time:%0.2f" % (
+                self.policy.name, a.name,
+                len(resources), time.time() - s))
+        if results:
+            self.policy._write_file(
+                "action-%s%s" % (a.name, results_suffix), utils.dumps(results))
+
+    def can_stream(self):
+        can_stream = getattr(self.policy.resource_manager, 'can_stream', None)
+        return bool(can_stream and can_stream())
+
+    def run_stream(self, batch_size):
+        """Run the policy over batches of resources as they're fetched.
+
+        Each batch is augmented, filtered and acted upon before the next
+        is fetched, which bounds memory to the matched resources and lets
+        actions start before enumeration completes. A batch's resources
+        are written out before its actions run, and its action results
+        after, with batches past the first numbered, ie. action-tag.2
+        """
+        with self.policy.ctx, self.policy._resource_writer() as write:
+            self.log_start(batch_size)
+
+            s = time.time()
+            resources = []
+            at = 0
+            for idx, batch in enumerate(
+                    self.policy.resource_manager.resources_iter(batch_size), 1):
+                resources.extend(batch)
+                write(batch)
+                if self.policy.options.dryrun:
+                    continue
+                bt = time.time()
+                for a in self.policy.resource_manager.actions:
+                    self.process_action(a, batch, idx > 1 and ".%d" % idx or "")
+                at += time.time() - bt
+
+            self.record_resources(resources, time.time() - s - at)
+            if resources and not self.policy.options.dryrun:
+                self.policy.ctx.metrics.put_metric(
+                    "ActionTime", at, "Seconds", Scope="Policy")
+            return resources
+
 
 class LambdaMode(ServerlessExecutionMode):
     """A policy that runs/executes in lambda."""
@@ -476,8 +524,7 @@ class LambdaMode(ServerlessExecutionMode):
                 self.policy.log.info(
                     "Invoking actions %s", self.policy.resource_manager.actions)
 
-            self.policy._write_file(
-                'resources.json', utils.dumps(resources, indent=2))
+            self.policy._write_resources(resources)
 
             for action in self.policy.resource_manager.actions:
                 self.policy.log.info(
@@ -1220,6 +1267,40 @@ class Policy:
         with open(os.path.join(self.ctx.log_dir, rel_path), 'w') as fh:
             fh.write(value)
 
+    def _write_resources(self, resources):
+        with self._resource_writer() as write:
+            write(resources)
+
+    @contextlib.contextmanager
+    def _resource_writer(self):
+        """Write the policy's resources incrementally, a batch at a time."""
+        if isinstance(self.ctx.output, NullBlobOutput):
+            yield lambda resources: None
+            return
+        resources_file = 'resources.%s' % (self.options.get('resources_format') or 'json')
+        # sources spanning accounts and regions also write resources per account and region
+        partition = getattr(getattr(self.resource_manager, 'source', None), 'partition', None)
+
+        with contextlib.ExitStack() as stack:
+            writers = {}
+
+            def writer(log_dir):
+                if log_dir not in writers:
+                    os.makedirs(log_dir, exist_ok=True)
+                    writers[log_dir] = stack.enter_context(
+                        utils.record_writer(os.path.join(log_dir, resources_file)))
+                return writers[log_dir]
+
+            def write(resources):
+                writer(self.ctx.log_dir)(resources)
+                if partition is None:
+                    return
+                for (account_id, region), presources in partition(resources).items():
+                    writer(os.path.join(self.ctx.log_dir, account_id, region))(presources)
+
+            write([])
+            yield write
+
     def load_resource_manager(self):
         factory = get_resource_class(self.data.get('resource'))
         return factory(self.ctx, self.data)
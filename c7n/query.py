@@ -12,15 +12,18 @@ import json
 
 import jmespath
 import os
+import time
 
 from c7n.actions import ActionRegistry
-from c7n.exceptions import ClientError, ResourceLimitExceeded, PolicyExecutionError
+from c7n.cache import get_snapshots
+from c7n.exceptions import (
+    ClientError, ResourceLimitExceeded, PolicyExecutionError, PolicyValidationError)
 from c7n.filters import FilterRegistry, MetricsFilter
 from c7n.manager import ResourceManager
 from c7n.registry import PluginRegistry
 from c7n.tags import register_ec2_tags, register_universal_tags
 from c7n.utils import (
-    local_session, generate_arn, get_retry, chunks, camelResource)
+    local_session, generate_arn, get_retry, chunks, camelResource, backoff_delays)
 
 
 try:
@@ -54,6 +57,8 @@ class ResourceQuery:
                 p.PAGE_ITERATOR_CLS = RetryPageIterator
             results = p.paginate(**params)
             data = results.build_full_result()
+        elif retry:
+            data = retry(getattr(client, enum_op), **params)
         else:
             op = getattr(client, enum_op)
             data = op(**params)
@@ -64,6 +69,18 @@ class ResourceQuery:
 
         return data
 
+    def _iter_client_enum(self, client, enum_op, params, path, retry=None):
+        if not path or not client.can_paginate(enum_op):
+            yield from self._invoke_client_enum(
+                client, enum_op, params, path, retry) or []
+            return
+        p = client.get_paginator(enum_op)
+        if retry:
+            p.PAGE_ITERATOR_CLS = RetryPageIterator
+        path = jmespath.compile(path)
+        for page in p.paginate(**params):
+            yield from path.search(page) or []
+
     def filter(self, resource_manager, **params):
         """Query a set of resources."""
         m = self.resolve(resource_manager.resource_type)
@@ -76,6 +93,18 @@ class ResourceQuery:
             client, enum_op, params, path,
             getattr(resource_manager, 'retry', None)) or []
 
+    def filter_iter(self, resource_manager, **params):
+        """Query a set of resources, yielding them as each page arrives."""
+        m = self.resolve(resource_manager.resource_type)
+        client = local_session(self.session_factory).client(
+            m.service, resource_manager.config.region)
+        enum_op, path, extra_args = m.enum_spec
+        if extra_args:
+            params.update(extra_args)
+        return self._iter_client_enum(
+            client, enum_op, params, path,
+            getattr(resource_manager, 'retry', None))
+
     def get(self, resource_manager, identities):
         """Get resources by identities
         """
@@ -121,7 +150,23 @@ class ChildResourceQuery(ResourceQuery):
         self.manager = manager
 
     def filter(self, resource_manager, parent_ids=None, **params):
-        """Query a set of resources."""
+        """Query a set of resources.
+
+        Parents are enumerated concurrently, results are returned in
+        parent order.
+        """
+        return self._query(resource_manager, parent_ids, params, ordered=True)
+
+    def filter_iter(self, resource_manager, parent_ids=None, **params):
+        """Query a set of resources, yielding each parent's children as
+        its enumeration completes.
+
+        Ordering across parents is not preserved. Used by child describe
+        sources when a policy's resources are streamed.
+        """
+        return self._query(resource_manager, parent_ids, params, ordered=False)
+
+    def _query(self, resource_manager, parent_ids, params, ordered):
         m = self.resolve(resource_manager.resource_type)
         client = local_session(self.session_factory).client(m.service)
 
@@ -130,39 +175,62 @@ class ChildResourceQuery(ResourceQuery):
             params.update(extra_args)
 
         parent_type, parent_key, annotate_parent = m.parent_spec
-        parents = self.manager.get_resource_manager(parent_type)
+
+        # Handle a query with parent id
+        if parent_key in params:
+            return self._invoke_client_enum(client, enum_op, params, path)
+
         if not parent_ids:
-            parent_ids = []
-            for p in parents.resources(augment=False):
-                if isinstance(p, str):
-                    parent_ids.append(p)
-                else:
-                    parent_ids.append(p[parents.resource_type.id])
+            parent_ids = self.get_parent_ids(parent_type)
 
         # Bail out with no parent ids...
-        existing_param = parent_key in params
-        if not existing_param and len(parent_ids) == 0:
+        if not parent_ids:
             return []
 
-        # Handle a query with parent id
-        if existing_param:
-            return self._invoke_client_enum(client, enum_op, params, path)
-
         # Have to query separately for each parent's children.
-        results = []
-        for parent_id in parent_ids:
-            merged_params = self.get_parent_parameters(params, parent_id, parent_key)
-            subset = self._invoke_client_enum(
-                client, enum_op, merged_params, path, retry=self.manager.retry)
-            if annotate_parent:
-                for r in subset:
-                    r[self.parent_key] = parent_id
-            if subset and self.capture_parent_id:
-                results.extend([(parent_id, s) for s in subset])
-            elif subset:
-                results.extend(subset)
+        results = self._iter_children(
+            client, enum_op, path, params, parent_ids, parent_key,
+            annotate_parent, ordered)
+        if ordered:
+            return list(results)
         return results
 
+    def get_parent_ids(self, parent_type):
+        parents = self.manager.get_resource_manager(parent_type)
+        parent_ids = []
+        for p in parents.resources(augment=False):
+            if isinstance(p, str):
+                parent_ids.append(p)
+            else:
+                parent_ids.append(p[parents.resource_type.id])
+        return parent_ids
+
+    def _iter_children(self, client, enum_op, path, params, parent_ids,
+                       parent_key, annotate_parent, ordered):
+        with self.manager.executor_factory(
+                max_workers=self.manager.max_workers) as w:
+            futures = {}
+            for parent_id in parent_ids:
+                futures[w.submit(
+                    self._invoke_parent_enum, client, enum_op, path,
+                    params, parent_id, parent_key)] = parent_id
+            for f in (ordered and list(futures) or as_completed(futures)):
+                parent_id = futures[f]
+                subset = f.result()
+                if annotate_parent:
+                    for r in subset:
+                        r[self.parent_key] = parent_id
+                for r in subset:
+                    if self.capture_parent_id:
+                        yield (parent_id, r)
+                    else:
+                        yield r
+
+    def _invoke_parent_enum(self, client, enum_op, path, params, parent_id, parent_key):
+        merged_params = self.get_parent_parameters(params, parent_id, parent_key)
+        return self._invoke_client_enum(
+            client, enum_op, merged_params, path, retry=self.manager.retry) or []
+
     def get_parent_parameters(self, params, parent_id, parent_key):
         return dict(params, **{parent_key: parent_id})
 
@@ -204,6 +272,12 @@ def _napi(op_name):
     return op_name.title().replace('_', '')
 
 
+def _defined_by(klass, attr):
+    for k in klass.__mro__:
+        if attr in k.__dict__:
+            return k
+
+
 sources = PluginRegistry('sources')
 
 
@@ -222,6 +296,18 @@ class DescribeSource:
     def resources(self, query):
         return self.query.filter(self.manager, **query)
 
+    def resources_iter(self, query):
+        """Iterate over resources as they're enumerated.
+
+        Falls back to the materialized resource list if the source or
+        its query customizes enumeration without a streaming counterpart.
+        """
+        if (_defined_by(type(self), 'resources') is not DescribeSource or
+                _defined_by(type(self.query), 'filter') is not
+                _defined_by(type(self.query), 'filter_iter')):
+            return iter(self.resources(query))
+        return self.query.filter_iter(self.manager, **query)
+
     def get_query(self):
         return self.resource_query_factory(self.manager.session_factory)
 
@@ -277,29 +363,73 @@ class ChildDescribeSource(DescribeSource):
 class ConfigSource:
 
     retry = staticmethod(get_retry(('ThrottlingException',)))
+    # max resource keys per batch_get_resource_config call
+    batch_size = 100
 
     def __init__(self, manager):
         self.manager = manager
         self.titleCase = self.manager.resource_type.id[0].isupper()
 
     def get_permissions(self):
-        return ["config:GetResourceConfigHistory",
+        return ["config:BatchGetResourceConfig",
+                "config:GetResourceConfigHistory",
                 "config:ListDiscoveredResources"]
 
     def get_resources(self, ids, cache=True):
         client = local_session(self.manager.session_factory).client('config')
+        return self.get_batched_resources(client, ids)
+
+    def get_batched_resources(self, client, ids):
+        """Load resources by id from config, fetching batches of ids concurrently.
+
+        Resources are returned in the order of the given ids, ids not
+        known to config are skipped.
+        """
         results = []
-        m = self.manager.get_model()
-        for i in ids:
+        with self.manager.executor_factory(max_workers=self.manager.max_workers) as w:
+            futures = [
+                w.submit(self.get_resource_batch, client, resource_set)
+                for resource_set in chunks(ids, self.batch_size)]
+            for f in futures:
+                if f.exception():
+                    self.manager.log.error(
+                        "Exception getting resources from config \n %s" % (
+                            f.exception()))
+                results.extend(f.result())
+        return list(filter(None, results))
+
+    def get_resource_batch(self, client, ids):
+        config_type = self.manager.get_model().config_type
+        keys = [{'resourceType': config_type, 'resourceId': i} for i in ids]
+        items = {}
+        delays = backoff_delays(1, 8, jitter=True)
+        while keys:
+            response = self.retry(client.batch_get_resource_config, resourceKeys=keys)
+            for item in response.get('baseConfigurationItems', ()):
+                items[item['resourceId']] = item
+            keys = response.get('unprocessedResourceKeys')
+            delay = next(delays, None)
+            if keys and delay is None:
+                break
+            elif keys:
+                time.sleep(delay)
+
+        resources = {rid: self.load_resource(item) for rid, item in items.items()}
+
+        # fallback to per resource history for keys config wouldn't process,
+        # ids which config doesn't know about aren't returned or unprocessed.
+        # batched items carry tags in their configuration or supplementary
+        # configuration like select results, so resources without tags are
+        # taken as is.
+        for rid in [k['resourceId'] for k in keys or ()]:
             revisions = self.retry(
                 client.get_resource_config_history,
-                resourceId=i,
-                resourceType=m.config_type,
+                resourceId=rid,
+                resourceType=config_type,
                 limit=1).get('configurationItems')
-            if not revisions:
-                continue
-            results.append(self.load_resource(revisions[0]))
-        return list(filter(None, results))
+            if revisions:
+                resources[rid] = self.load_resource(revisions[0])
+        return [resources[i] for i in ids if i in resources]
 
     def get_query_params(self, query):
         """Parse config select expression from policy and parameter.
@@ -379,27 +509,14 @@ class ConfigSource:
         paginator.PAGE_ITERATOR_CLS = RetryPageIterator
         pages = paginator.paginate(
             resourceType=self.manager.get_model().config_type)
-        results = []
-
-        with self.manager.executor_factory(max_workers=2) as w:
-            ridents = pages.build_full_result()
-            resource_ids = [
-                r['resourceId'] for r in ridents.get('resourceIdentifiers', ())]
-            self.manager.log.debug(
-                "querying %d %s resources",
-                len(resource_ids),
-                self.manager.__class__.__name__.lower())
-
-            for resource_set in chunks(resource_ids, 50):
-                futures = []
-                futures.append(w.submit(self.get_resources, resource_set))
-                for f in as_completed(futures):
-                    if f.exception():
-                        self.manager.log.error(
-                            "Exception getting resources from config \n %s" % (
-                                f.exception()))
-                    results.extend(f.result())
-        return results
+        ridents = pages.build_full_result()
+        resource_ids = [
+            r['resourceId'] for r in ridents.get('resourceIdentifiers', ())]
+        self.manager.log.debug(
+            "querying %d %s resources",
+            len(resource_ids),
+            self.manager.__class__.__name__.lower())
+        return self.get_batched_resources(client, resource_ids)
 
     def resources(self, query=None):
         client = local_session(self.manager.session_factory).client('config')
@@ -427,6 +544,116 @@ class ConfigSource:
         return resources
 
 
+@sources.register('config-aggregator')
+class ConfigAggregatorSource:
+    """Query resources across accounts and regions via a config aggregator.
+
+    A single select query against the aggregator replaces querying
+    each account and region, resources are annotated with their
+    account and region, and written out per account and region
+    alongside the policy's resources.
+
+    .. code-block:: yaml
+
+      policies:
+        - name: org-unencrypted-volumes
+          resource: aws.ebs
+          source: config-aggregator
+          query:
+            - aggregator: org
+            - clause: "configuration.encrypted = false"
+
+    As resources are loaded in the aggregator's account, policies
+    using this source are read only, ie. they can't have actions.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        # resource types customize loading of config items via their config source.
+        self.config_source = manager.get_source('config')
+
+    def get_permissions(self):
+        return ["config:SelectAggregateResourceConfig"]
+
+    def validate(self):
+        if not self.manager.resource_type.config_type:
+            raise PolicyValidationError(
+                "policy:%s AWS Config does not support resource-type:%s" % (
+                    self.manager.data.get('name'), self.manager.type))
+        if not self.get_query_params(None)['aggregator']:
+            raise PolicyValidationError(
+                "policy:%s config-aggregator source requires an aggregator query" % (
+                    self.manager.data.get('name')))
+        if self.manager.data.get('actions'):
+            raise PolicyValidationError(
+                "policy:%s config-aggregator source doesn't support actions" % (
+                    self.manager.data.get('name')))
+        if self.manager.data.get('mode', {}).get('type', 'pull') != 'pull':
+            raise PolicyValidationError(
+                "policy:%s config-aggregator source only supports pull mode" % (
+                    self.manager.data.get('name')))
+
+    def get_resources(self, ids, cache=True):
+        raise PolicyExecutionError(
+            "config-aggregator source doesn't support getting resources by id")
+
+    def get_query_params(self, query):
+        """Parse the aggregator and config select expression from the policy.
+
+        Supports the same expr and clause queries as the config source,
+        a full expression must select accountId and awsRegion.
+        """
+        if query:
+            return query
+        params = {}
+        for q in self.manager.data.get('query', ()):
+            params.update(q)
+
+        expr = params.get('expr')
+        if not expr:
+            expr = ("select resourceId, accountId, awsRegion, configuration, "
+                    "supplementaryConfiguration where resourceType = '{}'").format(
+                        self.manager.resource_type.config_type)
+            if params.get('clause'):
+                expr += " AND {}".format(params['clause'])
+        return {'aggregator': params.get('aggregator'), 'expr': expr}
+
+    def load_resource(self, item):
+        resource = self.config_source.load_resource(item)
+        resource['c7n:AccountId'] = item['accountId']
+        resource['c7n:Region'] = item['awsRegion']
+        return resource
+
+    def resources_iter(self, query):
+        client = local_session(self.manager.session_factory).client('config')
+        query = self.get_query_params(query)
+        pager = Paginator(
+            client.select_aggregate_resource_config,
+            {'input_token': 'NextToken', 'output_token': 'NextToken',
+             'result_key': 'Results'},
+            client.meta.service_model.operation_model('SelectAggregateResourceConfig'))
+        pager.PAGE_ITERATOR_CLS = RetryPageIterator
+
+        for page in pager.paginate(
+                ConfigurationAggregatorName=query['aggregator'],
+                Expression=query['expr']):
+            for r in page['Results']:
+                yield self.load_resource(json.loads(r))
+
+    def resources(self, query=None):
+        return list(self.resources_iter(query))
+
+    def partition(self, resources):
+        """Group resources by their account and region."""
+        groups = {}
+        for r in resources:
+            groups.setdefault((r['c7n:AccountId'], r['c7n:Region']), []).append(r)
+        return groups
+
+    def augment(self, resources):
+        return resources
+
+
 class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
 
     resource_type = ""
@@ -488,6 +715,10 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
             return [i for i in ids if i.startswith(id_prefix)]
         return ids
 
+    def validate(self):
+        if hasattr(self.source, 'validate'):
+            self.source.validate()
+
     def get_permissions(self):
         perms = self.source.get_permissions()
         if getattr(self, 'permissions', None):
@@ -504,10 +735,85 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
         }
 
     def resources(self, query=None, augment=True):
+        query = self.source.get_query_params(query)
+        cache_key = self.get_cache_key(query)
+        snapshots = augment and get_snapshots() or None
+
+        if snapshots is None:
+            resources = self._fetch_resources(query, cache_key, augment)
+        else:
+            execution_id = self.ctx.execution_id
+            with snapshots.key_lock(cache_key):
+                resources = snapshots.get(cache_key, execution_id)
+                if resources is None:
+                    resources = snapshots.save(
+                        cache_key,
+                        self._fetch_resources(query, cache_key, augment),
+                        execution_id)
+                else:
+                    self.log.debug("Using run snapshot %s: %d" % (
+                        "%s.%s" % (self.__class__.__module__,
+                                   self.__class__.__name__),
+                        len(resources)))
+
+        resource_count = len(resources)
+        with self.ctx.tracer.subsegment('filter'):
+            resources = self.filter_resources(resources)
+
+        # Check if we're out of a policies execution limits.
+        if self.data == self.ctx.policy.data:
+            self.check_resource_limit(len(resources), resource_count)
+        return resources
+
+    def can_stream(self):
+        """Whether the policy's resources can be processed as a stream of batches.
+
+        Requires the default resource enumeration, no set level filters
+        (ie. reduce), and no resource limits as those are relative to
+        the whole population.
+        """
+        if (_defined_by(type(self), 'resources') is not
+                _defined_by(type(self), 'resources_iter')):
+            return False
+        if not hasattr(self.source, 'resources_iter'):
+            return False
+        if self.data == self.ctx.policy.data and (
+                'max-resources' in self.data or 'max-resources-percent' in self.data):
+            return False
+        return not any(f.set_level for f in self.iter_filters())
+
+    def resources_iter(self, batch_size, query=None):
+        """Yield augmented and filtered resources in batches.
+
+        Pages flow from the source through augmentation and filtering
+        at most batch_size resources at a time, without materializing
+        the full resource population. Run snapshots and cached resources
+        are used if available, those are already augmented. Streamed
+        resources are not written to either.
+        """
         query = self.source.get_query_params(query)
         cache_key = self.get_cache_key(query)
         resources = None
+        snapshots = get_snapshots()
+        if snapshots is not None:
+            resources = snapshots.get(cache_key, self.ctx.execution_id)
+        if resources is None and self._cache.load():
+            resources = self._cache.get(cache_key)
+        augment = resources is None
+        if augment:
+            resources = self.source.resources_iter(query or {})
+
+        for batch in chunks(resources, batch_size):
+            if augment:
+                with self.ctx.tracer.subsegment('resource-augment'):
+                    batch = self.augment(batch)
+            with self.ctx.tracer.subsegment('filter'):
+                batch = self.filter_resources(batch)
+            if batch:
+                yield batch
 
+    def _fetch_resources(self, query, cache_key, augment):
+        resources = None
         if self._cache.load():
             resources = self._cache.get(cache_key)
             if resources is not None:
@@ -526,14 +832,6 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
                     resources = self.augment(resources)
                 # Don't pollute cache with unaugmented resources.
                 self._cache.save(cache_key, resources)
-
-        resource_count = len(resources)
-        with self.ctx.tracer.subsegment('filter'):
-            resources = self.filter_resources(resources)
-
-        # Check if we're out of a policies execution limits.
-        if self.data == self.ctx.policy.data:
-            self.check_resource_limit(len(resources), resource_count)
         return resources
 
     def check_resource_limit(self, selection_count, population_count):
@@ -0,0 +1,218 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Client side api rate limiting.
+
+A process wide token bucket limiter applied to every aws client created
+by a :class:`c7n.credentials.SessionFactory`, via a before-call event
+handler installed as a session subscriber. Rates are expressed as calls
+per second and keyed by ``service.Operation``, ``service`` or
+``default``, with the most specific match selecting the bucket. Buckets
+are per account and region.
+
+With a state directory configured, bucket state is kept in files
+guarded by an advisory lock so multiple worker processes (ie. c7n-org)
+running against the same account share a budget.
+"""
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+log = logging.getLogger('custodian.ratelimit')
+
+# Documented ec2 refill rate for non mutating (describe) actions.
+DEFAULT_RATES = {
+    'ec2': 20,
+}
+
+
+def parse_rate(value):
+    """Parse a ``key=calls-per-second`` rate specification."""
+    key, sep, rate = value.partition('=')
+    try:
+        rate = float(rate)
+    except ValueError:
+        rate = 0
+    if not key or not sep or rate <= 0:
+        raise ValueError(
+            "invalid rate limit %r expected key=calls-per-second" % value)
+    return key, rate
+
+
+class TokenBucket:
+    """Thread safe token bucket.
+
+    Holds up to ``burst`` tokens, refilled at ``rate`` tokens per second.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.stamp = time.time()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, blocking till one is available."""
+        while True:
+            wait = self.take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def take(self):
+        """Take a token if available, else return the seconds to wait."""
+        with self.lock:
+            self.tokens, self.stamp, wait = self.refill(self.tokens, self.stamp)
+        return wait
+
+    def refill(self, tokens, stamp):
+        now = time.time()
+        tokens = min(self.burst, tokens + max(0, now - stamp) * self.rate)
+        if tokens >= 1:
+            return tokens - 1, now, 0
+        return tokens, now, (1 - tokens) / self.rate
+
+
+class FileTokenBucket(TokenBucket):
+    """Token bucket with state in a file shared across processes."""
+
+    def __init__(self, path, rate, burst=None):
+        super().__init__(rate, burst)
+        self.path = path
+
+    def take(self):
+        with self.lock, open(self.path, 'a+') as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                fh.seek(0)
+                try:
+                    tokens, stamp = json.loads(fh.read())
+                except ValueError:
+                    tokens, stamp = self.burst, time.time()
+                tokens, stamp, wait = self.refill(tokens, stamp)
+                fh.seek(0)
+                fh.truncate()
+                fh.write(json.dumps([tokens, stamp]))
+                fh.flush()
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+        return wait
+
+
+class RateLimiter:
+    """Process wide api rate limiter.
+
+    Disabled until configured, policies may still supply overrides for
+    the duration of their execution.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.enabled = False
+        self.rates = dict(DEFAULT_RATES)
+        self.overrides = []
+        self.state_dir = None
+        self.buckets = {}
+
+    def configure(self, rates=(), state_dir=None):
+        """Enable the limiter with the given rates and state directory.
+
+        Rates may be a mapping or a sequence of ``key=rate`` strings.
+        """
+        if not rates and not state_dir:
+            return
+        if not isinstance(rates, dict):
+            rates = dict(parse_rate(r) for r in rates)
+        if state_dir and fcntl is None:
+            log.warning("rate limit state directory not supported on this platform")
+            state_dir = None
+        with self.lock:
+            self.enabled = True
+            self.rates.update(rates)
+            if state_dir:
+                os.makedirs(state_dir, exist_ok=True)
+                self.state_dir = state_dir
+
+    @contextlib.contextmanager
+    def override(self, rates):
+        """Apply rate overrides (ie. from a policy) within the block."""
+        if not rates:
+            yield
+            return
+        self.overrides.append(rates)
+        try:
+            yield
+        finally:
+            self.overrides.remove(rates)
+
+    def get_rate(self, service, operation):
+        """Return the most specific (key, rate) for an api call."""
+        for rates in reversed(self.overrides):
+            match = self.match_rate(rates, service, operation)
+            if match[0]:
+                return match
+        if not self.enabled:
+            return None, None
+        return self.match_rate(self.rates, service, operation)
+
+    @staticmethod
+    def match_rate(rates, service, operation):
+        for k in ("%s.%s" % (service, operation), service, 'default'):
+            if k in rates:
+                return k, rates[k]
+        return None, None
+
+    def get_bucket(self, account_id, region, key, rate):
+        bucket_key = (account_id, region, key)
+        with self.lock:
+            bucket = self.buckets.get(bucket_key)
+            if bucket is None:
+                if self.state_dir:
+                    bucket = FileTokenBucket(os.path.join(
+                        self.state_dir, "%s-%s-%s.json" % (
+                            account_id or 'default', region or 'global', key)),
+                        rate)
+                else:
+                    bucket = TokenBucket(rate)
+                self.buckets[bucket_key] = bucket
+            elif bucket.rate != rate:
+                bucket.rate = rate
+                bucket.burst = max(1.0, rate)
+        return bucket
+
+    def acquire(self, account_id, region, service, operation):
+        key, rate = self.get_rate(service, operation)
+        if key is None:
+            return
+        self.get_bucket(account_id, region, key, rate).acquire()
+
+    def subscriber(self, account_id=None):
+        """A session factory subscriber limiting calls for an account."""
+        return functools.partial(self.register, account_id)
+
+    def register(self, account_id, session):
+        session.events.register(
+            'before-call.*.*', functools.partial(self._before_call, account_id),
+            unique_id='c7n-rate-limit')
+
+    def _before_call(self, account_id, model, context, **kwargs):
+        self.acquire(
+            account_id, context.get('client_region'),
+            model.service_model.endpoint_prefix, model.name)
+
+
+limiter = RateLimiter()
@@ -1,5 +1,6 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import importlib
 
 
 class PluginRegistry:
@@ -67,6 +68,15 @@ class PluginRegistry:
             return klass
         return _register_class
 
+    def register_lazy(self, name, path):
+        """Register a plugin by its dotted class path.
+
+        The plugin's module is only imported on first lookup of the
+        plugin, or when enumerating the registry's values.
+        """
+        if name not in self._factories:
+            self._factories[name] = path
+
     def unregister(self, name):
         if name in self._factories:
             del self._factories[name]
@@ -89,19 +99,45 @@ class PluginRegistry:
 
     def get(self, name):
         factory = self._factories.get(name)
+        if isinstance(factory, str):
+            factory = self._resolve(name)
 
         if factory:
             return factory
 
         return next((v for k, v in self._factories.items()
-                     if v.type_aliases and name in v.type_aliases),
+                     if not isinstance(v, str) and v.type_aliases and name in v.type_aliases),
                     None)
 
+    def _resolve(self, name):
+        module_name, class_name = self._factories[name].rsplit('.', 1)
+        klass = getattr(importlib.import_module(module_name), class_name)
+        if isinstance(self._factories[name], str):
+            klass.type = name
+            klass.type_aliases = getattr(klass, 'type_aliases', None)
+            self._factories[name] = klass
+        return self._factories[name]
+
+    def paths(self):
+        """Return the dotted class path of each plugin, without importing them."""
+        return {
+            k: isinstance(v, str) and v or "%s.%s" % (v.__module__, v.__qualname__)
+            for k, v in self._factories.items()}
+
+    def lazy_paths(self):
+        """Return the dotted class path of each plugin not yet imported."""
+        return {k: v for k, v in self._factories.items() if isinstance(v, str)}
+
     def keys(self):
         return self._factories.keys()
 
     def values(self):
+        self.items()
         return self._factories.values()
 
     def items(self):
+        for k in list(self._factories):
+            # resolving one plugin may import and register others
+            if isinstance(self._factories[k], str):
+                self._resolve(k)
         return self._factories.items()
@@ -28,23 +28,30 @@ CLI Usage
 
 
 """
-from concurrent.futures import as_completed
-
+import collections
 import csv
 from datetime import datetime
 import gzip
+import hashlib
+import heapq
 import io
-import json
+import itertools
 import jmespath
+import json
 import logging
+import operator
 import os
+import shutil
+import sys
+import tempfile
+import threading
 from tabulate import tabulate
 
 from botocore.compat import OrderedDict
 from dateutil.parser import parse as date_parse
 
 from c7n.executor import ThreadPoolExecutor
-from c7n.utils import local_session, dumps
+from c7n.utils import DateTimeEncoder, local_session, iter_records, load_records
 
 log = logging.getLogger('custodian.reports')
 
@@ -64,7 +71,12 @@ def strip_output_path(path, policy_name):
 
 
 def report(policies, start_date, options, output_fh, raw_output_fh=None):
-    """Format a policy's extant records into a report."""
+    """Format a policy's extant records into a report.
+
+    Records are streamed newest first across all policies, rows are
+    written as they are de-duplicated rather than after collecting the
+    full history.
+    """
     regions = {p.options.region for p in policies}
     policy_names = {p.name for p in policies}
     formatter = Formatter(
@@ -75,41 +87,80 @@ def report(policies, start_date, options, output_fh, raw_output_fh=None):
         include_policy=len(policy_names) > 1
     )
 
-    records = []
-    for policy in policies:
-        # initialize policy execution context for output access
-        policy.ctx.initialize()
-        if policy.ctx.output.type == 's3':
-            policy_records = record_set(
-                policy.session_factory,
-                policy.ctx.output.config['netloc'],
-                strip_output_path(policy.ctx.output.config['path'], policy.name),
-                start_date)
-        else:
-            policy_records = fs_record_set(policy.ctx.log_dir, policy.name)
+    records = heapq.merge(
+        *[policy_records(p, start_date, getattr(options, 'record_cache', None))
+          for p in policies],
+        key=operator.itemgetter('CustodianDate'), reverse=True)
 
-        log.debug("Found %d records for region %s", len(policy_records), policy.options.region)
-
-        for record in policy_records:
-            record['policy'] = policy.name
-            record['region'] = policy.options.region
-
-        records += policy_records
+    writers = []
+    if raw_output_fh is not None:
+        writers.append(RecordWriter(raw_output_fh))
+    if options.format == 'json':
+        writers.append(RecordWriter(sys.stdout))
+    if writers:
+        records = tee_records(records, writers)
 
-    rows = formatter.to_csv(records, unique=not options.all_findings)
+    rows = formatter.iter_csv(records, unique=not options.all_findings)
 
     if options.format == 'csv':
         writer = csv.writer(output_fh, formatter.headers(), quoting=csv.QUOTE_ALL)
         writer.writerow(formatter.headers())
         writer.writerows(rows)
     elif options.format == 'json':
-        print(dumps(records, indent=2))
+        # records are written as they stream by
+        collections.deque(records, maxlen=0)
     else:
         # We special case CSV, and for other formats we pass to tabulate
-        print(tabulate(rows, formatter.headers(), tablefmt=options.format))
+        print(tabulate(list(rows), formatter.headers(), tablefmt=options.format))
+
+    for w in writers:
+        w.close()
+
+
+def policy_records(policy, start_date, cache_dir=None):
+    """Stream a policy's records newest first, annotated with policy and region."""
+    # initialize policy execution context for output access
+    policy.ctx.initialize()
+    if policy.ctx.output.type == 's3':
+        records = iter_record_set(
+            policy.session_factory,
+            policy.ctx.output.config['netloc'],
+            strip_output_path(policy.ctx.output.config['path'], policy.name),
+            start_date,
+            cache_dir=cache_dir)
+    else:
+        records = fs_record_set(policy.ctx.log_dir, policy.name)
+        log.debug("Found %d records for region %s", len(records), policy.options.region)
 
-    if raw_output_fh is not None:
-        dumps(records, raw_output_fh, indent=2)
+    for record in records:
+        record['policy'] = policy.name
+        record['region'] = policy.options.region
+        yield record
+
+
+def tee_records(records, writers):
+    for r in records:
+        for w in writers:
+            w.write(r)
+        yield r
+
+
+class RecordWriter:
+    """Incrementally write records as a json array."""
+
+    def __init__(self, fh, indent=2):
+        self.fh = fh
+        self.encoder = DateTimeEncoder(indent=indent)
+        self.count = 0
+
+    def write(self, record):
+        self.fh.write(self.count and ',\n' or '[\n')
+        self.fh.write(self.encoder.encode(record))
+        self.count += 1
+
+    def close(self):
+        self.fh.write(self.count and '\n]\n' or '[]\n')
+        self.fh.flush()
 
 
 def _get_values(record, field_list, tag_map):
@@ -200,6 +251,21 @@ class Formatter:
                 keys.add(rec_id)
         return uniq
 
+    def iter_csv(self, records, unique=True):
+        """Rows for records already ordered newest first.
+
+        Unlike :meth:`to_csv` this doesn't hold the records, when
+        uniquing only a digest per seen id is kept.
+        """
+        seen = ResourceIds()
+        count = 0
+        for rec in records:
+            count += 1
+            if unique and not seen.add(rec[self._id_field]):
+                continue
+            yield self.extract_csv(rec)
+        log.debug("Selected %d of %d record(s)", len(seen) if unique else count, count)
+
     def to_csv(self, records, reverse=True, unique=True):
         if not records:
             return []
@@ -221,19 +287,45 @@ class Formatter:
         return rows
 
 
-def fs_record_set(output_path, policy_name):
-    record_path = os.path.join(output_path, 'resources.json')
+class ResourceIds:
+    """A compact set of resource ids, storing an 8 byte digest per id."""
 
-    if not os.path.exists(record_path):
+    def __init__(self):
+        self.digests = set()
+
+    def __len__(self):
+        return len(self.digests)
+
+    def add(self, rid):
+        """Add an id, returning false if it was already present."""
+        digest = int.from_bytes(
+            hashlib.blake2b(str(rid).encode('utf8'), digest_size=8).digest(), 'big')
+        if digest in self.digests:
+            return False
+        self.digests.add(digest)
+        return True
+
+
+RECORD_FILES = (
+    'resources.json', 'resources.json.gz', 'resources.jsonl', 'resources.jsonl.gz')
+
+
+def fs_record_set(output_path, policy_name):
+    for record_file in RECORD_FILES:
+        record_path = os.path.join(output_path, record_file)
+        if os.path.exists(record_path):
+            break
+    else:
         return []
 
     mdate = datetime.fromtimestamp(
         os.stat(record_path).st_ctime)
 
-    with open(record_path) as fh:
-        records = json.load(fh)
-        [r.__setitem__('CustodianDate', mdate) for r in records]
-        return records
+    records = []
+    for r in load_records(record_path):
+        r['CustodianDate'] = mdate
+        records.append(r)
+    return records
 
 
 def record_set(session_factory, bucket, key_prefix, start_date, specify_hour=False):
@@ -241,12 +333,50 @@ def record_set(session_factory, bucket, key_prefix, start_date, specify_hour=Fal
 
     From the given start date.
     """
+    records = list(iter_record_set(
+        session_factory, bucket, key_prefix, start_date, specify_hour))
+    log.info("Fetched %d records", len(records))
+    return records
 
-    s3 = local_session(session_factory).client('s3')
 
-    records = []
-    key_count = 0
+def iter_record_set(session_factory, bucket, key_prefix, start_date,
+                    specify_hour=False, cache_dir=None, window=20):
+    """Stream s3 records for the given policy output url, newest first.
 
+    Objects are fetched concurrently, up to ``window`` ahead of the
+    object being decoded, and spooled to local files. With a
+    ``cache_dir`` the local copies are kept along with an index of their
+    etags, so subsequent reports only fetch new or changed objects.
+    """
+    s3 = local_session(session_factory).client('s3')
+    keys = sorted(
+        list_record_keys(s3, bucket, key_prefix, start_date, specify_hour),
+        key=lambda k: key_date(k['Key']), reverse=True)
+
+    cache = RecordCache(cache_dir or tempfile.mkdtemp(), persist=bool(cache_dir))
+    key_iter = iter(keys)
+    try:
+        with ThreadPoolExecutor(max_workers=window) as w:
+            pending = collections.deque(
+                (k, w.submit(cache.fetch, s3, bucket, k))
+                for k in itertools.islice(key_iter, window))
+            while pending:
+                key, future = pending.popleft()
+                for k in itertools.islice(key_iter, 1):
+                    pending.append((k, w.submit(cache.fetch, s3, bucket, k)))
+                custodian_date = key_date(key['Key'])
+                count = 0
+                for r in load_records(future.result()):
+                    r['CustodianDate'] = custodian_date
+                    count += 1
+                    yield r
+                log.debug("bucket: %s key: %s records: %d", bucket, key['Key'], count)
+    finally:
+        cache.close()
+    log.debug("Streamed records across %d files", len(keys))
+
+
+def list_record_keys(s3, bucket, key_prefix, start_date, specify_hour=False):
     date = start_date.strftime('%Y/%m/%d')
     if specify_hour:
         date += "/{}".format(start_date.hour)
@@ -260,41 +390,70 @@ def record_set(session_factory, bucket, key_prefix, start_date, specify_hour=Fal
         Prefix=key_prefix.strip('/') + '/',
         StartAfter=marker,
     )
+    for key_set in p:
+        for k in key_set.get('Contents', ()):
+            if k['Key'].endswith(('resources.json.gz', 'resources.jsonl.gz')):
+                yield k
 
-    with ThreadPoolExecutor(max_workers=20) as w:
-        for key_set in p:
-            if 'Contents' not in key_set:
-                continue
-            keys = [k for k in key_set['Contents']
-                    if k['Key'].endswith('resources.json.gz')]
-            key_count += len(keys)
-            futures = map(lambda k: w.submit(
-                get_records, bucket, k, session_factory), keys)
-
-            for f in as_completed(futures):
-                records.extend(f.result())
 
-    log.info("Fetched %d records across %d files" % (
-        len(records), key_count))
-    return records
+def key_date(key):
+    # key ends with 'YYYY/mm/dd/HH/resources.json.gz'
+    # so take the date parts only
+    return date_parse('-'.join(key.rsplit('/', 5)[-5:-1]))
+
+
+class RecordCache:
+    """Local copies of report objects, indexed by key and etag."""
+
+    index_file = 'index.json'
+
+    def __init__(self, cache_dir, persist=True):
+        self.cache_dir = cache_dir
+        self.persist = persist
+        self.index = {}
+        self.lock = threading.Lock()
+        index_path = os.path.join(cache_dir, self.index_file)
+        if persist and os.path.exists(index_path):
+            with open(index_path) as fh:
+                self.index = json.load(fh)
+
+    def fetch(self, s3, bucket, key):
+        """Return a local path for the object, fetching it if not cached."""
+        path = os.path.join(self.cache_dir, bucket, key['Key'])
+        index_key = "%s/%s" % (bucket, key['Key'])
+        with self.lock:
+            cached = self.index.get(index_key) == key.get('ETag')
+        if cached and os.path.exists(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        result = s3.get_object(Bucket=bucket, Key=key['Key'])
+        with open(path + '.tmp', 'wb') as fh:
+            shutil.copyfileobj(result['Body'], fh)
+        os.replace(path + '.tmp', path)
+        with self.lock:
+            self.index[index_key] = key.get('ETag')
+        return path
+
+    def close(self):
+        if not self.persist:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            return
+        with self.lock:
+            with open(os.path.join(self.cache_dir, self.index_file), 'w') as fh:
+                json.dump(self.index, fh)
 
 
 def get_records(bucket, key, session_factory):
-    # we're doing a lot of this in memory, worst case
-    # though we're talking about a 10k objects, else
-    # we should spool to temp files
-
-    # key ends with 'YYYY/mm/dd/HH/resources.json.gz'
-    # so take the date parts only
-    date_str = '-'.join(key['Key'].rsplit('/', 5)[-5:-1])
-    custodian_date = date_parse(date_str)
+    custodian_date = key_date(key['Key'])
     s3 = local_session(session_factory).client('s3')
     result = s3.get_object(Bucket=bucket, Key=key['Key'])
-    blob = io.BytesIO(result['Body'].read())
 
-    records = json.load(gzip.GzipFile(fileobj=blob))
+    # decode records as the body streams in, json array or json lines.
+    records = []
+    with io.TextIOWrapper(gzip.GzipFile(fileobj=result['Body'])) as fh:
+        for r in iter_records(fh):
+            r['CustodianDate'] = custodian_date
+            records.append(r)
     log.debug("bucket: %s key: %s records: %d",
               bucket, key['Key'], len(records))
-    for r in records:
-        r['CustodianDate'] = custodian_date
     return records
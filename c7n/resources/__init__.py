@@ -62,12 +62,10 @@ def load_available(resources=True):
 def load_providers(provider_types):
     global LOADED
 
-    # Even though we're lazy loading resources we still need to import
+    # Even though we're lazy loading resources we still need to register
     # those that are making available generic filters/actions
     if should_load_provider('aws', provider_types):
-        import c7n.resources.securityhub
-        import c7n.resources.sfn
-        import c7n.resources.ssm # NOQA
+        register_element_map()
 
     if should_load_provider('awscc', provider_types):
         from c7n_awscc.entry import initialize_awscc
@@ -93,3 +91,31 @@ def load_providers(provider_types):
         from c7n import data  # noqa
 
     LOADED.update(provider_types)
+
+
+def register_element_map():
+    """Lazily register the aws generic filters, actions and modes.
+
+    Their modules are imported on first use of one of their elements,
+    see tools/dev/elementmap.py for generating the element map.
+    """
+    from c7n.policy import execution
+    from c7n.resources.aws import AWS
+    from c7n.resources.element_map import ElementMap
+
+    for name, path in ElementMap['modes'].items():
+        execution.register_lazy(name, path)
+
+    def register_elements(registry, resource_class):
+        groups = ['*', 'aws.%s' % resource_class.type]
+        if resource_class.has_arn():
+            groups.insert(1, 'arn')
+        for group in groups:
+            for key, path in ElementMap.get(group, {}).items():
+                kind, name = key.split('.', 1)
+                element_registry = (
+                    kind == 'filters' and resource_class.filter_registry or
+                    resource_class.action_registry)
+                element_registry.register_lazy(name, path)
+
+    AWS.resources.subscribe(register_elements)
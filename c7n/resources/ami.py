@@ -12,6 +12,7 @@ from c7n.filters import (
     AgeFilter, Filter, CrossAccountAccessFilter)
 from c7n.manager import resources
 from c7n.query import QueryResourceManager, DescribeSource, TypeInfo
+from c7n.resources.references import ReferenceGraph
 from c7n.resolver import ValuesFrom
 from c7n.utils import local_session, type_schema, chunks, merge_dict_list
 
@@ -304,29 +305,21 @@ class ImageUnusedFilter(Filter):
             self.manager.get_resource_manager(m).get_permissions()
             for m in ('asg', 'launch-config', 'ec2')]))
 
-    def _pull_asg_images(self):
-        asgs = self.manager.get_resource_manager('asg').resources()
-        image_ids = set()
-        lcfgs = set(a['LaunchConfigurationName'] for a in asgs if 'LaunchConfigurationName' in a)
-        lcfg_mgr = self.manager.get_resource_manager('launch-config')
-
+    def _pull_asg_images(self, graph):
+        image_ids = graph.referenced('asg-template-image')
+        lcfgs = graph.get('asg-launch-config')
         if lcfgs:
-            image_ids.update([
-                lcfg['ImageId'] for lcfg in lcfg_mgr.resources()
-                if lcfg['LaunchConfigurationName'] in lcfgs])
-
-        tmpl_mgr = self.manager.get_resource_manager('launch-template-version')
-        for tversion in tmpl_mgr.get_resources(
-                list(tmpl_mgr.get_asg_templates(asgs).keys())):
-            image_ids.add(tversion['LaunchTemplateData'].get('ImageId'))
+            image_ids.update(
+                image_id for image_id, lcs in graph.get('launch-config-image').items()
+                if not lcs.isdisjoint(lcfgs))
         return image_ids
 
-    def _pull_ec2_images(self):
-        ec2_manager = self.manager.get_resource_manager('ec2')
-        return {i['ImageId'] for i in ec2_manager.resources()}
+    def _pull_ec2_images(self, graph):
+        return graph.referenced('ec2-image')
 
     def process(self, resources, event=None):
-        images = self._pull_ec2_images().union(self._pull_asg_images())
+        graph = ReferenceGraph(self.manager)
+        images = self._pull_ec2_images(graph).union(self._pull_asg_images(graph))
         if self.data.get('value', True):
             return [r for r in resources if r['ImageId'] not in images]
         return [r for r in resources if r['ImageId'] in images]
@@ -18,6 +18,7 @@ import c7n.filters.vpc as net_filters
 
 from c7n.manager import resources
 from c7n import query
+from c7n.resources.references import ReferenceGraph
 from c7n.resources.securityhub import PostFinding
 from c7n.tags import TagActionFilter, DEFAULT_TAG, TagCountFilter, TagTrim, TagDelayedAction
 from c7n.utils import (
@@ -1806,9 +1807,7 @@ class UnusedLaunchConfig(Filter):
         return self.manager.get_resource_manager('asg').get_permissions()
 
     def process(self, configs, event=None):
-        asgs = self.manager.get_resource_manager('asg').resources()
-        used = {a.get('LaunchConfigurationName', a['AutoScalingGroupName'])
-                for a in asgs if not a.get('LaunchTemplate')}
+        used = ReferenceGraph(self.manager).get('asg-launch-config')
         return [c for c in configs if c['LaunchConfigurationName'] not in used]
 
 
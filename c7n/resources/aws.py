@@ -4,26 +4,25 @@
 from c7n.provider import clouds, Provider
 
 from collections import Counter, namedtuple
-import contextlib
+from concurrent.futures import as_completed
 import copy
 import datetime
+import importlib.util
 import itertools
 import logging
 import os
 import operator
 import sys
 import time
-import threading
-import traceback
 
 import boto3
 
 from botocore.validate import ParamValidator
-from boto3.s3.transfer import S3Transfer
+from boto3.s3.transfer import S3Transfer, TransferConfig
 
 from c7n.credentials import SessionFactory
-from c7n.config import Bag
 from c7n.exceptions import PolicyValidationError
+from c7n.executor import concurrency
 from c7n.log import CloudWatchLogHandler
 
 from .resource_map import ResourceMap
@@ -46,17 +45,22 @@ from c7n.output import (
 )
 
 from c7n.registry import PluginRegistry
-from c7n import credentials, utils
+from c7n import credentials, ratelimit, utils
 
 log = logging.getLogger('custodian.aws')
 
-try:
-    from aws_xray_sdk.core import xray_recorder, patch
-    from aws_xray_sdk.core.context import Context
-    HAVE_XRAY = True
-except ImportError:
-    HAVE_XRAY = False
-    class Context: pass  # NOQA
+# xray tracing is imported on first use, see c7n.resources.xray
+HAVE_XRAY = importlib.util.find_spec('aws_xray_sdk') is not None
+if HAVE_XRAY:
+    tracer_outputs.register_lazy('xray', 'c7n.resources.xray.XrayTracer')
+
+
+def __getattr__(name):
+    if name in ('XrayEmitter', 'XrayContext', 'XrayTracer'):
+        from c7n.resources import xray
+        return getattr(xray, name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
 
 _profile_session = None
 
@@ -164,54 +168,78 @@ class Arn(namedtuple('_Arn', (
 
 class ArnResolver:
 
+    # service -> [(type name, resource type info)] in registration order,
+    # along with a memo of resolved types, both rebuilt when resource
+    # registrations change (ie. on resource loading).
+    _services = None
+    _resolved = {}
+    _registered = None
+
     def __init__(self, manager):
         self.manager = manager
 
     def resolve(self, arns):
-        arns = map(Arn.parse, arns)
-        a_service = operator.attrgetter('service')
-        a_resource = operator.attrgetter('resource_type')
-        kfunc = lambda a: (a_service(a), a_resource(a))  # noqa
-        arns = sorted(arns, key=kfunc)
+        groups = {}
+        for rarn in map(Arn.parse, arns):
+            groups.setdefault(self.resolve_type(rarn), []).append(rarn)
+
         results = {}
-        for (service, arn_type), arn_set in itertools.groupby(arns, key=kfunc):
-            arn_set = list(arn_set)
-            rtype = ArnResolver.resolve_type(arn_set[0])
-            rmanager = self.manager.get_resource_manager(rtype)
-            if rtype == 'sns':
-                resources = rmanager.get_resources(
-                    [rarn.arn for rarn in arn_set])
-            else:
-                resources = rmanager.get_resources(
-                    [rarn.resource for rarn in arn_set])
-            for rarn, r in zip(rmanager.get_arns(resources), resources):
-                results[rarn] = r
-
-            for rarn in arn_set:
-                if rarn.arn not in results:
-                    results[rarn.arn] = None
+        with self.manager.executor_factory(
+                max_workers=getattr(self.manager, 'max_workers', 3)) as w:
+            futures = [w.submit(self.resolve_group, rtype, arn_set)
+                       for rtype, arn_set in groups.items()]
+            for f in as_completed(futures):
+                results.update(f.result())
         return results
 
-    @staticmethod
-    def resolve_type(arn):
+    def resolve_group(self, rtype, arn_set):
+        rmanager = self.manager.get_resource_manager(rtype)
+        if rtype == 'sns':
+            resources = rmanager.get_resources(
+                [rarn.arn for rarn in arn_set])
+        else:
+            resources = rmanager.get_resources(
+                [rarn.resource for rarn in arn_set])
+        results = dict(zip(rmanager.get_arns(resources), resources))
+        for rarn in arn_set:
+            results.setdefault(rarn.arn, None)
+        return results
+
+    @classmethod
+    def get_service_types(cls):
+        if cls._registered != len(AWS.resources):
+            services = {}
+            for type_name, klass in AWS.resources.items():
+                if type_name in ('rest-account', 'account') or klass.resource_type.arn is False:
+                    continue
+                services.setdefault(
+                    klass.resource_type.arn_service or klass.resource_type.service, []
+                ).append((type_name, klass.resource_type))
+            cls._services, cls._resolved = services, {}
+            cls._registered = len(AWS.resources)
+        return cls._services
+
+    @classmethod
+    def resolve_type(cls, arn):
         arn = Arn.parse(arn)
+        services = cls.get_service_types()
+        key = (arn.service, arn.resource_type, arn.separator)
+        if key in cls._resolved:
+            return cls._resolved[key]
 
-        # this would benefit from a class cache {service} -> rtypes
-        for type_name, klass in AWS.resources.items():
-            if type_name in ('rest-account', 'account') or klass.resource_type.arn is False:
-                continue
-            if arn.service != (klass.resource_type.arn_service or klass.resource_type.service):
-                continue
+        rtype = None
+        for type_name, rinfo in services.get(arn.service, ()):
             if (type_name in ('asg', 'ecs-task') and
-                    "%s%s" % (klass.resource_type.arn_type, klass.resource_type.arn_separator)
-                    in arn.resource_type):
-                return type_name
-            elif (klass.resource_type.arn_type is not None and
-                    klass.resource_type.arn_type == arn.resource_type):
-                return type_name
-            elif (klass.resource_type.arn_service == arn.service and
-                    klass.resource_type.arn_type == ""):
-                return type_name
+                    "%s%s" % (rinfo.arn_type, rinfo.arn_separator) in arn.resource_type):
+                rtype = type_name
+            elif rinfo.arn_type is not None and rinfo.arn_type == arn.resource_type:
+                rtype = type_name
+            elif rinfo.arn_service == arn.service and rinfo.arn_type == "":
+                rtype = type_name
+            if rtype:
+                break
+        cls._resolved[key] = rtype
+        return rtype
 
 
 @metrics_outputs.register('aws')
@@ -312,170 +340,19 @@ class CloudWatchLogOutput(LogOutput):
             self.ctx.policy.name)
 
 
-class XrayEmitter:
-    # implement https://github.com/aws/aws-xray-sdk-python/issues/51
-
-    def __init__(self):
-        self.buf = []
-        self.client = None
-
-    def send_entity(self, entity):
-        self.buf.append(entity)
-        if len(self.buf) > 49:
-            self.flush()
-
-    def flush(self):
-        buf = self.buf
-        self.buf = []
-        for segment_set in utils.chunks(buf, 50):
-            self.client.put_trace_segments(
-                TraceSegmentDocuments=[s.serialize() for s in segment_set])
-
-
-class XrayContext(Context):
-    """Specialized XRay Context for Custodian.
-
-    A context is used as a segment storage stack for currently in
-    progress segments.
-
-    We use a customized context for custodian as policy execution
-    commonly uses a concurrent.futures threadpool pattern during
-    execution for api concurrency. Default xray semantics would use
-    thread local storage and treat each of those as separate trace
-    executions. We want to aggregate/associate all thread pool api
-    executions to the custoidan policy execution. XRay sdk supports
-    this via manual code for every thread pool usage, but we don't
-    want to explicitly couple xray integration everywhere across the
-    codebase. Instead we use a context that is aware of custodian
-    usage of threads and associates subsegments therein to the policy
-    execution active subsegment.
-    """
-
-    def __init__(self, *args, **kw):
-        super(XrayContext, self).__init__(*args, **kw)
-        self._local = Bag()
-        self._current_subsegment = None
-        self._main_tid = threading.get_ident()
-
-    def handle_context_missing(self):
-        """Custodian has a few api calls out of band of policy execution.
-
-        - Resolving account alias.
-        - Cloudwatch Log group/stream discovery/creation (when using -l on cli)
-
-        Also we want to folks to optionally based on configuration using xray
-        so default to disabling context missing output.
-        """
-
-    # Annotate any segments/subsegments with their thread ids.
-    def put_segment(self, segment):
-        if getattr(segment, 'thread_id', None) is None:
-            segment.thread_id = threading.get_ident()
-        super().put_segment(segment)
-
-    def put_subsegment(self, subsegment):
-        if getattr(subsegment, 'thread_id', None) is None:
-            subsegment.thread_id = threading.get_ident()
-        super().put_subsegment(subsegment)
-
-    # Override since we're not just popping the end of the stack, we're removing
-    # the thread subsegment from the array by identity.
-    def end_subsegment(self, end_time):
-        subsegment = self.get_trace_entity()
-        if self._is_subsegment(subsegment):
-            subsegment.close(end_time)
-            self._local.entities.remove(subsegment)
-            return True
-        else:
-            log.warning("No subsegment to end.")
-            return False
-
-    # Override get trace identity, any worker thread will find its own subsegment
-    # on the stack, else will use the main thread's sub/segment
-    def get_trace_entity(self):
-        tid = threading.get_ident()
-        entities = self._local.get('entities', ())
-        for s in reversed(entities):
-            if s.thread_id == tid:
-                return s
-            # custodian main thread won't advance (create new segment)
-            # with worker threads still doing pool work.
-            elif s.thread_id == self._main_tid:
-                return s
-        return self.handle_context_missing()
-
-
-@tracer_outputs.register('xray', condition=HAVE_XRAY)
-class XrayTracer:
-
-    emitter = XrayEmitter()
-
-    in_lambda = 'LAMBDA_TASK_ROOT' in os.environ
-    use_daemon = 'AWS_XRAY_DAEMON_ADDRESS' in os.environ
-    service_name = 'custodian'
-
-    @classmethod
-    def initialize(cls, config):
-        context = XrayContext()
-        sampling = config.get('sample', 'true') == 'true' and True or False
-        xray_recorder.configure(
-            emitter=cls.use_daemon is False and cls.emitter or None,
-            context=context,
-            sampling=sampling,
-            context_missing='LOG_ERROR')
-        patch(['boto3', 'requests'])
-        logging.getLogger('aws_xray_sdk.core').setLevel(logging.ERROR)
-
-    def __init__(self, ctx, config):
-        self.ctx = ctx
-        self.config = config or {}
-        self.client = None
-        self.metadata = {}
-
-    @contextlib.contextmanager
-    def subsegment(self, name):
-        segment = xray_recorder.begin_subsegment(name)
-        try:
-            yield segment
-        except Exception as e:
-            stack = traceback.extract_stack(limit=xray_recorder.max_trace_back)
-            segment.add_exception(e, stack)
-            raise
-        finally:
-            xray_recorder.end_subsegment(time.time())
-
-    def __enter__(self):
-        if self.client is None:
-            self.client = self.ctx.session_factory(assume=False).client('xray')
-
-        self.emitter.client = self.client
-
-        if self.in_lambda:
-            self.segment = xray_recorder.begin_subsegment(self.service_name)
-        else:
-            self.segment = xray_recorder.begin_segment(
-                self.service_name, sampling=True)
-
-        p = self.ctx.policy
-        xray_recorder.put_annotation('policy', p.name)
-        xray_recorder.put_annotation('resource', p.resource_type)
-        if self.ctx.options.account_id:
-            xray_recorder.put_annotation('account', self.ctx.options.account_id)
-
-    def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
-        metadata = self.ctx.get_metadata(('api-stats',))
-        metadata.update(self.metadata)
-        xray_recorder.put_metadata('custodian', metadata)
-        if self.in_lambda:
-            xray_recorder.end_subsegment()
-            return
-        xray_recorder.end_segment()
-        if not self.use_daemon:
-            self.emitter.flush()
-            log.info(
-                ('View XRay Trace https://console.aws.amazon.com/xray/home?region=%s#/'
-                 'traces/%s' % (self.ctx.options.region, self.segment.trace_id)))
-        self.metadata.clear()
+THROTTLE_CODES = frozenset((
+    'BandwidthLimitExceeded',
+    'Client.RequestLimitExceeded',
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'SlowDown',
+    'Throttled',
+    'ThrottledException',
+    'Throttling',
+    'ThrottlingException',
+    'TooManyRequestsException'))
 
 
 @api_stats_outputs.register('aws')
@@ -493,17 +370,32 @@ class ApiStats(DeltaStats):
 
     def __enter__(self):
         if isinstance(self.ctx.session_factory, credentials.SessionFactory):
-            self.ctx.session_factory.set_subscribers((self,))
+            self.ctx.session_factory.add_subscriber(self)
+        if self.ctx.options.get('adaptive_concurrency'):
+            concurrency.enabled = True
+        self.rate_limits = ratelimit.limiter.override(
+            self.ctx.policy.data.get('rate-limits'))
+        self.rate_limits.__enter__()
         self.push_snapshot()
 
     def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
         if isinstance(self.ctx.session_factory, credentials.SessionFactory):
-            self.ctx.session_factory.set_subscribers(())
+            self.ctx.session_factory.remove_subscriber(self)
+        self.rate_limits.__exit__(exc_type, exc_value, exc_traceback)
 
         # With cached sessions, we need to unregister any events subscribers
         # on extant sessions to allow for the next registration.
-        utils.local_session(self.ctx.session_factory).events.unregister(
-            'after-call.*.*', self._record, unique_id='c7n-api-stats')
+        events = utils.local_session(self.ctx.session_factory).events
+        events.unregister('after-call.*.*', self._record, unique_id='c7n-api-stats')
+        events.unregister(
+            'before-call.*.*', self._track, unique_id='c7n-api-concurrency-track')
+        events.unregister(
+            'request-created.*.*', self._acquire, unique_id='c7n-api-concurrency-acquire')
+        events.unregister(
+            'after-call-error.*.*', self._release, unique_id='c7n-api-concurrency-release')
+        events.unregister(
+            'needs-retry.*.*', self._retry, unique_id='c7n-api-concurrency-retry')
+        concurrency.enabled = False
 
         self.ctx.metrics.put_metric(
             "ApiCalls", sum(self.api_calls.values()), "Count")
@@ -512,10 +404,58 @@ class ApiStats(DeltaStats):
     def __call__(self, s):
         s.events.register(
             'after-call.*.*', self._record, unique_id='c7n-api-stats')
+        if not concurrency.enabled:
+            return
+        s.events.register(
+            'before-call.*.*', self._track, unique_id='c7n-api-concurrency-track')
+        s.events.register(
+            'request-created.*.*', self._acquire, unique_id='c7n-api-concurrency-acquire')
+        s.events.register(
+            'after-call-error.*.*', self._release, unique_id='c7n-api-concurrency-release')
+        s.events.register(
+            'needs-retry.*.*', self._retry, unique_id='c7n-api-concurrency-retry')
 
-    def _record(self, http_response, parsed, model, **kwargs):
+    def _record(self, http_response, parsed, model, context=None, **kwargs):
         self.api_calls["%s.%s" % (
             model.service_model.endpoint_prefix, model.name)] += 1
+        self._release(context, parsed)
+
+    def _track(self, model, context, **kwargs):
+        # slots are only taken once the request is created, as other
+        # before-call handlers may yet raise, and then neither after-call
+        # nor after-call-error fire to release it.
+        context['c7n-concurrency-key'] = (
+            model.service_model.endpoint_prefix, context.get('client_region'))
+
+    def _acquire(self, request, **kwargs):
+        # retries of a call reuse the slot it already holds.
+        key = request.context.pop('c7n-concurrency-key', None)
+        if key is None:
+            return
+        limit = concurrency.get_limit(key)
+        limit.acquire()
+        request.context['c7n-concurrency'] = (limit, time.monotonic())
+
+    def _release(self, context=None, parsed=None, **kwargs):
+        # calls answered by other before-call handlers never acquired.
+        if context is None or 'c7n-concurrency' not in context:
+            return
+        limit, started = context.pop('c7n-concurrency')
+        if parsed is None:
+            # connection level errors, neither a latency sample nor a throttle
+            return limit.release()
+        limit.release(
+            time.monotonic() - started,
+            parsed.get('Error', {}).get('Code') in THROTTLE_CODES)
+
+    def _retry(self, response=None, request_dict=None, **kwargs):
+        # throttles retried by botocore never surface in after-call
+        if not response or not request_dict:
+            return
+        context = request_dict.get('context', {})
+        if (response[1].get('Error', {}).get('Code') in THROTTLE_CODES and
+                'c7n-concurrency' in context):
+            context['c7n-concurrency'][0].throttle()
 
 
 @blob_outputs.register('s3')
@@ -532,11 +472,17 @@ class S3Output(BlobOutput):
 
     permissions = ('S3:PutObject',)
 
+    # files are uploaded concurrently, large ones as multipart uploads
+    # with their parts sent in parallel.
+    transfer_config = TransferConfig(
+        multipart_threshold=8 * 1024 * 1024, max_concurrency=4)
+
     def __init__(self, ctx, config):
         super().__init__(ctx, config)
         # can't use a local session as we dont want an unassumed session cached.
         self.transfer = S3Transfer(
-            self.ctx.session_factory(assume=False).client('s3'))
+            self.ctx.session_factory(assume=False).client('s3'),
+            config=self.transfer_config)
 
     def upload_file(self, path, key):
         self.transfer.upload_file(
@@ -562,16 +508,23 @@ class AWS(Provider):
         _default_region(options)
         _default_account_id(options)
         if options.tracer and options.tracer.startswith('xray') and HAVE_XRAY:
+            from c7n.resources.xray import XrayTracer
             XrayTracer.initialize(utils.parse_url_config(options.tracer))
 
         return options
 
     def get_session_factory(self, options):
-        return SessionFactory(
+        factory = SessionFactory(
             options.region,
             options.profile,
             options.assume_role,
             options.external_id)
+        ratelimit.limiter.configure(
+            options.get('rate_limit') or (),
+            options.get('rate_limit_dir') or os.environ.get('C7N_RATE_LIMIT_DIR'))
+        factory.add_subscriber(
+            ratelimit.limiter.subscriber(options.get('account_id')))
+        return factory
 
     def initialize_policies(self, policy_collection, options):
         """Return a set of policies targetted to the given regions.
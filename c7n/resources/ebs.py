@@ -20,6 +20,7 @@ from c7n.filters.related import RelatedResourceFilter
 
 from c7n.manager import resources
 from c7n.resources.kms import ResourceKmsKeyAlias
+from c7n.resources.references import ReferenceGraph
 from c7n.resources.securityhub import PostFinding
 from c7n.query import QueryResourceManager, TypeInfo
 from c7n.tags import Tag, coalesce_copy_user_tags
@@ -278,37 +279,18 @@ class SnapshotUnusedFilter(Filter):
             self.manager.get_resource_manager(m).get_permissions()
             for m in ('asg', 'launch-config', 'ami')]))
 
-    def _pull_asg_snapshots(self):
-        asgs = self.manager.get_resource_manager('asg').resources()
-        snap_ids = set()
-        lcfgs = set(a['LaunchConfigurationName'] for a in asgs if 'LaunchConfigurationName' in a)
-        lcfg_mgr = self.manager.get_resource_manager('launch-config')
-
-        if lcfgs:
-            for lc in lcfg_mgr.resources():
-                for b in lc.get('BlockDeviceMappings'):
-                    if 'Ebs' in b and 'SnapshotId' in b['Ebs']:
-                        snap_ids.add(b['Ebs']['SnapshotId'])
-
-        tmpl_mgr = self.manager.get_resource_manager('launch-template-version')
-        for tversion in tmpl_mgr.get_resources(
-                list(tmpl_mgr.get_asg_templates(asgs).keys())):
-            for bd in tversion['LaunchTemplateData'].get('BlockDeviceMappings', ()):
-                if 'Ebs' in bd and 'SnapshotId' in bd['Ebs']:
-                    snap_ids.add(bd['Ebs']['SnapshotId'])
+    def _pull_asg_snapshots(self, graph):
+        snap_ids = graph.referenced('asg-template-snapshot')
+        if graph.get('asg-launch-config'):
+            snap_ids.update(graph.get('launch-config-snapshot'))
         return snap_ids
 
-    def _pull_ami_snapshots(self):
-        amis = self.manager.get_resource_manager('ami').resources()
-        ami_snaps = set()
-        for i in amis:
-            for dev in i.get('BlockDeviceMappings'):
-                if 'Ebs' in dev and 'SnapshotId' in dev['Ebs']:
-                    ami_snaps.add(dev['Ebs']['SnapshotId'])
-        return ami_snaps
+    def _pull_ami_snapshots(self, graph):
+        return graph.referenced('ami-snapshot')
 
     def process(self, resources, event=None):
-        snaps = self._pull_asg_snapshots().union(self._pull_ami_snapshots())
+        graph = ReferenceGraph(self.manager)
+        snaps = self._pull_asg_snapshots(graph).union(self._pull_ami_snapshots(graph))
         if self.data.get('value', True):
             return [r for r in resources if r['SnapshotId'] not in snaps]
         return [r for r in resources if r['SnapshotId'] in snaps]
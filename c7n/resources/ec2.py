@@ -133,11 +133,18 @@ class EC2(query.QueryResourceManager):
         self.queries = QueryFilter.parse(self.data.get('query', []))
 
     def resources(self, query=None):
+        return super(EC2, self).resources(query=self.get_query_filters(query))
+
+    def resources_iter(self, batch_size, query=None):
+        return super(EC2, self).resources_iter(
+            batch_size, query=self.get_query_filters(query))
+
+    def get_query_filters(self, query):
         q = self.resource_query()
         if q is not None:
             query = query or {}
             query['Filters'] = q
-        return super(EC2, self).resources(query=query)
+        return query
 
     def resource_query(self):
         qf = []
@@ -0,0 +1,453 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+# Generated via tools/dev/elementmap.py
+ElementMap = {
+    "modes": {
+        "hub-action": "c7n.resources.securityhub.SecurityHubAction",
+        "hub-finding": "c7n.resources.securityhub.SecurityHub"
+    },
+    "*": {
+        "actions.invoke-sfn": "c7n.resources.sfn.InvokeStepFunction",
+        "actions.post-finding": "c7n.resources.securityhub.OtherResourcePostFinding",
+        "actions.post-item": "c7n.resources.ssm.PostItem",
+        "filters.ops-item": "c7n.resources.ssm.OpsItemFilter"
+    },
+    "arn": {
+        "filters.finding": "c7n.resources.securityhub.SecurityHubFindingFilter"
+    },
+    "aws.ec2": {
+        "actions.send-command": "c7n.resources.ssm.SendCommand"
+    }
+}
+
+ElementSchemas = {
+    'c7n.resources.securityhub.OtherResourcePostFinding': {
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'type': {
+                    'enum': [
+                        'post-finding'
+                    ]
+                },
+                'title': {
+                    'type': 'string',
+                    'default': 'policy.name'
+                },
+                'description': {
+                    'type': 'string',
+                    'default': 'policy.description, or if not defined in policy then policy.name'
+                },
+                'severity': {
+                    'type': 'number',
+                    'default': 0
+                },
+                'severity_normalized': {
+                    'type': 'number',
+                    'min': 0,
+                    'max': 100,
+                    'default': 0
+                },
+                'severity_label': {
+                    'type': 'string',
+                    'default': 'INFORMATIONAL',
+                    'enum': [
+                        'INFORMATIONAL',
+                        'LOW',
+                        'MEDIUM',
+                        'HIGH',
+                        'CRITICAL'
+                    ]
+                },
+                'confidence': {
+                    'type': 'number',
+                    'min': 0,
+                    'max': 100
+                },
+                'criticality': {
+                    'type': 'number',
+                    'min': 0,
+                    'max': 100
+                },
+                'region': {
+                    'type': 'string',
+                    'description': 'cross-region aggregation target'
+                },
+                'recommendation': {
+                    'type': 'string'
+                },
+                'recommendation_url': {
+                    'type': 'string'
+                },
+                'fields': {
+                    'type': 'object'
+                },
+                'batch_size': {
+                    'type': 'integer',
+                    'minimum': 1,
+                    'maximum': 100,
+                    'default': 1
+                },
+                'types': {
+                    'type': 'array',
+                    'minItems': 1,
+                    'items': {
+                        'type': 'string'
+                    }
+                },
+                'compliance_status': {
+                    'type': 'string',
+                    'enum': [
+                        'PASSED',
+                        'WARNING',
+                        'FAILED',
+                        'NOT_AVAILABLE'
+                    ]
+                },
+                'record_state': {
+                    'type': 'string',
+                    'default': 'ACTIVE',
+                    'enum': [
+                        'ACTIVE',
+                        'ARCHIVED'
+                    ]
+                }
+            },
+            'additionalProperties': False,
+            'required': [
+                'types',
+                'type'
+            ]
+        },
+        'schema_alias': True
+    },
+    'c7n.resources.securityhub.SecurityHub': {
+        'schema': {
+            'type': 'object',
+            'additionalProperties': False,
+            'properties': {
+                'execution-options': {
+                    'type': 'object'
+                },
+                'function-prefix': {
+                    'type': 'string'
+                },
+                'member-role': {
+                    'type': 'string'
+                },
+                'packages': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'string'
+                    }
+                },
+                'layers': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'string'
+                    }
+                },
+                'concurrency': {
+                    'type': 'integer'
+                },
+                'runtime': {
+                    'enum': [
+                        'python2.7',
+                        'python3.6',
+                        'python3.7',
+                        'python3.8',
+                        'python3.9'
+                    ]
+                },
+                'role': {
+                    'type': 'string'
+                },
+                'pattern': {
+                    'type': 'object',
+                    'minProperties': 1
+                },
+                'timeout': {
+                    'type': 'number'
+                },
+                'memory': {
+                    'type': 'number'
+                },
+                'environment': {
+                    'type': 'object'
+                },
+                'tags': {
+                    'type': 'object'
+                },
+                'dead_letter_config': {
+                    'type': 'object'
+                },
+                'kms_key_arn': {
+                    'type': 'string'
+                },
+                'tracing_config': {
+                    'type': 'object'
+                },
+                'security_groups': {
+                    'type': 'array'
+                },
+                'subnets': {
+                    'type': 'array'
+                },
+                'type': {
+                    'enum': [
+                        'hub-finding',
+                        'hub-action'
+                    ]
+                }
+            },
+            'required': [
+                'type'
+            ]
+        },
+        'schema_alias': False
+    },
+    'c7n.resources.securityhub.SecurityHubAction': {
+        'schema': {
+            'type': 'object',
+            'additionalProperties': False,
+            'properties': {
+                'execution-options': {
+                    'type': 'object'
+                },
+                'function-prefix': {
+                    'type': 'string'
+                },
+                'member-role': {
+                    'type': 'string'
+                },
+                'packages': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'string'
+                    }
+                },
+                'layers': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'string'
+                    }
+                },
+                'concurrency': {
+                    'type': 'integer'
+                },
+                'runtime': {
+                    'enum': [
+                        'python2.7',
+                        'python3.6',
+                        'python3.7',
+                        'python3.8',
+                        'python3.9'
+                    ]
+                },
+                'role': {
+                    'type': 'string'
+                },
+                'pattern': {
+                    'type': 'object',
+                    'minProperties': 1
+                },
+                'timeout': {
+                    'type': 'number'
+                },
+                'memory': {
+                    'type': 'number'
+                },
+                'environment': {
+                    'type': 'object'
+                },
+                'tags': {
+                    'type': 'object'
+                },
+                'dead_letter_config': {
+                    'type': 'object'
+                },
+                'kms_key_arn': {
+                    'type': 'string'
+                },
+                'tracing_config': {
+                    'type': 'object'
+                },
+                'security_groups': {
+                    'type': 'array'
+                },
+                'subnets': {
+                    'type': 'array'
+                },
+                'type': {
+                    'enum': [
+                        'hub-finding',
+                        'hub-action'
+                    ]
+                }
+            },
+            'required': [
+                'type'
+            ]
+        },
+        'schema_alias': False
+    },
+    'c7n.resources.securityhub.SecurityHubFindingFilter': {
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'type': {
+                    'enum': [
+                        'finding'
+                    ]
+                },
+                'region': {
+                    'type': 'string'
+                },
+                'query': {
+                    'type': 'object'
+                }
+            },
+            'additionalProperties': False,
+            'required': [
+                'type'
+            ]
+        },
+        'schema_alias': True
+    },
+    'c7n.resources.sfn.InvokeStepFunction': {
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'type': {
+                    'enum': [
+                        'invoke-sfn'
+                    ]
+                },
+                'state-machine': {
+                    'type': 'string'
+                },
+                'batch-size': {
+                    'type': 'integer'
+                },
+                'bulk': {
+                    'type': 'boolean'
+                },
+                'policy': {
+                    'type': 'boolean'
+                }
+            },
+            'additionalProperties': False,
+            'required': [
+                'state-machine',
+                'type'
+            ]
+        },
+        'schema_alias': True
+    },
+    'c7n.resources.ssm.OpsItemFilter': {
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'type': {
+                    'enum': [
+                        'ops-item'
+                    ]
+                },
+                'status': {
+                    'type': 'array',
+                    'default': [
+                        'Open'
+                    ],
+                    'items': {
+                        'enum': [
+                            'Open',
+                            'In progress',
+                            'Resolved'
+                        ]
+                    }
+                },
+                'priority': {
+                    'type': 'array',
+                    'items': {
+                        'enum': [
+                            1,
+                            2,
+                            3,
+                            4,
+                            5
+                        ]
+                    }
+                },
+                'title': {
+                    'type': 'string'
+                },
+                'source': {
+                    'type': 'string'
+                }
+            },
+            'additionalProperties': False,
+            'required': [
+                'type'
+            ]
+        },
+        'schema_alias': True
+    },
+    'c7n.resources.ssm.PostItem': {
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'type': {
+                    'enum': [
+                        'post-item'
+                    ]
+                },
+                'description': {
+                    'type': 'string'
+                },
+                'tags': {
+                    'type': 'object'
+                },
+                'priority': {
+                    'enum': [
+                        1,
+                        2,
+                        3,
+                        4,
+                        5
+                    ]
+                },
+                'title': {
+                    'type': 'string'
+                },
+                'topics': {
+                    'type': 'string'
+                }
+            },
+            'additionalProperties': False,
+            'required': [
+                'type'
+            ]
+        },
+        'schema_alias': True
+    },
+    'c7n.resources.ssm.SendCommand': {
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'type': {
+                    'enum': [
+                        'send-command'
+                    ]
+                },
+                'command': {
+                    'type': 'object'
+                }
+            },
+            'additionalProperties': False,
+            'required': [
+                'command'
+            ]
+        },
+        'schema_alias': False
+    }
+}
@@ -35,6 +35,7 @@ from c7n.utils import (
 )
 
 from c7n.resources.aws import Arn
+from c7n.resources.references import ReferenceGraphMixin
 from c7n.resources.securityhub import OtherResourcePostFinding
 
 
@@ -787,7 +788,7 @@ class CheckPermissions(Filter):
         return vf
 
 
-class IamRoleUsage(Filter):
+class IamRoleUsage(ReferenceGraphMixin, Filter):
 
     def get_permissions(self):
         perms = list(itertools.chain(*[
@@ -797,6 +798,7 @@ class IamRoleUsage(Filter):
         return perms
 
     def service_role_usage(self):
+        self.reset_graph()
         results = set()
         results.update(self.scan_lambda_roles())
         results.update(self.scan_ecs_roles())
@@ -804,14 +806,14 @@ class IamRoleUsage(Filter):
         return results
 
     def instance_profile_usage(self):
+        self.reset_graph()
         results = set()
         results.update(self.scan_asg_roles())
         results.update(self.scan_ec2_roles())
         return results
 
     def scan_lambda_roles(self):
-        manager = self.manager.get_resource_manager('lambda')
-        return [r['Role'] for r in manager.resources() if 'Role' in r]
+        return list(self.graph.get('lambda-role'))
 
     def scan_ecs_roles(self):
         results = []
@@ -844,23 +846,10 @@ class IamRoleUsage(Filter):
         return results
 
     def scan_asg_roles(self):
-        manager = self.manager.get_resource_manager('launch-config')
-        return [r['IamInstanceProfile'] for r in manager.resources() if (
-            'IamInstanceProfile' in r)]
+        return list(self.graph.get('launch-config-profile'))
 
     def scan_ec2_roles(self):
-        manager = self.manager.get_resource_manager('ec2')
-        results = []
-        for e in manager.resources():
-            # do not include instances that have been recently terminated
-            if e['State']['Name'] == 'terminated':
-                continue
-            profile_arn = e.get('IamInstanceProfile', {}).get('Arn', None)
-            if not profile_arn:
-                continue
-            # split arn to get the profile name
-            results.append(profile_arn.split('/')[-1])
-        return results
+        return list(self.graph.get('ec2-profile'))
 
 
 ###################
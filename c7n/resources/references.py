@@ -0,0 +1,228 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Cross resource references for usage (used/unused) filters.
+
+A reference graph maps a referenced resource id to the ids of the
+resources referencing it, per edge type (ie. ``launch-config-sg`` maps
+security group ids to the launch configurations using them). Edges are
+built lazily on first use. Within a run they are shared across filters
+and policies for the same account, region and source via the run's
+resource snapshot store (see :func:`c7n.cache.resource_snapshots`).
+"""
+import jmespath
+
+from c7n.cache import get_snapshots
+
+
+EDGES = {}
+
+
+def edge(name):
+    """Register an edge builder yielding (referenced id, referrer id) pairs."""
+    def _register(func):
+        EDGES[name] = func
+        return func
+    return _register
+
+
+class ReferenceGraph:
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.nodes = {}
+
+    def get(self, name):
+        """Return the mapping of referenced id -> set of referrer ids for an edge."""
+        return self.memo(('edge', name), lambda: self.build(name))
+
+    def referenced(self, *names):
+        """Return the set of ids referenced by any of the given edges."""
+        ids = set()
+        for name in names:
+            ids.update(self.get(name))
+        return ids
+
+    def build(self, name):
+        refs = {}
+        for target, referrer in EDGES[name](self):
+            refs.setdefault(target, set()).add(referrer)
+        return refs
+
+    def resources(self, resource_type, augment=True):
+        """Enumerate resources of a type, once per graph."""
+        def fetch():
+            manager = self.manager.get_resource_manager(resource_type)
+            if augment:
+                return manager.resources()
+            return manager.resources(augment=False)
+        return self.memo(('resources', resource_type, augment), fetch)
+
+    def memo(self, key, func):
+        snapshots = get_snapshots()
+        if snapshots is None:
+            if key not in self.nodes:
+                self.nodes[key] = func()
+            return self.nodes[key]
+        return snapshots.memo((
+            'references',
+            self.manager.account_id,
+            self.manager.config.region,
+            self.manager.source_type) + key, func)
+
+
+class ReferenceGraphMixin:
+    """Filter mixin providing a reference graph, built on first use.
+
+    Filters scanning several edges per invocation can call
+    :meth:`reset_graph` to pick up a fresh graph.
+    """
+
+    _graph = None
+
+    @property
+    def graph(self):
+        if self._graph is None:
+            self._graph = ReferenceGraph(self.manager)
+        return self._graph
+
+    def reset_graph(self):
+        self._graph = None
+
+
+def asg_template_versions(graph):
+    def fetch():
+        tmpl_mgr = graph.manager.get_resource_manager('launch-template-version')
+        return tmpl_mgr.get_resources(
+            list(tmpl_mgr.get_asg_templates(graph.resources('asg')).keys()))
+    return graph.memo(('asg-template-versions',), fetch)
+
+
+def ebs_snapshots(mappings):
+    for b in mappings or ():
+        if 'Ebs' in b and 'SnapshotId' in b['Ebs']:
+            yield b['Ebs']['SnapshotId']
+
+
+@edge('asg-launch-config')
+def asg_launch_config(graph):
+    for a in graph.resources('asg'):
+        if a.get('LaunchConfigurationName'):
+            yield a['LaunchConfigurationName'], a['AutoScalingGroupName']
+
+
+@edge('launch-config-snapshot')
+def launch_config_snapshot(graph):
+    for lc in graph.resources('launch-config'):
+        for snap_id in ebs_snapshots(lc.get('BlockDeviceMappings')):
+            yield snap_id, lc['LaunchConfigurationName']
+
+
+@edge('asg-template-snapshot')
+def asg_template_snapshot(graph):
+    for tversion in asg_template_versions(graph):
+        for snap_id in ebs_snapshots(
+                tversion['LaunchTemplateData'].get('BlockDeviceMappings')):
+            yield snap_id, tversion['LaunchTemplateId']
+
+
+@edge('ami-snapshot')
+def ami_snapshot(graph):
+    for i in graph.resources('ami'):
+        for snap_id in ebs_snapshots(i.get('BlockDeviceMappings')):
+            yield snap_id, i['ImageId']
+
+
+@edge('launch-config-image')
+def launch_config_image(graph):
+    for lc in graph.resources('launch-config'):
+        yield lc['ImageId'], lc['LaunchConfigurationName']
+
+
+@edge('asg-template-image')
+def asg_template_image(graph):
+    for tversion in asg_template_versions(graph):
+        yield tversion['LaunchTemplateData'].get('ImageId'), tversion['LaunchTemplateId']
+
+
+@edge('ec2-image')
+def ec2_image(graph):
+    for i in graph.resources('ec2'):
+        yield i['ImageId'], i['InstanceId']
+
+
+@edge('eni-sg')
+def eni_sg(graph):
+    for nic in graph.resources('eni'):
+        for g in nic['Groups']:
+            yield g['GroupId'], nic['NetworkInterfaceId']
+
+
+@edge('sg-sg')
+def sg_sg(graph):
+    for sg in graph.resources('security-group'):
+        for perm_type in ('IpPermissions', 'IpPermissionsEgress'):
+            for p in sg.get(perm_type, []):
+                for g in p.get('UserIdGroupPairs', ()):
+                    yield g['GroupId'], sg['GroupId']
+
+
+@edge('lambda-sg')
+def lambda_sg(graph):
+    for func in graph.resources('lambda', augment=False):
+        if 'VpcConfig' not in func:
+            continue
+        for g in func['VpcConfig']['SecurityGroupIds']:
+            yield g, func['FunctionName']
+
+
+@edge('launch-config-sg')
+def launch_config_sg(graph):
+    for cfg in graph.resources('launch-config'):
+        for g in cfg['SecurityGroups']:
+            yield g, cfg['LaunchConfigurationName']
+        for g in cfg['ClassicLinkVPCSecurityGroups']:
+            yield g, cfg['LaunchConfigurationName']
+
+
+@edge('ecs-cwe-sg')
+def ecs_cwe_sg(graph):
+    expr = jmespath.compile(
+        'EcsParameters.NetworkConfiguration.awsvpcConfiguration.SecurityGroups[]')
+    for rule in graph.resources('event-rule-target', augment=False):
+        for g in expr.search(rule) or ():
+            yield g, rule.get('Id')
+
+
+@edge('codebuild-sg')
+def codebuild_sg(graph):
+    for cb in graph.resources('codebuild'):
+        for g in cb.get('vpcConfig', {}).get('securityGroupIds', []):
+            yield g, cb.get('name')
+
+
+@edge('lambda-role')
+def lambda_role(graph):
+    for func in graph.resources('lambda'):
+        if 'Role' in func:
+            yield func['Role'], func['FunctionName']
+
+
+@edge('launch-config-profile')
+def launch_config_profile(graph):
+    for lc in graph.resources('launch-config'):
+        if 'IamInstanceProfile' in lc:
+            yield lc['IamInstanceProfile'], lc['LaunchConfigurationName']
+
+
+@edge('ec2-profile')
+def ec2_profile(graph):
+    for i in graph.resources('ec2'):
+        # do not include instances that have been recently terminated
+        if i['State']['Name'] == 'terminated':
+            continue
+        profile_arn = i.get('IamInstanceProfile', {}).get('Arn', None)
+        if not profile_arn:
+            continue
+        # split arn to get the profile name
+        yield profile_arn.split('/')[-1], i['InstanceId']
@@ -30,6 +30,7 @@ import copy
 import functools
 import json
 import itertools
+import jmespath
 import logging
 import math
 import os
@@ -55,7 +56,7 @@ from c7n.filters import (
     FilterRegistry, Filter, CrossAccountAccessFilter, MetricsFilter,
     ValueFilter)
 from c7n.manager import resources
-from c7n.output import NullBlobOutput
+from c7n.output import DirectoryOutput, NullBlobOutput
 from c7n import query
 from c7n.resources.securityhub import PostFinding
 from c7n.tags import RemoveTag, Tag, TagActionFilter, TagDelayedAction
@@ -1899,25 +1900,49 @@ class BucketScanLog:
      - [list_of_serialized_keys],
      - [] # Empty list of keys at end when we close the buffer
 
+    Scan progress can be checkpointed alongside the log, recording the
+    listing marker to continue from and the log offset it corresponds
+    to, so an interrupted scan can be resumed. The checkpoint is removed
+    once the scan completes.
     """
 
-    def __init__(self, log_dir, name):
+    def __init__(self, log_dir, name, resume=False):
         self.log_dir = log_dir
         self.name = name
+        self.resume = resume
         self.fh = None
         self.count = 0
+        self.checkpoint = None
 
     @property
     def path(self):
         return os.path.join(self.log_dir, "%s.json" % self.name)
 
+    @property
+    def checkpoint_path(self):
+        return os.path.join(self.log_dir, "%s.checkpoint.json" % self.name)
+
     def __enter__(self):
         # Don't require output directories
         if self.log_dir is None:
-            return
-
-        self.fh = open(self.path, 'w')
-        self.fh.write("[\n")
+            return self
+
+        if self.resume:
+            self.checkpoint = self.load_checkpoint()
+
+        if self.checkpoint:
+            # drop any keys logged after the checkpoint, they'll be
+            # rescanned.
+            self.fh = open(self.path, 'r+')
+            self.fh.seek(self.checkpoint['Offset'])
+            self.fh.truncate()
+            self.count = self.checkpoint['Remediated']
+        else:
+            # a fresh log invalidates any previous scan's checkpoint
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+            self.fh = open(self.path, 'w')
+            self.fh.write("[\n")
         return self
 
     def __exit__(self, exc_type=None, exc_value=None, exc_frame=None):
@@ -1928,7 +1953,9 @@ class BucketScanLog:
         # and close the surrounding list
         self.fh.write("\n]")
         self.fh.close()
-        if not self.count:
+        # empty logs are only kept alongside the checkpoint of an
+        # incomplete scan, which refers to them.
+        if not self.count and not os.path.exists(self.checkpoint_path):
             os.remove(self.fh.name)
         self.fh = None
         return False
@@ -1940,6 +1967,32 @@ class BucketScanLog:
         self.fh.write(dumps(keys))
         self.fh.write(",\n")
 
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path) or not os.path.exists(self.path):
+            return None
+        with open(self.checkpoint_path) as fh:
+            return json.load(fh)
+
+    def save_checkpoint(self, marker, count):
+        if self.fh is None:
+            return
+        self.fh.flush()
+        checkpoint = {
+            'Bucket': self.name,
+            'Marker': marker,
+            'Count': count,
+            'Remediated': self.count,
+            'Offset': self.fh.tell()}
+        # write and rename, so we never leave a partial checkpoint
+        with open(self.checkpoint_path + '.tmp', 'w') as fh:
+            json.dump(checkpoint, fh)
+        os.replace(self.checkpoint_path + '.tmp', self.checkpoint_path)
+
+    def complete(self):
+        """Mark the scan complete, there's nothing left to resume."""
+        if self.fh is not None and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
 
 class ScanBucket(BucketActionBase):
 
@@ -1949,18 +2002,27 @@ class ScanBucket(BucketActionBase):
         'standard': {
             'iterator': 'list_objects',
             'contents_key': ['Contents'],
-            'key_processor': 'process_key'
+            'key_processor': 'process_key',
+            'marker': {'Marker': 'NextMarker || Contents[-1].Key'}
         },
         'versioned': {
             'iterator': 'list_object_versions',
             'contents_key': ['Versions'],
-            'key_processor': 'process_version'
+            'key_processor': 'process_version',
+            'marker': {'KeyMarker': 'NextKeyMarker',
+                       'VersionIdMarker': 'NextVersionIdMarker'}
         }
     }
 
+    # minimum seconds between scan checkpoints
+    checkpoint_interval = 30
+
     def __init__(self, data, manager=None):
         super(ScanBucket, self).__init__(data, manager)
         self.denied_buckets = set()
+        # bucket name -> (keys scanned, keys remediated, seconds) for this run
+        self.scan_stats = {}
+        self.resume = self.data.get('resume', False)
 
     def get_bucket_style(self, b):
         return (
@@ -1981,9 +2043,32 @@ class ScanBucket(BucketActionBase):
             keys.extend(key_set.get(ck, []))
         return keys
 
+    def get_marker(self, b, key_set):
+        """Get the listing parameters to continue a scan after the given page."""
+        marker = {}
+        for param, expr in self.get_bucket_op(b, 'marker').items():
+            value = jmespath.search(expr, key_set)
+            if value is not None:
+                marker[param] = value
+        return marker
+
     def process(self, buckets):
+        if self.resume and type(self.manager.ctx.output) is not DirectoryOutput:
+            self.log.warning(
+                "policy:%s scan checkpoints are only kept in local output directories, "
+                "resume is disabled", self.manager.data.get('name'))
+            self.resume = False
         results = self._process_with_futures(self.process_bucket, buckets)
         self.write_denied_buckets_file()
+        for bucket, (scanned, remediated, elapsed) in self.scan_stats.items():
+            if not elapsed:
+                continue
+            self.manager.ctx.metrics.put_metric(
+                "Scan Rate", scanned / elapsed, "Count/Second",
+                Scope=bucket, buffer=True)
+            self.manager.ctx.metrics.put_metric(
+                "Remediation Rate", remediated / elapsed, "Count/Second",
+                Scope=bucket, buffer=True)
         return results
 
     def _process_with_futures(self, helper, buckets, max_workers=3):
@@ -2027,10 +2112,16 @@ class ScanBucket(BucketActionBase):
         # The bulk of _process_bucket function executes inline in
         # calling thread/worker context, neither paginator nor
         # bucketscan log should be used across worker boundary.
-        p = s3.get_paginator(
-            self.get_bucket_op(b, 'iterator')).paginate(Bucket=b['Name'])
+        with BucketScanLog(
+                self.manager.ctx.log_dir, b['Name'], self.resume) as key_log:
+            params = {'Bucket': b['Name']}
+            if key_log.checkpoint:
+                log.info("Resuming scan bucket:%s keys:%d remediated:%d",
+                         b['Name'], key_log.checkpoint['Count'], key_log.count)
+                params.update(key_log.checkpoint['Marker'])
+            p = s3.get_paginator(
+                self.get_bucket_op(b, 'iterator')).paginate(**params)
 
-        with BucketScanLog(self.manager.ctx.log_dir, b['Name']) as key_log:
             with self.executor_factory(max_workers=10) as w:
                 try:
                     return self._process_bucket(b, p, key_log, w)
@@ -2051,7 +2142,10 @@ class ScanBucket(BucketActionBase):
     __call__ = process_bucket
 
     def _process_bucket(self, b, p, key_log, w):
-        count = 0
+        count = resumed_count = (
+            key_log.checkpoint and key_log.checkpoint['Count'] or 0)
+        resumed = key_log.count
+        start = checkpointed = time.time()
 
         for key_set in p:
             keys = self.get_keys(b, key_set)
@@ -2076,10 +2170,19 @@ class ScanBucket(BucketActionBase):
             if key_set['IsTruncated']:
                 log.debug('Scan progress bucket:%s keys:%d remediated:%d ...',
                           b['Name'], count, key_log.count)
+                if time.time() - checkpointed >= self.checkpoint_interval:
+                    key_log.save_checkpoint(self.get_marker(b, key_set), count)
+                    checkpointed = time.time()
             else:
                 log.info('Scan Complete bucket:%s keys:%d remediated:%d',
                          b['Name'], count, key_log.count)
 
+        key_log.complete()
+        self.scan_stats[b['Name']] = (
+            count - resumed_count, key_log.count - resumed, time.time() - start)
+        return self.scan_result(b, count, key_log)
+
+    def scan_result(self, b, count, key_log):
         b['KeyScanCount'] = count
         b['KeyRemediated'] = key_log.count
         return {
@@ -2110,6 +2213,12 @@ class EncryptExtantKeys(ScanBucket):
                   - type: encrypt-keys
                     crypto: aws:kms
                     key-id: 9c3983be-c6cf-11e6-9d9d-cec0c932ce01
+
+    Scan progress is periodically checkpointed to the output directory,
+    with `resume` an interrupted scan of a bucket picks up from its last
+    checkpoint instead of the start of the keyspace. Resuming requires a
+    local output directory, as checkpoints aren't kept in remote outputs
+    like s3.
     """
 
     permissions = (
@@ -2125,6 +2234,7 @@ class EncryptExtantKeys(ScanBucket):
         'properties': {
             'type': {'enum': ['encrypt-keys']},
             'report-only': {'type': 'boolean'},
+            'resume': {'type': 'boolean'},
             'glacier': {'type': 'boolean'},
             'large': {'type': 'boolean'},
             'crypto': {'enum': ['AES256', 'aws:kms']},
@@ -2853,12 +2963,14 @@ class DeleteBucket(ScanBucket):
         'standard': {
             'iterator': 'list_objects',
             'contents_key': ['Contents'],
-            'key_processor': 'process_key'
+            'key_processor': 'process_key',
+            'marker': ScanBucket.bucket_ops['standard']['marker']
         },
         'versioned': {
             'iterator': 'list_object_versions',
             'contents_key': ['Versions', 'DeleteMarkers'],
-            'key_processor': 'process_version'
+            'key_processor': 'process_version',
+            'marker': ScanBucket.bucket_ops['versioned']['marker']
         }
     }
 
@@ -15,6 +15,7 @@ from c7n.filters.related import RelatedResourceFilter, RelatedResourceByIdFilter
 from c7n.filters.revisions import Diff
 from c7n import query, resolver
 from c7n.manager import resources
+from c7n.resources.references import ReferenceGraphMixin
 from c7n.resources.securityhub import OtherResourcePostFinding, PostFinding
 from c7n.utils import (
     chunks, local_session, type_schema, get_retry, parse_cidr)
@@ -721,7 +722,7 @@ class SecurityGroupPatch:
                        IpPermissions=[r for r in delta['added']])
 
 
-class SGUsage(Filter):
+class SGUsage(ReferenceGraphMixin, Filter):
 
     def get_permissions(self):
         return list(itertools.chain(
@@ -755,6 +756,7 @@ class SGUsage(Filter):
         )
 
     def scan_groups(self):
+        self.reset_graph()
         used = set()
         for kind, scanner in self.get_scanners():
             sg_ids = scanner()
@@ -769,55 +771,22 @@ class SGUsage(Filter):
     def get_launch_config_sgs(self):
         # Note assuming we also have launch config garbage collection
         # enabled.
-        sg_ids = set()
-        for cfg in self.manager.get_resource_manager('launch-config').resources():
-            for g in cfg['SecurityGroups']:
-                sg_ids.add(g)
-            for g in cfg['ClassicLinkVPCSecurityGroups']:
-                sg_ids.add(g)
-        return sg_ids
+        return self.graph.referenced('launch-config-sg')
 
     def get_lambda_sgs(self):
-        sg_ids = set()
-        for func in self.manager.get_resource_manager('lambda').resources(augment=False):
-            if 'VpcConfig' not in func:
-                continue
-            for g in func['VpcConfig']['SecurityGroupIds']:
-                sg_ids.add(g)
-        return sg_ids
+        return self.graph.referenced('lambda-sg')
 
     def get_eni_sgs(self):
-        sg_ids = set()
-        for nic in self.manager.get_resource_manager('eni').resources():
-            for g in nic['Groups']:
-                sg_ids.add(g['GroupId'])
-        return sg_ids
+        return self.graph.referenced('eni-sg')
 
     def get_codebuild_sgs(self):
-        sg_ids = set()
-        for cb in self.manager.get_resource_manager('codebuild').resources():
-            sg_ids |= set(cb.get('vpcConfig', {}).get('securityGroupIds', []))
-        return sg_ids
+        return self.graph.referenced('codebuild-sg')
 
     def get_sg_refs(self):
-        sg_ids = set()
-        for sg in self.manager.get_resource_manager('security-group').resources():
-            for perm_type in ('IpPermissions', 'IpPermissionsEgress'):
-                for p in sg.get(perm_type, []):
-                    for g in p.get('UserIdGroupPairs', ()):
-                        sg_ids.add(g['GroupId'])
-        return sg_ids
+        return self.graph.referenced('sg-sg')
 
     def get_ecs_cwe_sgs(self):
-        sg_ids = set()
-        expr = jmespath.compile(
-            'EcsParameters.NetworkConfiguration.awsvpcConfiguration.SecurityGroups[]')
-        for rule in self.manager.get_resource_manager(
-                'event-rule-target').resources(augment=False):
-            ids = expr.search(rule)
-            if ids:
-                sg_ids.update(ids)
-        return sg_ids
+        return self.graph.referenced('ecs-cwe-sg')
 
 
 @SecurityGroup.filter_registry.register('unused')
@@ -1816,8 +1785,8 @@ class TransitGatewayAttachmentQuery(query.ChildResourceQuery):
 
     def get_parent_parameters(self, params, parent_id, parent_key):
         merged_params = dict(params)
-        merged_params.setdefault('Filters', []).append(
-            {'Name': parent_key, 'Values': [parent_id]})
+        merged_params['Filters'] = list(params.get('Filters', ())) + [
+            {'Name': parent_key, 'Values': [parent_id]}]
         return merged_params
 
 
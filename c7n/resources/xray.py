@@ -0,0 +1,187 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+AWS X-Ray tracing of policy execution.
+
+Kept out of :mod:`c7n.resources.aws` as importing the xray sdk is a
+noticeable part of startup time, the tracer is registered lazily.
+"""
+import contextlib
+import logging
+import os
+import threading
+import time
+import traceback
+
+from aws_xray_sdk.core import xray_recorder, patch
+from aws_xray_sdk.core.context import Context
+
+from c7n import utils
+from c7n.config import Bag
+
+log = logging.getLogger('custodian.aws')
+
+
+class XrayEmitter:
+    # implement https://github.com/aws/aws-xray-sdk-python/issues/51
+
+    def __init__(self):
+        self.buf = []
+        self.client = None
+
+    def send_entity(self, entity):
+        self.buf.append(entity)
+        if len(self.buf) > 49:
+            self.flush()
+
+    def flush(self):
+        buf = self.buf
+        self.buf = []
+        for segment_set in utils.chunks(buf, 50):
+            self.client.put_trace_segments(
+                TraceSegmentDocuments=[s.serialize() for s in segment_set])
+
+
+class XrayContext(Context):
+    """Specialized XRay Context for Custodian.
+
+    A context is used as a segment storage stack for currently in
+    progress segments.
+
+    We use a customized context for custodian as policy execution
+    commonly uses a concurrent.futures threadpool pattern during
+    execution for api concurrency. Default xray semantics would use
+    thread local storage and treat each of those as separate trace
+    executions. We want to aggregate/associate all thread pool api
+    executions to the custoidan policy execution. XRay sdk supports
+    this via manual code for every thread pool usage, but we don't
+    want to explicitly couple xray integration everywhere across the
+    codebase. Instead we use a context that is aware of custodian
+    usage of threads and associates subsegments therein to the policy
+    execution active subsegment.
+    """
+
+    def __init__(self, *args, **kw):
+        super(XrayContext, self).__init__(*args, **kw)
+        self._local = Bag()
+        self._current_subsegment = None
+        self._main_tid = threading.get_ident()
+
+    def handle_context_missing(self):
+        """Custodian has a few api calls out of band of policy execution.
+
+        - Resolving account alias.
+        - Cloudwatch Log group/stream discovery/creation (when using -l on cli)
+
+        Also we want to folks to optionally based on configuration using xray
+        so default to disabling context missing output.
+        """
+
+    # Annotate any segments/subsegments with their thread ids.
+    def put_segment(self, segment):
+        if getattr(segment, 'thread_id', None) is None:
+            segment.thread_id = threading.get_ident()
+        super().put_segment(segment)
+
+    def put_subsegment(self, subsegment):
+        if getattr(subsegment, 'thread_id', None) is None:
+            subsegment.thread_id = threading.get_ident()
+        super().put_subsegment(subsegment)
+
+    # Override since we're not just popping the end of the stack, we're removing
+    # the thread subsegment from the array by identity.
+    def end_subsegment(self, end_time):
+        subsegment = self.get_trace_entity()
+        if self._is_subsegment(subsegment):
+            subsegment.close(end_time)
+            self._local.entities.remove(subsegment)
+            return True
+        else:
+            log.warning("No subsegment to end.")
+            return False
+
+    # Override get trace identity, any worker thread will find its own subsegment
+    # on the stack, else will use the main thread's sub/segment
+    def get_trace_entity(self):
+        tid = threading.get_ident()
+        entities = self._local.get('entities', ())
+        for s in reversed(entities):
+            if s.thread_id == tid:
+                return s
+            # custodian main thread won't advance (create new segment)
+            # with worker threads still doing pool work.
+            elif s.thread_id == self._main_tid:
+                return s
+        return self.handle_context_missing()
+
+
+class XrayTracer:
+
+    emitter = XrayEmitter()
+
+    in_lambda = 'LAMBDA_TASK_ROOT' in os.environ
+    use_daemon = 'AWS_XRAY_DAEMON_ADDRESS' in os.environ
+    service_name = 'custodian'
+
+    @classmethod
+    def initialize(cls, config):
+        context = XrayContext()
+        sampling = config.get('sample', 'true') == 'true' and True or False
+        xray_recorder.configure(
+            emitter=cls.use_daemon is False and cls.emitter or None,
+            context=context,
+            sampling=sampling,
+            context_missing='LOG_ERROR')
+        patch(['boto3', 'requests'])
+        logging.getLogger('aws_xray_sdk.core').setLevel(logging.ERROR)
+
+    def __init__(self, ctx, config):
+        self.ctx = ctx
+        self.config = config or {}
+        self.client = None
+        self.metadata = {}
+
+    @contextlib.contextmanager
+    def subsegment(self, name):
+        segment = xray_recorder.begin_subsegment(name)
+        try:
+            yield segment
+        except Exception as e:
+            stack = traceback.extract_stack(limit=xray_recorder.max_trace_back)
+            segment.add_exception(e, stack)
+            raise
+        finally:
+            xray_recorder.end_subsegment(time.time())
+
+    def __enter__(self):
+        if self.client is None:
+            self.client = self.ctx.session_factory(assume=False).client('xray')
+
+        self.emitter.client = self.client
+
+        if self.in_lambda:
+            self.segment = xray_recorder.begin_subsegment(self.service_name)
+        else:
+            self.segment = xray_recorder.begin_segment(
+                self.service_name, sampling=True)
+
+        p = self.ctx.policy
+        xray_recorder.put_annotation('policy', p.name)
+        xray_recorder.put_annotation('resource', p.resource_type)
+        if self.ctx.options.account_id:
+            xray_recorder.put_annotation('account', self.ctx.options.account_id)
+
+    def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
+        metadata = self.ctx.get_metadata(('api-stats',))
+        metadata.update(self.metadata)
+        xray_recorder.put_metadata('custodian', metadata)
+        if self.in_lambda:
+            xray_recorder.end_subsegment()
+            return
+        xray_recorder.end_segment()
+        if not self.use_daemon:
+            self.emitter.flush()
+            log.info(
+                ('View XRay Trace https://console.aws.amazon.com/xray/home?region=%s#/'
+                 'traces/%s' % (self.ctx.options.region, self.segment.trace_id)))
+        self.metadata.clear()
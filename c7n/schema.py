@@ -15,9 +15,13 @@ All filters and actions are annotated with schema typically using
 the utils.type_schema function.
 """
 from collections import Counter
+from importlib import metadata
+import hashlib
 import json
 import inspect
 import logging
+import os
+import tempfile
 
 from jsonschema import Draft7Validator as JsonSchemaValidator
 from jsonschema.exceptions import best_match
@@ -36,6 +40,9 @@ from c7n.filters.core import (
     VALUE_TYPES,
 )
 from c7n.structure import StructureParser # noqa
+from c7n.version import version
+
+log = logging.getLogger('custodian.schema')
 
 
 def validate(data, schema=None, resource_types=()):
@@ -255,6 +262,9 @@ def generate(resource_types=()):
                     {'$ref': '#/definitions/max-resources-properties'}
                 ]},
                 'max-resources-percent': {'type': 'number', 'minimum': 0, 'maximum': 100},
+                'rate-limits': {
+                    'type': 'object',
+                    'additionalProperties': {'type': 'number', 'exclusiveMinimum': 0}},
                 'comment': {'type': 'string'},
                 'comments': {'type': 'string'},
                 'description': {'type': 'string'},
@@ -281,7 +291,7 @@ def generate(resource_types=()):
             },
         },
         'policy-mode': {
-            'anyOf': [e.schema for _, e in execution.items()],
+            'anyOf': [e.schema for _, e in schema_elements(execution)],
         },
         'max-resources-properties': {
             'type': 'object',
@@ -295,37 +305,28 @@ def generate(resource_types=()):
     }
 
     resource_refs = []
-    for cloud_name, cloud_type in sorted(clouds.items()):
-        for type_name, resource_type in sorted(cloud_type.resources.items()):
-            r_type_name = "%s.%s" % (cloud_name, type_name)
-            if resource_types and r_type_name not in resource_types:
-                if not resource_type.type_aliases:
-                    continue
-                elif not {"%s.%s" % (cloud_name, ralias) for ralias
-                        in resource_type.type_aliases}.intersection(
-                        resource_types):
-                    continue
-
-            aliases = []
-            if resource_type.type_aliases:
-                aliases.extend(["%s.%s" % (cloud_name, a) for a in resource_type.type_aliases])
-                # aws gets legacy aliases with no cloud prefix
-                if cloud_name == 'aws':
-                    aliases.extend(resource_type.type_aliases)
-
-            # aws gets additional alias for default name
+    for cloud_name, type_name, resource_type in schema_resources(resource_types):
+        r_type_name = "%s.%s" % (cloud_name, type_name)
+        aliases = []
+        if resource_type.type_aliases:
+            aliases.extend(["%s.%s" % (cloud_name, a) for a in resource_type.type_aliases])
+            # aws gets legacy aliases with no cloud prefix
             if cloud_name == 'aws':
-                aliases.append(type_name)
-
-            resource_refs.append(
-                process_resource(
-                    r_type_name,
-                    resource_type,
-                    resource_defs,
-                    aliases,
-                    definitions,
-                    cloud_name
-                ))
+                aliases.extend(resource_type.type_aliases)
+
+        # aws gets additional alias for default name
+        if cloud_name == 'aws':
+            aliases.append(type_name)
+
+        resource_refs.append(
+            process_resource(
+                r_type_name,
+                resource_type,
+                resource_defs,
+                aliases,
+                definitions,
+                cloud_name
+            ))
 
     schema = {
         "$schema": "http://json-schema.org/draft-07/schema#",
@@ -350,6 +351,212 @@ def generate(resource_types=()):
     return schema
 
 
+class LazyElement:
+    """Stands in for an element not yet imported, by its recorded schema."""
+
+    def __init__(self, name, schema, schema_alias=False):
+        self.type = name
+        self.schema = schema
+        self.schema_alias = schema_alias
+
+
+def schema_elements(registry):
+    """A registry's items for schema generation.
+
+    Lazily registered aws elements are represented by the schema
+    recorded in the element map rather than importing their modules.
+    """
+    from c7n.resources.element_map import ElementSchemas
+    lazy = registry.lazy_paths()
+    elements = []
+    for k in list(registry.keys()):
+        recorded = ElementSchemas.get(lazy.get(k))
+        if recorded:
+            elements.append((k, LazyElement(k, **recorded)))
+        else:
+            elements.append((k, registry[k]))
+    return elements
+
+
+def schema_resources(resource_types=()):
+    """Yield the (cloud name, type name, resource class) included in a schema."""
+    for cloud_name, cloud_type in sorted(clouds.items()):
+        for type_name, resource_type in sorted(cloud_type.resources.items()):
+            r_type_name = "%s.%s" % (cloud_name, type_name)
+            if resource_types and r_type_name not in resource_types:
+                if not resource_type.type_aliases:
+                    continue
+                elif not {"%s.%s" % (cloud_name, ralias) for ralias
+                        in resource_type.type_aliases}.intersection(
+                        resource_types):
+                    continue
+            yield cloud_name, type_name, resource_type
+
+
+def schema_fingerprint(resource_types=()):
+    """A digest of the inputs to a generated schema.
+
+    Covers the custodian and provider package versions, and the execution
+    modes, sources and resource types along with their filter and action
+    classes. Schema changes within a version (ie. a development checkout)
+    aren't detected.
+    """
+    parts = [version, sorted(execution.keys()), sorted(sources.keys())]
+    for cloud_name, cloud_type in sorted(clouds.items()):
+        parts.append([cloud_name, package_version(cloud_type.__module__)])
+    for cloud_name, type_name, resource_type in schema_resources(resource_types):
+        parts.append([
+            cloud_name, type_name, sorted(resource_type.type_aliases or ()),
+            sorted(resource_type.filter_registry.paths().items()),
+            sorted(resource_type.action_registry.paths().items())])
+    return hashlib.sha256(json.dumps(parts).encode('utf8')).hexdigest()
+
+
+def package_version(module_name):
+    try:
+        return metadata.version(module_name.split('.', 1)[0])
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def get_schema(resource_types=(), cache_dir=None):
+    """Generate and check the schema for the given resource types.
+
+    With a cache directory, checked schemas are stored there keyed by
+    their :func:`schema_fingerprint` and reused across processes.
+    """
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(
+            cache_dir, 'schema-%s.json' % schema_fingerprint(resource_types))
+        try:
+            with open(cache_path) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            pass
+
+    schema = generate(resource_types)
+    JsonSchemaValidator.check_schema(schema)
+    if cache_path is None:
+        return schema
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+                'w', dir=cache_dir, suffix='.tmp', delete=False) as fh:
+            json.dump(schema, fh)
+        os.replace(fh.name, cache_path)
+    except OSError as e:
+        log.debug("unable to cache schema %s: %s", cache_path, e)
+    return schema
+
+
+class ElementValidator:
+    """Fast path policy validation dispatching on element type.
+
+    Policy filters and actions are checked against the schema for their
+    type alone, rather than a walk over the union of all of a resource's
+    element schemas. This only affirms validity, anything else is left
+    to a full schema validation for error reporting.
+    """
+
+    blocks = ('and', 'or', 'not')
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.resolver = JsonSchemaValidator(schema).resolver
+        self.validators = {}
+        self.indexes = {}
+        self.resources = {}
+
+        policies = schema['properties']['policies']
+        for ref in policies['items'].get('anyOf', ()):
+            rpolicy = self.resolve(ref['$ref'])
+            for name in rpolicy['allOf'][1]['properties']['resource']['enum']:
+                self.resources.setdefault(name, ref['$ref'])
+
+        top = dict(schema)
+        top['properties'] = dict(schema['properties'], policies={'type': 'array'})
+        self.top = JsonSchemaValidator(top)
+
+    def is_valid(self, data):
+        if not self.top.is_valid(data):
+            return False
+        for p in data['policies']:
+            if not isinstance(p, dict) or not isinstance(p.get('resource'), str):
+                return False
+            index = self.get_index(p['resource'])
+            if index is None:
+                return False
+            policy, filters, actions = index
+            if not (policy.is_valid(p) and
+                    self.check_elements(p.get('filters', ()), filters) and
+                    self.check_elements(p.get('actions', ()), actions)):
+                return False
+        return True
+
+    def check_elements(self, elements, index):
+        types, names, kv, blocks = index
+        for e in elements:
+            if isinstance(e, str):
+                if e not in names:
+                    return False
+            elif not isinstance(e, dict):
+                return False
+            elif isinstance(e.get('type'), str):
+                if e['type'] not in types or not self.get_validator(
+                        types[e['type']]).is_valid(e):
+                    return False
+            elif blocks and len(e) == 1 and next(iter(e)) in self.blocks:
+                block = next(iter(e.values()))
+                if not isinstance(block, list) or not self.check_elements(block, index):
+                    return False
+            elif kv is None or not self.get_validator(kv).is_valid(e):
+                return False
+        return True
+
+    def get_index(self, resource):
+        ref = self.resources.get(resource)
+        if ref is None:
+            return None
+        if ref not in self.indexes:
+            rpolicy = self.resolve(ref)
+            properties = dict(rpolicy['allOf'][1]['properties'])
+            filters = properties.pop('filters')['items']['anyOf']
+            actions = properties.pop('actions')['items']['anyOf']
+            self.indexes[ref] = (
+                JsonSchemaValidator(
+                    {'allOf': [rpolicy['allOf'][0], {'properties': properties}]},
+                    resolver=self.resolver),
+                self.index_elements(filters),
+                self.index_elements(actions))
+        return self.indexes[ref]
+
+    def index_elements(self, refs):
+        types, names, kv, blocks = {}, set(), None, False
+        for r in refs:
+            if 'enum' in r:
+                names.update(r['enum'])
+            elif '$ref' not in r:
+                blocks = blocks or bool(set(r.get('properties', ())) & set(self.blocks))
+            elif r['$ref'] == '#/definitions/filters/valuekv':
+                kv = r['$ref']
+            else:
+                element = self.resolve(r['$ref'])
+                for t in element.get('properties', {}).get('type', {}).get('enum', ()):
+                    types.setdefault(t, r['$ref'])
+        return types, names, kv, blocks
+
+    def get_validator(self, ref):
+        if ref not in self.validators:
+            self.validators[ref] = JsonSchemaValidator(
+                {'$ref': ref}, resolver=self.resolver)
+        return self.validators[ref]
+
+    def resolve(self, ref):
+        return self.resolver.resolve(ref)[1]
+
+
 def process_resource(
         type_name, resource_type, resource_defs, aliases=None,
         definitions=None, provider_name=None):
@@ -357,7 +564,7 @@ def process_resource(
     r = resource_defs.setdefault(type_name, {'actions': {}, 'filters': {}})
 
     action_refs = []
-    for a in ElementSchema.elements(resource_type.action_registry):
+    for a in ElementSchema.elements(resource_type.action_registry, lazy=True):
         action_name = a.type
         if a.schema_alias:
             action_alias = "%s.%s" % (provider_name, action_name)
@@ -381,7 +588,7 @@ def process_resource(
         {'enum': list(resource_type.action_registry.keys())})
 
     filter_refs = []
-    for f in ElementSchema.elements(resource_type.filter_registry):
+    for f in ElementSchema.elements(resource_type.filter_registry, lazy=True):
         filter_name = f.type
         if filter_name == 'value':
             filter_refs.append({'$ref': '#/definitions/filters/value'})
@@ -511,11 +718,14 @@ class ElementSchema:
     """
 
     @staticmethod
-    def elements(registry):
+    def elements(registry, lazy=False):
         """Given a resource registry return sorted de-aliased values.
+
+        With lazy, elements not yet imported are stood in for by their
+        recorded schema where available, see :func:`schema_elements`.
         """
         seen = {}
-        for k, v in registry.items():
+        for k, v in (lazy and schema_elements(registry) or registry.items()):
             if k in ('and', 'or', 'not'):
                 continue
             if v in seen:
@@ -15,7 +15,7 @@ class StructureParser:
     allowed_file_keys = {'vars', 'policies'}
     required_policy_keys = {'name', 'resource'}
     allowed_policy_keys = {'name', 'resource', 'title', 'description', 'mode',
-         'tags', 'max-resources', 'metadata', 'query',
+         'tags', 'max-resources', 'metadata', 'query', 'rate-limits',
          'filters', 'actions', 'source', 'conditions',
          # legacy keys subject to deprecation.
          'region', 'start', 'end', 'tz', 'max-resources-percent',
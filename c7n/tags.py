@@ -116,6 +116,7 @@ def _common_tag_processer(executor_factory, batch_size, concurrency, client,
                 log.error(
                     "Exception with tags: %s  %s", tags, f.exception())
 
+    utils.invalidate_tag_map(resources)
     if error:
         raise error
 
@@ -292,12 +293,7 @@ class TagActionFilter(Filter):
         skew_hours = self.data.get('skew_hours', 0)
         tz = tzutil.gettz(Time.TZ_ALIASES.get(self.data.get('tz', 'utc')))
 
-        v = None
-        for n in i.get('Tags', ()):
-            if n['Key'] == tag:
-                v = n['Value']
-                break
-
+        v = utils.get_tag_map(i).get(tag)
         if v is None:
             return False
         if ':' not in v or '@' not in v:
@@ -354,8 +350,8 @@ class TagCountFilter(Filter):
         op_name = self.data.get('op', 'gte')
         op = OPERATORS.get(op_name)
         tag_count = len([
-            t['Key'] for t in i.get('Tags', [])
-            if not t['Key'].startswith('aws:')])
+            k for k in utils.get_tag_map(i)
+            if not k.startswith('aws:')])
         return op(tag_count, count)
 
 
@@ -568,6 +564,7 @@ class RenameTag(Action):
                     self.log.error(
                         "Exception renaming tag set \n %s" % (
                             f.exception()))
+        utils.invalidate_tag_map(resources)
         return resources
 
     def get_client(self):
@@ -817,6 +814,7 @@ class NormalizeTag(Action):
                     self.log.error(
                         "Exception renaming tag set \n %s" % (
                             f.exception()))
+        utils.invalidate_tag_map(resources)
         return resources
 
 
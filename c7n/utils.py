@@ -1,6 +1,9 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import contextlib
 import copy
+import functools
+import gzip
 from datetime import datetime, timedelta
 from dateutil.tz import tzutc
 import json
@@ -14,6 +17,7 @@ import sys
 import threading
 import time
 from urllib import parse as urlparse
+from types import MappingProxyType
 from urllib.request import getproxies, proxy_bypass
 
 
@@ -96,6 +100,87 @@ def dumps(data, fh=None, indent=0):
         return json.dumps(data, cls=DateTimeEncoder, indent=indent)
 
 
+def dump_records(path, records, indent=2):
+    """Stream encode records to a file.
+
+    The format follows the file name, a json array or with a .jsonl
+    extension json lines, gzip compressed with a .gz suffix.
+    """
+    with record_writer(path, indent) as write:
+        write(records)
+
+
+@contextlib.contextmanager
+def record_writer(path, indent=2):
+    """Incrementally write batches of records to a file.
+
+    Yields a function that encodes a batch of records and flushes it to
+    the file, in the same format as :func:`dump_records`. A json array
+    is closed when the block exits, even on error.
+    """
+    opener = path.endswith('.gz') and functools.partial(
+        gzip.open, compresslevel=7) or open
+    lines = '.jsonl' in path
+    encoder = DateTimeEncoder(indent=None if lines else indent)
+    prefix = '\n' + ' ' * (indent or 0)
+    written = 0
+
+    def write(records):
+        nonlocal written
+        for r in records:
+            if lines:
+                fh.write(encoder.encode(r))
+                fh.write('\n')
+                continue
+            fh.write(written and ',' or '[')
+            if indent is not None:
+                fh.write(prefix)
+            for chunk in encoder.iterencode(r):
+                fh.write(indent is None and chunk or chunk.replace('\n', prefix))
+            written += 1
+        fh.flush()
+
+    with opener(path, 'wt') as fh:
+        try:
+            yield write
+        finally:
+            if not lines:
+                fh.write(written and (indent is not None and '\n]' or ']') or '[]')
+
+
+def load_records(path):
+    """Incrementally load records written by :func:`dump_records`."""
+    opener = path.endswith('.gz') and gzip.open or open
+    with opener(path, 'rt') as fh:
+        yield from iter_records(fh)
+
+
+def iter_records(fh, chunk_size=2 ** 16):
+    """Incrementally decode records from a json array or json lines stream."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+    while True:
+        # records are objects, so skip array and line delimiters between them.
+        while pos < len(buf) and buf[pos] in ' \t\r\n,[]':
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                return
+            buf, pos = fh.read(chunk_size), 0
+            eof = not buf
+            continue
+        try:
+            record, pos = decoder.raw_decode(buf, pos)
+        except ValueError:
+            if eof:
+                raise
+            more = fh.read(max(chunk_size, len(buf)))
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            continue
+        yield record
+
+
 def format_event(evt):
     return json.dumps(evt, indent=2)
 
@@ -359,6 +444,79 @@ def set_annotation(i, k, v):
         i[k] = v
 
 
+# Tag lookup indexes for the duration of a policy execution (see
+# tag_index), keyed by the id of a resource's Tags list.
+# per thread tag map caches, see tag_index
+TAG_INDEX = threading.local()
+TAG_INDEX_MAX_SIZE = 250000
+
+
+@contextlib.contextmanager
+def tag_index():
+    """Cache resource tag mappings built by get_tag_map in this thread within the block."""
+    if getattr(TAG_INDEX, 'index', None) is not None:
+        yield TAG_INDEX.index
+        return
+    TAG_INDEX.index = {}
+    try:
+        yield TAG_INDEX.index
+    finally:
+        TAG_INDEX.index = None
+
+
+def _build_tag_map(tags, case_sensitive):
+    tag_map = {}
+    for t in tags:
+        k = t.get('Key')
+        if not case_sensitive and isinstance(k, str):
+            k = k.lower()
+        tag_map.setdefault(k, t.get('Value'))
+    return tag_map
+
+
+def get_tag_map(resource, case_sensitive=True):
+    """Return a read only mapping of tag key to value for an aws style resource.
+
+    Within a policy execution the mapping is cached, so repeated tag
+    lookups on a resource are constant time instead of a scan of its
+    tags. It's rebuilt if the resource's tags are replaced or added to
+    or removed from, other modifications need :func:`invalidate_tag_map`.
+    Like a linear scan, the first occurrence of a key wins. With
+    case_sensitive=False keys are lower cased.
+
+    >>> dict(get_tag_map({'Tags': [{'Key': 'Env', 'Value': 'prod'}]}, False))
+    {'env': 'prod'}
+    """
+    tags = resource.get('Tags')
+    if not tags:
+        return MappingProxyType({})
+    index = getattr(TAG_INDEX, 'index', None)
+    if index is None:
+        return MappingProxyType(_build_tag_map(tags, case_sensitive))
+
+    entry = index.get(id(tags))
+    # the entry retains the tags list, so its id can't be reused.
+    if entry is None or entry[0] is not tags or entry[1] != len(tags):
+        if len(index) >= TAG_INDEX_MAX_SIZE:
+            index.clear()
+        entry = index[id(tags)] = [tags, len(tags), None, None]
+    slot = case_sensitive and 2 or 3
+    if entry[slot] is None:
+        entry[slot] = MappingProxyType(_build_tag_map(tags, case_sensitive))
+    return entry[slot]
+
+
+def invalidate_tag_map(resources):
+    """Drop this thread's cached tag mappings for resources whose tags were modified."""
+    index = getattr(TAG_INDEX, 'index', None)
+    if index is None:
+        return
+    for r in resources:
+        tags = r.get('Tags')
+        if tags is not None:
+            index.pop(id(tags), None)
+
+
 def parse_s3(s3_path):
     if not s3_path.startswith('s3://'):
         raise ValueError("invalid s3 path")
@@ -1,8 +1,13 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import io
+import json
+
 from botocore.exceptions import ClientError
 from c7n.exceptions import PolicyValidationError
 from c7n.actions import Action, ActionRegistry
+from c7n.actions import invoke
+from c7n.executor import MainThreadExecutor
 from .common import BaseTest
 
 
@@ -51,3 +56,74 @@ class ActionRegistryTest(BaseTest):
         self.assertRaises(
             PolicyValidationError, ActionRegistry("test.actions").factory, "foo", None
         )
+
+
+class LambdaInvokeTest(BaseTest):
+
+    def get_action(self, **data):
+        data.update({'type': 'invoke-lambda', 'function': 'process'})
+        p = self.load_policy({'name': 'invoker', 'resource': 'ec2', 'actions': [data]})
+        action = p.resource_manager.actions[0]
+        self.patch(action, 'executor_factory', MainThreadExecutor)
+        self.patch(invoke.utils, 'get_account_alias_from_sts', lambda session: 'test')
+
+        class Client:
+            invokes = []
+            uploads = []
+            concurrency = {'ReservedConcurrentExecutions': 2}
+
+            def client(self, service, config=None):
+                return self
+
+            def invoke(self, **params):
+                self.invokes.append(params)
+                return {'StatusCode': 202, 'Payload': io.BytesIO(b'')}
+
+            def get_function_concurrency(self, FunctionName):
+                if self.concurrency is None:
+                    raise ClientError(
+                        {'Error': {'Code': 'AccessDeniedException'}}, 'GetFunctionConcurrency')
+                return self.concurrency
+
+            def put_object(self, **params):
+                self.uploads.append(params)
+
+        client = Client()
+        self.patch(invoke.utils, 'local_session', lambda factory: client)
+        return action, client
+
+    def test_invoke_payload_size(self):
+        action, client = self.get_action(offload='s3://stash/invoke')
+        self.patch(action, 'max_async_payload', 4000)
+        resources = [{'InstanceId': 'i-%d' % i, 'Data': 'x' * 900} for i in range(6)]
+        resources.insert(2, {'InstanceId': 'i-big', 'Data': 'x' * 5000})
+
+        results = action.process(resources)
+        self.assertEqual(len(results), 4)
+        self.assertNotIn('Payload', results[0])
+        payloads = [json.loads(i['Payload']) for i in client.invokes]
+        self.assertTrue(all(len(i['Payload']) <= 4000 for i in client.invokes))
+        self.assertEqual(
+            [[r['InstanceId'] for r in p.get('resources', ())] for p in payloads],
+            [['i-0', 'i-1'], [], ['i-2', 'i-3', 'i-4'], ['i-5']])
+        self.assertEqual(
+            payloads[1], {'payload': 's3://stash/%s' % client.uploads[0]['Key']})
+        self.assertTrue(client.uploads[0]['Key'].startswith('invoke/invoker/'))
+        self.assertEqual(
+            json.loads(client.uploads[0]['Body'])['resources'][0]['InstanceId'], 'i-big')
+
+    def test_invoke_concurrency(self):
+        action, client = self.get_action(**{'async': False})
+        self.assertEqual(action.get_concurrency(client, {'FunctionName': 'process'}), 2)
+        client.concurrency = {}
+        self.assertEqual(action.get_concurrency(client, {'FunctionName': 'process'}), 8)
+        client.concurrency = None
+        self.assertEqual(action.get_concurrency(client, {'FunctionName': 'process'}), 8)
+
+        results = action.process([{'InstanceId': 'i-1'}])
+        self.assertEqual(results[0]['Payload'], '')
+        self.assertNotIn('InvocationType', client.invokes[0])
+
+        # without an offload location oversized resources are skipped.
+        self.patch(action, 'max_sync_payload', 1000)
+        self.assertEqual(action.process([{'InstanceId': 'i-1', 'Data': 'x' * 1000}]), [])
@@ -4,6 +4,10 @@
 import json
 import threading
 
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+from botocore.stub import Stubber
 from mock import Mock
 
 from c7n.config import Bag
@@ -13,7 +17,7 @@ from c7n import output
 
 # resolver test needs to patch out thread usage
 from c7n.resources.sqs import SQS
-from c7n.executor import MainThreadExecutor
+from c7n.executor import ConcurrencyController, MainThreadExecutor
 
 from .common import BaseTest
 
@@ -78,10 +82,24 @@ class TestArnResolver:
         resolver = aws.ArnResolver(p.resource_manager)
         load_resources(('aws.sqs', 'aws.lambda'))
         test.patch(SQS, 'executor_factory', MainThreadExecutor)
+        test.patch(p.resource_manager, 'executor_factory', MainThreadExecutor)
         arn_map = resolver.resolve(arns)
         assert len(arn_map) == 3
         assert None not in arn_map.values()
 
+    def test_arn_resolve_type_index(self, test):
+        load_resources(('aws.sqs',))
+        arn = 'arn:aws:sqs:us-east-1:644160558196:origin-dev'
+        assert aws.ArnResolver.resolve_type(arn) == 'sqs'
+        assert aws.ArnResolver._resolved[('sqs', '', '')] == 'sqs'
+
+        # registration changes invalidate the index
+        aws.AWS.resources.register('sqs-test', type('SQSTest', (SQS,), {}))
+        test.addCleanup(aws.AWS.resources.unregister, 'sqs-test')
+        assert aws.ArnResolver.get_service_types()['sqs'][-1][0] == 'sqs-test'
+        assert aws.ArnResolver._resolved == {}
+        assert aws.ArnResolver.resolve_type(arn) == 'sqs'
+
     def test_arn_meta(self):
 
         legacy = set()
@@ -281,6 +299,64 @@ class TracerTest(BaseTest):
             self.assertNotEqual(w.cause, {})
 
 
+class ApiStatsTest(BaseTest):
+
+    def test_adaptive_concurrency(self):
+        controller = ConcurrencyController(initial=4)
+        controller.enabled = True
+        self.patch(aws, 'concurrency', controller)
+        session = boto3.Session(
+            region_name='us-east-2',
+            aws_access_key_id='xyz', aws_secret_access_key='abc')
+        stats = aws.ApiStats(Bag())
+        stats(session)
+        client = session.client('sqs', config=Config(retries={'max_attempts': 0}))
+
+        responses = [
+            (200, b'<ListQueuesResponse><ListQueuesResult/></ListQueuesResponse>'),
+            (400, b'<ErrorResponse><Error><Type>Sender</Type><Code>Throttling</Code>'
+                  b'<Message>Rate exceeded</Message></Error></ErrorResponse>')]
+
+        def send(request, **kwargs):
+            status, body = responses.pop(0)
+            return AWSResponse(request.url, status, {}, Mock(stream=lambda: [body]))
+
+        client.meta.events.register('before-send.sqs.ListQueues', send)
+        client.list_queues()
+        with self.assertRaises(client.exceptions.ClientError):
+            client.list_queues()
+
+        limit = controller.limits[('sqs', 'us-east-2')]
+        self.assertEqual(limit.active, 0)
+        self.assertEqual(limit.limit, 4.25 / 2)
+        self.assertEqual(stats.get_snapshot(), {'sqs.ListQueues': 2})
+
+        # other before-call handlers run first, if they raise no slot is taken
+        def fail(**kwargs):
+            raise ValueError()
+
+        client.meta.events.register('before-call.sqs.ListQueues', fail)
+        with self.assertRaises(ValueError):
+            client.list_queues()
+        self.assertEqual(limit.active, 0)
+
+        # connection errors release the slot via after-call-error
+        client.meta.events.unregister('before-call.sqs.ListQueues', fail)
+        client.meta.events.unregister('before-send.sqs.ListQueues', send)
+        client.meta.events.register('before-send.sqs.ListQueues', fail)
+        with self.assertRaises(ValueError):
+            client.list_queues()
+        self.assertEqual(limit.active, 0)
+        client.meta.events.unregister('before-send.sqs.ListQueues', fail)
+
+        # and if they answer the call, it doesn't count against the limit
+        with Stubber(client) as stubber:
+            stubber.add_response('list_queues', {'QueueUrls': []})
+            client.list_queues()
+        self.assertEqual(limit.active, 0)
+        self.assertEqual(limit.limit, 4.25 / 2)
+
+
 class OutputMetricsTest(BaseTest):
 
     def test_metrics_destination_dims(self):
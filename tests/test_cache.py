@@ -7,6 +7,8 @@ import pickle
 import tempfile
 import mock
 import os
+import shutil
+import time
 
 
 class TestCache(TestCase):
@@ -150,3 +152,89 @@ class FileCacheManagerTest(TestCase):
         self.addCleanup(os.unlink, t.name)
         self.addCleanup(t.close)
         return t
+
+
+class SqlKvCacheTest(TestCase):
+
+    def get_cache(self, **kw):
+        d = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, d)
+        kw.setdefault('cache_period', 60)
+        c = cache.SqlKvCache(
+            Namespace(cache='sqlite://%s' % os.path.join(d, 'sub', 'c7n.db'), **kw))
+        self.addCleanup(c.close)
+        return c
+
+    def test_factory(self):
+        self.assertIsInstance(
+            cache.factory(Namespace(cache_period=60, cache="sqlite://~/c7n.db")),
+            cache.SqlKvCache)
+
+    def test_get_set(self):
+        c = self.get_cache()
+        self.assertTrue(c.load())
+        k1 = {"account": "12345678901234", "region": "us-west-2", "resource": "ec2"}
+        k2 = {"account": "98765432101234", "region": "eu-west-1", "resource": "asg"}
+        self.assertEqual(c.get(k1), None)
+        c.save(k1, [{'InstanceId': 'i-1'}])
+        c.save(k2, list(range(2)))
+        self.assertEqual(c.get(k1), [{'InstanceId': 'i-1'}])
+        self.assertTrue(c.size() > 0)
+
+        c2 = cache.SqlKvCache(c.config)
+        self.addCleanup(c2.close)
+        self.assertTrue(c2.load())
+        self.assertEqual(c2.get(k2), [0, 1])
+
+    def test_expiration(self):
+        c = self.get_cache()
+        c.load()
+        c.save('a', 1)
+        c.conn.execute('update c7n_cache set create_date = ?', (time.time() - 3601,))
+        self.assertEqual(c.get('a'), None)
+        c.close()
+        c.load()
+        self.assertEqual(c.conn.execute('select count(*) from c7n_cache').fetchone()[0], 0)
+
+    def test_lru_eviction(self):
+        c = self.get_cache(cache_max_size=1)
+        c.load()
+        blob = 'x' * (400 * 1024)
+        c.save('a', blob)
+        c.save('b', blob)
+        c.conn.execute('update c7n_cache set access_date = access_date - 10')
+        # touch a so b becomes least recently used
+        self.assertEqual(c.get('a'), blob)
+        c.save('c', blob)
+        self.assertEqual(c.get('b'), None)
+        self.assertEqual(c.get('a'), blob)
+        self.assertEqual(c.get('c'), blob)
+
+    def test_pickle_drops_connection(self):
+        c = self.get_cache()
+        c.load()
+        c.save('a', 1)
+        c2 = pickle.loads(pickle.dumps(c))
+        self.assertEqual(c2.conn, None)
+        self.assertEqual(c2.get('a'), 1)
+        c2.close()
+
+
+class ResourceSnapshotsTest(TestCase):
+
+    def test_snapshot_views(self):
+        with cache.resource_snapshots() as snapshots:
+            self.assertIs(cache.get_snapshots(), snapshots)
+            key = {'account': '123', 'region': 'us-east-1', 'resource': 'ec2', 'q': None}
+            self.assertEqual(snapshots.get(key, 'exec-1'), None)
+            view = snapshots.save(key, [{'InstanceId': 'i-1', 'State': {'Name': 'running'}}],
+                'exec-1')
+            view[0]['c7n:annotation'] = True
+            other = snapshots.get(key, 'exec-2')
+            self.assertEqual(other, [{'InstanceId': 'i-1', 'State': {'Name': 'running'}}])
+            self.assertEqual(
+                snapshots.get_stats('exec-2'), {'fetches': 0, 'hits': 1, 'resources-reused': 1})
+            # nested snapshot contexts share the outer store
+            with cache.resource_snapshots() as inner:
+                self.assertIs(inner, snapshots)
+        self.assertEqual(cache.get_snapshots(), None)
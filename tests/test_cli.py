@@ -8,6 +8,8 @@ from argparse import ArgumentTypeError
 from datetime import datetime, timedelta
 
 from c7n import cli, version, commands
+from c7n.config import Bag
+from c7n.executor import MainThreadExecutor
 from c7n.resolver import ValuesFrom
 from c7n.resources import aws
 from c7n.schema import ElementSchema, generate
@@ -554,6 +556,101 @@ class RunTest(CliTest):
             ["custodian", "run", "-s", temp_dir, "--debug", yaml_file], CustomError
         )
 
+    def test_parallel(self):
+        from c7n import executor
+        from c7n.policy import Policy
+
+        self.patch(executor, "ProcessPoolExecutor", MainThreadExecutor)
+        calls = []
+
+        def run_policy(p):
+            calls.append((p.name, p.options.cache))
+            if p.name == "error":
+                raise Exception("foobar")
+
+        self.patch(Policy, "__call__", run_policy)
+
+        temp_dir = self.get_temp_dir()
+        yaml_file = self.write_policy_file(
+            {
+                "policies": [
+                    {"name": "ec2-a", "resource": "ec2"},
+                    {"name": "error", "resource": "s3"},
+                    {"name": "ec2-b", "resource": "ec2"},
+                ]
+            }
+        )
+        self.run_and_expect_failure(
+            [
+                "custodian", "run", "--parallel", "2", "--region", "us-east-1",
+                "-s", temp_dir, yaml_file,
+            ],
+            2,
+        )
+        # policies sharing a resource type run together, with an in-memory cache
+        self.assertEqual(
+            calls,
+            [("ec2-a", "memory"), ("ec2-b", "memory"), ("error", "memory")])
+
+    def test_run_policy_group_skip_validation(self):
+        from c7n.commands import run_policy_group
+        from c7n.config import Config
+        from c7n.policy import Policy
+
+        validated = []
+        self.patch(Policy, "validate", lambda p: validated.append(p.name))
+        self.patch(Policy, "__call__", lambda p: None)
+
+        data = {"name": "ec2-a", "resource": "ec2"}
+        options = Config.empty(region="us-east-1")
+        self.assertEqual(run_policy_group([(data, options)]), [])
+        self.assertEqual(validated, ["ec2-a"])
+
+        # workers honor skip validation like the initial policy load
+        self.assertEqual(
+            run_policy_group([(data, options.copy(skip_validation=True))]), [])
+        self.assertEqual(validated, ["ec2-a"])
+
+    def test_run_policies_upload_errors(self):
+        from concurrent.futures import Future
+        from c7n.commands import run_policies
+        from c7n.config import Config
+        from c7n.output import BlobOutput
+
+        class UploadPolicy:
+
+            def __init__(self, name, error=None):
+                self.name = name
+                self.error = error
+
+            def __call__(self):
+                f = Future()
+                if self.error:
+                    f.set_exception(self.error)
+                else:
+                    f.set_result(None)
+                BlobOutput.pending[f] = self.name
+
+        self.assertEqual(
+            run_policies(Config.empty(), [
+                UploadPolicy("ok"),
+                UploadPolicy("upload-error", ValueError("denied"))]),
+            ["upload-error"])
+
+    def test_group_policies(self):
+        from c7n.commands import group_policies
+
+        policies = [
+            Bag(name=n, resource_type=rtype, options=Bag(region=region))
+            for n, rtype, region in (
+                ("a", "ec2", "us-east-1"),
+                ("b", "s3", "us-east-1"),
+                ("c", "ec2", "us-west-2"),
+                ("d", "ec2", "us-east-1"))]
+        self.assertEqual(
+            [[p.name for p in g] for g in group_policies(policies)],
+            [["a", "d"], ["b"], ["c"]])
+
 
 class MetricsTest(CliTest):
 
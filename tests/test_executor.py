@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 from c7n import executor
 
+import threading
 import unittest
 
 
@@ -42,5 +43,84 @@ class MainExecutorTest(ExecutorBase, unittest.TestCase):
     executor_factory = executor.MainThreadExecutor
 
 
+class AdaptiveExecutorTest(ExecutorBase, unittest.TestCase):
+    executor_factory = executor.AdaptiveThreadPoolExecutor
+
+
+class AdaptiveLimitTest(unittest.TestCase):
+
+    def test_additive_increase(self):
+        limit = executor.AdaptiveLimit('sqs', initial=2, max_limit=4)
+        for i in range(20):
+            limit.acquire()
+            limit.release(0.1)
+        self.assertEqual(limit.limit, 4)
+
+    def test_increase_held_on_latency(self):
+        limit = executor.AdaptiveLimit('sqs', initial=2)
+        limit.observe(0.1)
+        for i in range(10):
+            limit.observe(1.0)
+        self.assertEqual(int(limit.limit), 2)
+        self.assertTrue(limit.latency > 0.2)
+
+    def test_throttle_cooldown(self):
+        limit = executor.AdaptiveLimit('sqs', initial=8)
+        limit.acquire()
+        limit.release(throttled=True)
+        self.assertEqual(limit.limit, 4)
+        # subsequent throttles within the cooldown are a single signal
+        limit.throttle()
+        self.assertEqual(limit.limit, 4)
+        limit.throttled_at -= limit.cooldown
+        limit.throttle()
+        self.assertEqual(limit.limit, 2)
+        limit.throttled_at = None
+        limit.throttle()
+        limit.throttled_at = None
+        limit.throttle()
+        self.assertEqual(limit.limit, 1)
+
+    def test_acquire_waits(self):
+        limit = executor.AdaptiveLimit('sqs', initial=1)
+        limit.acquire()
+        acquired = threading.Event()
+
+        def waiter():
+            limit.acquire()
+            acquired.set()
+
+        t = threading.Thread(target=waiter)
+        t.start()
+        self.assertFalse(acquired.wait(0.1))
+        limit.release()
+        self.assertTrue(acquired.wait(5))
+        t.join()
+        self.assertEqual(limit.active, 1)
+
+
+class ConcurrencyControllerTest(unittest.TestCase):
+
+    def test_pool_size(self):
+        controller = executor.ConcurrencyController(initial=6)
+        self.assertEqual(controller.pool_size(3), 3)
+        controller.enabled = True
+        self.assertEqual(controller.pool_size(3), 3)
+        controller.get_limit(('ec2', 'us-east-1'))
+        # pools follow the largest endpoint limit, up or down
+        self.assertEqual(controller.pool_size(3), 6)
+        self.assertEqual(controller.pool_size(10), 6)
+        controller.get_limit(('s3', 'us-east-1')).limit = 12.5
+        self.assertEqual(controller.pool_size(3), 12)
+        controller.get_limit(('s3', 'us-east-1')).limit = 2
+        controller.get_limit(('ec2', 'us-east-1')).limit = 1
+        self.assertEqual(controller.pool_size(10), 2)
+        self.assertEqual(controller.pool_size(), 2)
+        # serial pools stay serial
+        self.assertEqual(controller.pool_size(1), 1)
+        controller.reset()
+        self.assertEqual(controller.pool_size(10), 10)
+
+
 if __name__ == "__main__":
     unittest.main()
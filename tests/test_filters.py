@@ -240,6 +240,28 @@ class TestValueFilter(unittest.TestCase):
         self.assertEqual(vf.v, None)
         self.assertFalse(res)
 
+    def test_value_compile_once(self):
+        vf = filters.factory(
+            {"type": "value", "key": "tag:Env", "value": "^prod", "op": "regex"})
+        self.assertEqual(vf.matcher, None)
+        self.assertTrue(vf.match({"Tags": [{"Key": "Env", "Value": "Production"}]}))
+        matcher = vf.matcher
+        self.assertFalse(vf.match({"Tags": [{"Key": "Env", "Value": "dev"}]}))
+        self.assertFalse(vf.match({"Tags": [{"Key": "Env", "Value": 1}]}))
+        self.assertFalse(vf.match(None))
+        self.assertIs(vf.matcher, matcher)
+
+    def test_value_compile_get_resource_value_override(self):
+
+        class AnnotationValue(base_filters.ValueFilter):
+
+            def get_resource_value(self, k, i):
+                return super().get_resource_value(k, i["c7n:annotation"])
+
+        vf = AnnotationValue({"type": "value", "key": "a.b", "value": 1})
+        self.assertTrue(vf.match({"c7n:annotation": {"a": {"b": 1}}}))
+        self.assertFalse(vf.match({"c7n:annotation": {"a": {"b": 2}}}))
+
 
 class TestAgeFilter(unittest.TestCase):
 
@@ -927,6 +949,32 @@ class TestInList(unittest.TestCase):
         self.assertEqual(f(instance(Thing="Foo")), True)
         self.assertEqual(f(instance(Thing="Baz")), False)
 
+    def test_in_unhashable(self):
+        f = filters.factory(
+            {
+                "type": "value",
+                "key": "Thing",
+                "value": [["Foo"], "Bar"],
+                "op": "in",
+            }
+        )
+        self.assertEqual(f(instance(Thing=["Foo"])), True)
+        self.assertEqual(f(instance(Thing="Bar")), True)
+        self.assertEqual(f(instance(Thing=["Bar"])), False)
+
+    def test_in_set_unhashable_value(self):
+        f = filters.factory(
+            {
+                "type": "value",
+                "key": "Thing",
+                "value": ["Foo", "Bar"],
+                "op": "not-in",
+            }
+        )
+        self.assertEqual(f(instance(Thing=["Foo"])), True)
+        self.assertEqual(f(instance(Thing="Foo")), False)
+        self.assertEqual(f({"InstanceId": "i-1"}), True)
+
 
 class TestNotInList(unittest.TestCase):
 
@@ -1064,6 +1112,43 @@ class TestMetricsFilter(BaseTest):
                 for res in resources)
         )
 
+    def test_metrics_batch(self):
+        self.patch(ELB, "executor_factory", MainThreadExecutor)
+        session_factory = self.replay_flight_data("test_metrics_batch")
+
+        p = self.load_policy(
+            {
+                "name": "elb-batch-metrics",
+                "resource": "elb",
+                "filters": [
+                    {
+                        "type": "metrics",
+                        "value": 0,
+                        "name": "RequestCount",
+                        "op": "eq",
+                        "statistics": "Sum",
+                        "missing-value": 0.0,
+                        "batch": True,
+                    }
+                ],
+            },
+            config={"account_id": "644160558196"},
+            session_factory=session_factory,
+        )
+        self.assertEqual(
+            p.resource_manager.filters[0].get_permissions(),
+            ("cloudwatch:GetMetricData",))
+        resources = p.run()
+        self.assertEqual(
+            sorted(r["LoadBalancerName"] for r in resources),
+            ["test-elb-missing-metrics", "test-elb-zero-metrics"])
+        metrics = {r["LoadBalancerName"]: r["c7n.metrics"]["AWS/ELB.RequestCount.Sum"]
+                   for r in resources}
+        self.assertEqual(metrics["test-elb-zero-metrics"][0]["Sum"], 0.0)
+        self.assertEqual(
+            metrics["test-elb-missing-metrics"][0]["c7n:detail"],
+            "Fill value for missing data")
+
     def test_metric_period_rounding(self):
         """Round the start time for metrics queries to the top of the previous hour"""
 
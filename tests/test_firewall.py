@@ -27,3 +27,5 @@ class NetworkFirewallTest(BaseTest):
         resources = p.run()
         self.assertEqual(len(resources), 1)
         assert resources[0]['FirewallName'] == 'unicron'
+        assert {t['Key']: t['Value'] for t in resources[0]['Tags']} == {
+            'App': 'CustodianDev', 'Owner': 'Kapil'}
@@ -51,6 +51,7 @@ class HandleTest(BaseTest):
              'cache': '',
              'regions': (),
              'cache_period': 0,
+             'cache_max_size': 0,
              'log_group': None,
              'metrics': None})
 
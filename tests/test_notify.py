@@ -9,7 +9,9 @@ import time
 import tempfile
 import zlib
 
-from c7n.exceptions import PolicyValidationError
+from c7n.actions import notify as notify_module
+from c7n.exceptions import PolicyExecutionError, PolicyValidationError
+from c7n.executor import MainThreadExecutor
 
 
 class NotifyTest(BaseTest):
@@ -274,3 +276,114 @@ class NotifyTest(BaseTest):
         self.assertEqual(len(messages), 1)
         body = json.loads(zlib.decompress(base64.b64decode(messages[0]["Body"])))
         self.assertTrue("tag:k1" in body.get("resources")[0].get("c7n:MatchedFilters"))
+
+    def get_notify(self, **transport):
+        transport.setdefault('type', 'sqs')
+        transport.setdefault('queue', 'https://sqs.us-east-1.amazonaws.com/123/notify')
+        p = self.load_policy({
+            "name": "notify-pack",
+            "resource": "ec2",
+            "actions": [{"type": "notify", "to": ["noone@example.com"],
+                         "resource_fields": ["State"],
+                         "transport": transport}]})
+        return p.resource_manager.actions[0]
+
+    def test_notify_pack_resources(self):
+        notify = self.get_notify(offload="s3://stash/notify")
+        uploads = []
+
+        class Client:
+            def put_object(self, **kw):
+                uploads.append(kw)
+
+        self.patch(
+            notify.manager, 'session_factory', lambda **kw: type(
+                'Session', (), {'client': lambda self, service: Client()})())
+
+        self.assertEqual(
+            notify.project_resources([{'InstanceId': 'i-1', 'State': 'on', 'Tags': []}]),
+            [{'InstanceId': 'i-1', 'State': 'on'}])
+
+        # incompressible resources, a handful per message, and one offloaded.
+        resources = [{'InstanceId': 'i-%d' % i, 'Data': base64.b64encode(
+            os.urandom(3000)).decode('ascii')} for i in range(20)]
+        resources.insert(5, {'InstanceId': 'i-big', 'Data': base64.b64encode(
+            os.urandom(12000)).decode('ascii')})
+        message = {'policy': {'name': 'notify-pack'}}
+        bodies = list(notify.pack_resources(message, resources, 10000))
+
+        self.assertTrue(all(len(body) <= 10000 for body, count in bodies))
+        self.assertEqual(
+            [count for body, count in bodies], [2, 2, 1, 1, 2, 2, 2, 2, 2, 2, 2, 1])
+        decoded = [json.loads(zlib.decompress(base64.b64decode(body))) for body, _ in bodies]
+        pointers = [d for d in decoded if 'payload' in d]
+        self.assertEqual(len(pointers), 1)
+        self.assertEqual(len(uploads), 1)
+        self.assertEqual(
+            pointers[0]['payload'], 's3://stash/%s' % uploads[0]['Key'])
+        self.assertTrue(uploads[0]['Key'].startswith('notify/notify-pack/'))
+        self.assertEqual(
+            json.loads(zlib.decompress(uploads[0]['Body']))['resources'][0]['InstanceId'],
+            'i-big')
+        self.assertEqual(
+            [r['InstanceId'] for d in decoded for r in d.get('resources', ())],
+            ['i-%d' % i for i in range(20)])
+
+        # without an offload location oversized resources are skipped.
+        notify.data['transport'].pop('offload')
+        self.assertEqual(
+            [count for body, count in notify.pack_resources(message, resources[5:6], 10000)],
+            [])
+
+    def test_notify_send_batches(self):
+        notify = self.get_notify()
+        self.patch(notify, 'executor_factory', MainThreadExecutor)
+        self.patch(notify_module.time, 'sleep', lambda delay: None)
+        sent = []
+
+        class Client:
+            def send_message_batch(self, QueueUrl, Entries):
+                sent.append([e['MessageBody'] for e in Entries])
+                # b fails on the service's side the first time it's sent
+                failed = [e for e in Entries if e['MessageBody'] == 'b' and len(sent) == 1]
+                return {
+                    'Successful': [
+                        {'Id': e['Id'], 'MessageId': 'm-%s' % e['MessageBody']}
+                        for e in Entries if e not in failed],
+                    'Failed': [
+                        {'Id': e['Id'], 'Code': 'Internal', 'SenderFault': False}
+                        for e in failed]}
+
+        self.patch(notify, 'get_client', lambda region, service: Client())
+        self.patch(notify, 'max_message_size', 2000)
+        bodies = [('a' * 1000, 2), ('b', 1), ('c' * 1200, 3)] + [(str(i), 1) for i in range(12)]
+        receipts = list(notify.send_data_messages({}, bodies))
+        self.assertEqual([len(batch) for batch in sent], [2, 1, 10, 3])
+        self.assertEqual(sent[1], ['b'])
+        self.assertEqual(len(receipts), 15)
+        self.assertIn(('m-b', 1), receipts)
+        self.assertIn(('m-' + 'c' * 1200, 3), receipts)
+
+    def test_notify_send_batches_failed(self):
+        notify = self.get_notify()
+        self.patch(notify, 'executor_factory', MainThreadExecutor)
+        self.patch(notify_module.time, 'sleep', lambda delay: None)
+        attempts = []
+
+        class Client:
+            def send_message_batch(self, QueueUrl, Entries):
+                attempts.append(len(Entries))
+                return {
+                    'Successful': [],
+                    'Failed': [
+                        {'Id': e['Id'], 'Code': e['MessageBody'],
+                         'SenderFault': e['MessageBody'] == 'InvalidParameterValue'}
+                        for e in Entries]}
+
+        self.patch(notify, 'get_client', lambda region, service: Client())
+        bodies = [('InvalidParameterValue', 1), ('InternalError', 1)]
+        with self.assertRaises(PolicyExecutionError) as e:
+            list(notify.send_data_messages({}, bodies))
+        self.assertIn('failed to send 2 messages', str(e.exception))
+        # only the service side failure is retried, until retries run out
+        self.assertEqual(attempts, [2, 1, 1, 1, 1])
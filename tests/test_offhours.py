@@ -9,6 +9,8 @@ from dateutil import tz as tzutil
 from .common import BaseTest, instance
 
 from c7n.exceptions import PolicyValidationError
+from c7n.config import Bag
+from c7n.filters import offhours
 from c7n.filters.offhours import OffHour, OnHour, ScheduleParser, Time
 from c7n.testing import mock_datetime_now
 
@@ -525,6 +527,38 @@ class OffHoursFilterTest(BaseTest):
             i = instance(Tags=[{"Key": "maid_offhours", "Value": "on"}])
             self.assertEqual(OnHour({})(i), True)
 
+    def test_process_memoized(self):
+        t = datetime.datetime(
+            year=2015, month=12, day=1, hour=19, minute=5,
+            tzinfo=tzutil.gettz("America/New_York"))
+        lookups = []
+        self.patch(
+            offhours, "ValuesFrom",
+            lambda data, manager: Bag(
+                get_values=lambda: lookups.append(data) or ["2015-12-02"]))
+        f = OffHour({"skip-days-from": {"url": "s3://bucket/days.json"}})
+        self.patch(f.parser, "parse", lambda value, parse=f.parser.parse: (
+            lookups.append(value) or parse(value)))
+
+        with mock_datetime_now(t, datetime):
+            resources = f.process([
+                instance(Tags=[{"Key": "maid_offhours", "Value": value}])
+                for value in ["off=(m-f,19);tz=pt", "off=(m-f,19)", "tz=est"] * 10])
+        self.assertEqual(len(resources), 30)
+        self.assertEqual(
+            lookups,
+            [{"url": "s3://bucket/days.json"}, "off=(m-f,19);tz=pt", "off=(m-f,19)"])
+        self.assertEqual(len(f.schedules), 3)
+
+    def test_schedule_cache_bounded(self):
+        self.patch(Time, "SCHEDULE_CACHE_SIZE", 2)
+        f = OffHour({})
+        for hour in range(5):
+            f.resolve_schedule("off=(m-f,%d)" % hour, "off")
+        self.assertEqual(
+            list(f.schedules), ["off=(m-f,3)", "off=(m-f,4)"])
+        self.assertEqual(len(f.parser.cache), 2)
+
 
 class ScheduleParserTest(BaseTest):
     # table style test
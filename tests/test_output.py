@@ -11,7 +11,8 @@ from dateutil.parser import parse as date_parse
 
 from c7n.ctx import ExecutionContext
 from c7n.config import Config
-from c7n.output import DirectoryOutput, BlobOutput, LogFile, metrics_outputs
+from c7n.output import (
+    DirectoryOutput, BlobOutput, LogFile, background_uploads, metrics_outputs, wait_uploads)
 from c7n.resources.aws import S3Output, MetricsOutput
 from c7n.testing import mock_datetime_now, TestUtils
 
@@ -173,3 +174,78 @@ class S3OutputTest(TestUtils):
             "%s/foo.txt" % output.key_prefix.lstrip('/'),
             extra_args={"ACL": "bucket-owner-full-control", "ServerSideEncryption": "AES256"},
         )
+
+    def test_upload_compressed(self):
+        output = self.get_s3_output(cleanup=False)
+        for name in ("foo.txt", "resources.json.gz"):
+            with open(os.path.join(output.root_dir, name), "w") as fh:
+                fh.write("abc")
+        output.transfer = mock.MagicMock()
+        output.ship()
+        self.assertFalse(os.path.exists(output.root_dir))
+        self.assertEqual(
+            sorted(c[0][2] for c in output.transfer.upload_file.call_args_list),
+            ["%s/foo.txt.gz" % output.key_prefix,
+             "%s/resources.json.gz" % output.key_prefix])
+
+    def test_async_upload(self):
+        with mock_datetime_now(date_parse('2020/06/10 13:00'), datetime):
+            output = self.get_s3_output(
+                output_url="s3://cloud-custodian/policies?async_upload=true&upload_workers=2",
+                cleanup=False)
+        self.assertEqual(output.key_prefix, "policies/xyz/2020/06/10/13")
+        self.assertEqual(output.config['upload_workers'], '2')
+
+        with open(os.path.join(output.root_dir, "foo.txt"), "w") as fh:
+            fh.write("abc")
+        output.transfer = mock.MagicMock()
+        with background_uploads() as failed:
+            output.__exit__()
+            self.assertEqual(wait_uploads(), [])
+            self.assertFalse(os.path.exists(output.root_dir))
+            output.transfer.upload_file.assert_called_once()
+
+            output = self.get_s3_output(
+                output_url="s3://cloud-custodian/policies?async_upload=true", cleanup=False)
+            output.transfer = mock.MagicMock()
+            output.transfer.upload_file.side_effect = ValueError("denied")
+            with open(os.path.join(output.root_dir, "foo.txt"), "w") as fh:
+                fh.write("abc")
+            output.__exit__()
+            self.assertEqual(wait_uploads(), ["xyz"])
+            self.assertEqual(wait_uploads(), [])
+
+            output = self.get_s3_output(
+                output_url="s3://cloud-custodian/policies?async_upload=true", cleanup=False)
+            output.transfer = mock.MagicMock()
+            output.transfer.upload_file.side_effect = ValueError("denied")
+            with open(os.path.join(output.root_dir, "foo.txt"), "w") as fh:
+                fh.write("abc")
+            output.__exit__()
+        # failures still pending when the block exits are reported
+        self.assertEqual(failed, ["xyz"])
+
+    def test_async_upload_waits_on_exit(self):
+        output = self.get_s3_output(
+            output_url="s3://cloud-custodian/policies?async_upload=true", cleanup=False)
+        output.transfer = mock.MagicMock()
+        with open(os.path.join(output.root_dir, "foo.txt"), "w") as fh:
+            fh.write("abc")
+
+        # outside of a background block the upload completes on exit
+        output.__exit__()
+        self.assertFalse(os.path.exists(output.root_dir))
+        output.transfer.upload_file.assert_called_once()
+
+        output = self.get_s3_output(
+            output_url="s3://cloud-custodian/policies?async_upload=true", cleanup=False)
+        output.transfer = mock.MagicMock()
+        with open(os.path.join(output.root_dir, "foo.txt"), "w") as fh:
+            fh.write("abc")
+        with background_uploads():
+            with background_uploads():
+                output.__exit__()
+            self.assertEqual(len(BlobOutput.pending), 1)
+        self.assertEqual(BlobOutput.pending, None)
+        self.assertFalse(os.path.exists(output.root_dir))
+        output.transfer.upload_file.assert_called_once()
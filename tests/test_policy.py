@@ -19,7 +19,7 @@ from c7n.resources.ec2 import EC2
 from c7n.resources.kinesis import KinesisStream
 from c7n.policy import execution, ConfigPollRuleMode, Policy, PullMode
 from c7n.schema import generate, JsonSchemaValidator
-from c7n.utils import dumps
+from c7n.utils import dumps, load_records
 from c7n.query import ConfigSource, TypeInfo
 from c7n.version import version
 
@@ -1403,6 +1403,124 @@ class PullModeTest(BaseTest):
             session_factory=None)
         self.assertEqual(p.is_runnable(), True)
 
+    def test_pull_stream(self):
+        session_factory = self.replay_flight_data("test_pull_mode_stream")
+        p = self.load_policy(
+            {"name": "igw-stream",
+             "resource": "internet-gateway",
+             "filters": [{"type": "value", "key": "InternetGatewayId",
+                          "op": "ne", "value": "igw-5bce113e"}],
+             "actions": [{"type": "tag", "key": "Stream", "value": "Batch"}]},
+            config={"stream_batch_size": 2},
+            output_dir=self.get_temp_dir(),
+            session_factory=session_factory)
+        self.assertTrue(p.get_execution_mode().can_stream())
+
+        batches = []
+        action = p.resource_manager.actions[0]
+        process = action.process
+
+        def record_batch(resources):
+            # the batch is written out before its actions run
+            batches.append((
+                [r["InternetGatewayId"] for r in resources],
+                [r["InternetGatewayId"] for r in load_records(
+                    os.path.join(p.ctx.log_dir, "resources.json"))]))
+            process(resources)
+            return [r["InternetGatewayId"] for r in resources]
+
+        self.patch(action, "process", record_batch)
+        resources = p.run()
+        self.assertEqual(
+            [r["InternetGatewayId"] for r in resources],
+            ["igw-3d9e3d56", "igw-e74b2b82"])
+        self.assertEqual(batches, [
+            (["igw-3d9e3d56"], ["igw-3d9e3d56"]),
+            (["igw-e74b2b82"], ["igw-3d9e3d56", "igw-e74b2b82"])])
+        self.assertEqual(
+            [r["InternetGatewayId"] for r in json.load(
+                open(os.path.join(p.ctx.log_dir, "resources.json")))],
+            ["igw-3d9e3d56", "igw-e74b2b82"])
+        # action results keep the same shape as a non streaming run, per batch
+        for name, result in (("action-tag", ["igw-3d9e3d56"]),
+                             ("action-tag.2", ["igw-e74b2b82"])):
+            with open(os.path.join(p.ctx.log_dir, name)) as fh:
+                self.assertEqual(json.load(fh), result)
+
+    def test_pull_stream_action_error(self):
+        session_factory = self.replay_flight_data("test_pull_mode_stream")
+        p = self.load_policy(
+            {"name": "igw-stream",
+             "resource": "internet-gateway",
+             "filters": [{"type": "value", "key": "InternetGatewayId",
+                          "op": "ne", "value": "igw-5bce113e"}],
+             "actions": [{"type": "tag", "key": "Stream", "value": "Batch"}]},
+            config={"stream_batch_size": 2},
+            output_dir=self.get_temp_dir(),
+            session_factory=session_factory)
+
+        def fail(resources):
+            raise ValueError("tag failed")
+
+        self.patch(p.resource_manager.actions[0], "process", fail)
+        with self.assertRaises(ValueError):
+            p.run()
+        # the resources an action was attempted on are still recorded
+        with open(os.path.join(p.ctx.log_dir, "resources.json")) as fh:
+            self.assertEqual(
+                [r["InternetGatewayId"] for r in json.load(fh)], ["igw-3d9e3d56"])
+
+    def test_pull_resources_format(self):
+        session_factory = self.replay_flight_data("test_query_manager")
+        p = self.load_policy(
+            {"name": "igw-format", "resource": "internet-gateway"},
+            config={"resources_format": "jsonl.gz"},
+            output_dir=self.get_temp_dir(),
+            session_factory=session_factory)
+        resources = p.run()
+        self.assertTrue(resources)
+        self.assertFalse(os.path.exists(os.path.join(p.ctx.log_dir, "resources.json")))
+        self.assertEqual(
+            [r["InternetGatewayId"] for r in load_records(
+                os.path.join(p.ctx.log_dir, "resources.jsonl.gz"))],
+            [r["InternetGatewayId"] for r in resources])
+
+    def test_pull_stream_set_level_filter(self):
+        p = self.load_policy(
+            {"name": "igw-reduce",
+             "resource": "internet-gateway",
+             "filters": [{"or": [{"type": "reduce", "limit": 1}]}]},
+            config={"stream_batch_size": 2},
+            session_factory=None)
+        self.assertFalse(p.get_execution_mode().can_stream())
+
+        p = self.load_policy(
+            {"name": "igw-count",
+             "resource": "internet-gateway",
+             "filters": [{"type": "value", "value_type": "resource_count",
+                          "op": "gte", "value": 2}]},
+            config={"stream_batch_size": 2},
+            session_factory=None)
+        self.assertFalse(p.get_execution_mode().can_stream())
+
+        # related resource counts are per resource
+        p = self.load_policy(
+            {"name": "ec2-sg-count",
+             "resource": "ec2",
+             "filters": [{"type": "security-group", "key": "GroupId",
+                          "value_type": "resource_count", "op": "gte", "value": 2}]},
+            config={"stream_batch_size": 2},
+            session_factory=None)
+        self.assertTrue(p.get_execution_mode().can_stream())
+
+        p = self.load_policy(
+            {"name": "igw-limit",
+             "resource": "internet-gateway",
+             "max-resources": 1},
+            config={"stream_batch_size": 2},
+            session_factory=None)
+        self.assertFalse(p.get_execution_mode().can_stream())
+
 
 class PhdModeTest(BaseTest):
 
@@ -5,7 +5,11 @@ import logging
 import os
 
 
-from c7n.query import ResourceQuery, RetryPageIterator, TypeInfo
+from c7n import cache, query
+from c7n.config import Config as C7NConfig
+from c7n.exceptions import PolicyValidationError
+from c7n.executor import MainThreadExecutor
+from c7n.query import ChildResourceQuery, ResourceQuery, RetryPageIterator, TypeInfo
 from c7n.resources.vpc import InternetGateway
 
 from botocore.config import Config
@@ -99,6 +103,53 @@ class ResourceQueryTest(BaseTest):
         assert repr(TypeInfo) == "<TypeInfo TypeInfo>"
 
 
+class ChildResourceQueryTest(BaseTest):
+
+    def test_child_query_parent_order(self):
+        session_factory = self.replay_flight_data("test_ecs_service_subnet")
+        p = self.load_policy(
+            {"name": "ecs-services", "resource": "ecs-service"},
+            session_factory=session_factory)
+        self.patch(p.resource_manager, "executor_factory", MainThreadExecutor)
+        q = ChildResourceQuery(p.session_factory, p.resource_manager)
+        q.capture_parent_id = True
+        resources = q.filter(p.resource_manager)
+        self.assertEqual(
+            resources,
+            [("arn:aws:ecs:us-east-1:644160558196:cluster/test",
+              "arn:aws:ecs:us-east-1:644160558196:service/test/c7n-test"),
+             ("arn:aws:ecs:us-east-1:644160558196:cluster/test",
+              "arn:aws:ecs:us-east-1:644160558196:service/test-no-tag")])
+
+    def test_child_query_iter(self):
+        session_factory = self.replay_flight_data("test_efs_subresource")
+        p = self.load_policy(
+            {"name": "mount-targets", "resource": "efs-mount-target"},
+            session_factory=session_factory)
+        q = ChildResourceQuery(p.session_factory, p.resource_manager)
+        resources = q.filter_iter(p.resource_manager)
+        self.assertFalse(isinstance(resources, list))
+        self.assertEqual(len(list(resources)), 2)
+
+    def test_child_source_streams(self):
+        session_factory = self.replay_flight_data("test_efs_subresource")
+        p = self.load_policy(
+            {"name": "mount-targets", "resource": "efs-mount-target"},
+            session_factory=session_factory)
+        calls = []
+        filter_iter = ChildResourceQuery.filter_iter
+
+        def recording_filter_iter(q, *args, **kw):
+            calls.append(q)
+            return filter_iter(q, *args, **kw)
+
+        self.patch(ChildResourceQuery, 'filter_iter', recording_filter_iter)
+        self.assertTrue(p.resource_manager.can_stream())
+        batches = list(p.resource_manager.resources_iter(1))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([len(b) for b in batches], [1, 1])
+
+
 class ConfigSourceTest(BaseTest):
 
     def test_config_select(self):
@@ -128,6 +179,119 @@ class ConfigSourceTest(BaseTest):
         p.data['query'] = [{'clause': "configuration.imageId = 'xyz'"}]
         self.assertIn("imageId = 'xyz'", source.get_query_params(None)['expr'])
 
+    def test_config_batched_resources(self):
+        p = self.load_policy({'name': 'x', 'resource': 'ebs'})
+        self.patch(p.resource_manager, 'executor_factory', MainThreadExecutor)
+        self.patch(query.time, 'sleep', lambda delay: None)
+        source = p.resource_manager.get_source('config')
+        source.batch_size = 2
+        ids = ['vol-%d' % i for i in range(5)]
+
+        def item(rid, history=False):
+            config = {'volumeId': rid}
+            supplementary = {}
+            # vol-2's tags are in its supplementary configuration
+            if rid == 'vol-2':
+                supplementary['Tags'] = json.dumps([{'key': 'App', 'value': 'Custodian'}])
+            elif rid != 'vol-4':
+                config['tags'] = []
+            item = {'resourceId': rid, 'supplementaryConfiguration': supplementary,
+                    'configuration': json.dumps(config)}
+            if history:
+                item['tags'] = {'Env': 'Dev'}
+            return item
+
+        class Client:
+            batches = []
+            history = []
+
+            def batch_get_resource_config(self, resourceKeys):
+                self.batches.append([k['resourceId'] for k in resourceKeys])
+                # vol-3 is never processed, vol-1 needs a second attempt.
+                unprocessed = [
+                    k for k in resourceKeys if k['resourceId'] == 'vol-3' or (
+                        k['resourceId'] == 'vol-1' and len(self.batches) == 1)]
+                return {
+                    'baseConfigurationItems': [
+                        item(k['resourceId']) for k in resourceKeys
+                        if k not in unprocessed and k['resourceId'] != 'vol-4'],
+                    'unprocessedResourceKeys': unprocessed}
+
+            def get_resource_config_history(self, resourceId, resourceType, limit):
+                self.history.append(resourceId)
+                return {'configurationItems': [item(resourceId, history=True)]}
+
+        client = Client()
+        resources = source.get_batched_resources(client, ids)
+        self.assertEqual(
+            [r['VolumeId'] for r in resources], ['vol-0', 'vol-1', 'vol-2', 'vol-3'])
+        self.assertEqual(
+            client.batches[:3], [['vol-0', 'vol-1'], ['vol-1'], ['vol-2', 'vol-3']])
+        self.assertEqual(client.batches.count(['vol-3']), 4)
+        # only unprocessed keys fall back to history
+        self.assertEqual(client.history, ['vol-3'])
+        self.assertEqual(resources[1]['Tags'], [])
+        self.assertEqual(resources[2]['Tags'], [{'Key': 'App', 'Value': 'Custodian'}])
+        self.assertEqual(resources[3]['Tags'], [])
+
+
+class ConfigAggregatorSourceTest(BaseTest):
+
+    def test_aggregator_query(self):
+        p = self.load_policy({
+            'name': 'x', 'resource': 'ebs', 'source': 'config-aggregator',
+            'query': [{'aggregator': 'org'}, {'clause': 'configuration.encrypted = false'}]})
+        self.assertEqual(
+            p.resource_manager.source.get_query_params(None),
+            {'aggregator': 'org',
+             'expr': ("select resourceId, accountId, awsRegion, configuration, "
+                      "supplementaryConfiguration where resourceType = 'AWS::EC2::Volume' "
+                      "AND configuration.encrypted = false")})
+        self.assertEqual(
+            p.get_permissions(), {'config:SelectAggregateResourceConfig'})
+
+    def test_aggregator_validate(self):
+        for data, error in (
+                ({}, 'requires an aggregator'),
+                ({'query': [{'aggregator': 'org'}], 'actions': ['delete']},
+                 "doesn't support actions"),
+                ({'query': [{'aggregator': 'org'}],
+                  'mode': {'type': 'periodic', 'schedule': 'rate(1 day)'}},
+                 'only supports pull mode'),
+                ({'query': [{'aggregator': 'org'}], 'resource': 'cache-cluster'},
+                 'does not support resource-type:cache-cluster')):
+            data.setdefault('resource', 'ebs')
+            data.update({'name': 'x', 'source': 'config-aggregator'})
+            with self.assertRaises(PolicyValidationError) as e:
+                self.load_policy(data)
+            self.assertIn(error, str(e.exception))
+
+    def test_aggregator_resources(self):
+        factory = self.replay_flight_data('test_config_aggregator_source')
+        output_dir = self.get_temp_dir()
+        p = self.load_policy({
+            'name': 'org-volumes', 'resource': 'ebs', 'source': 'config-aggregator',
+            'query': [{'aggregator': 'org'}]},
+            session_factory=factory, output_dir=output_dir)
+        resources = p.run()
+        self.assertEqual(
+            [(r['VolumeId'], r['c7n:AccountId'], r['c7n:Region']) for r in resources],
+            [('vol-0a1', '111111111111', 'us-east-1'),
+             ('vol-0b2', '111111111111', 'us-west-2'),
+             ('vol-0c3', '222222222222', 'us-east-1')])
+
+        def volumes(*path):
+            with open(os.path.join(output_dir, 'org-volumes', *path)) as fh:
+                return [r['VolumeId'] for r in json.load(fh)]
+
+        self.assertEqual(len(volumes('resources.json')), 3)
+        self.assertEqual(
+            volumes('111111111111', 'us-east-1', 'resources.json'), ['vol-0a1'])
+        self.assertEqual(
+            volumes('111111111111', 'us-west-2', 'resources.json'), ['vol-0b2'])
+        self.assertEqual(
+            volumes('222222222222', 'us-east-1', 'resources.json'), ['vol-0c3'])
+
 
 class QueryResourceManagerTest(BaseTest):
 
@@ -154,6 +318,69 @@ class QueryResourceManagerTest(BaseTest):
         p.run()
         self.assertTrue("Using cached internet-gateway: 3", output.getvalue())
 
+    def test_resource_snapshots(self):
+        session_factory = self.replay_flight_data("test_query_manager")
+        with cache.resource_snapshots(C7NConfig.empty(cache='memory', cache_period=0)) as s:
+            self.assertEqual(s, None)
+
+        with cache.resource_snapshots() as snapshots:
+            p1 = self.load_policy(
+                {
+                    "name": "igw-check",
+                    "resource": "internet-gateway",
+                    "filters": [{"InternetGatewayId": "igw-2e65104a"}],
+                },
+                session_factory=session_factory,
+            )
+            resources = p1.run()
+            self.assertEqual(len(resources), 1)
+            self.assertIn("c7n:MatchedFilters", resources[0])
+
+            p2 = self.load_policy(
+                {"name": "igw-all", "resource": "internet-gateway"},
+                session_factory=session_factory,
+            )
+            resources = p2.run()
+            self.assertEqual(len(resources), 1)
+            self.assertFalse([r for r in resources if "c7n:MatchedFilters" in r])
+            self.assertEqual(
+                snapshots.get_stats(p1.ctx.execution_id),
+                {"fetches": 1, "hits": 0, "resources-reused": 0})
+            self.assertEqual(
+                p2.ctx.get_metadata()["resource-snapshots"],
+                {"fetches": 0, "hits": 1, "resources-reused": 1})
+        self.assertEqual(cache.get_snapshots(), None)
+
+    def test_resources_iter_reuses_augmented(self):
+        session_factory = self.replay_flight_data("test_query_manager")
+
+        def augment(resources):
+            raise AssertionError("reused resources are already augmented")
+
+        with cache.resource_snapshots() as snapshots:
+            p1 = self.load_policy(
+                {"name": "igw-all", "resource": "internet-gateway"},
+                session_factory=session_factory)
+            resources = p1.resource_manager.resources()
+            self.assertTrue(resources)
+
+            p2 = self.load_policy(
+                {"name": "igw-stream", "resource": "internet-gateway"},
+                session_factory=session_factory)
+            self.patch(p2.resource_manager, "augment", augment)
+            batches = list(p2.resource_manager.resources_iter(1))
+            self.assertEqual(len(batches), len(resources))
+            self.assertEqual(snapshots.get_stats(p2.ctx.execution_id)["hits"], 1)
+
+        p3 = self.load_policy(
+            {"name": "igw-cached", "resource": "internet-gateway"},
+            cache=True,
+            session_factory=session_factory)
+        self.assertEqual(len(p3.resource_manager.resources()), len(resources))
+        self.patch(p3.resource_manager, "augment", augment)
+        batches = list(p3.resource_manager.resources_iter(1))
+        self.assertEqual(len(batches), len(resources))
+
     def test_get_resources(self):
         session_factory = self.replay_flight_data("test_query_manager_get")
         p = self.load_policy(
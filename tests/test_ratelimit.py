@@ -0,0 +1,131 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+import os
+
+import boto3
+from botocore.stub import Stubber
+
+from c7n import ratelimit
+from c7n.credentials import SessionFactory
+from c7n.resources import aws
+
+from .common import BaseTest
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTest(BaseTest):
+
+    def setUp(self):
+        super().setUp()
+        self.clock = Clock()
+        self.patch(ratelimit.time, 'time', self.clock.time)
+        self.patch(ratelimit.time, 'sleep', self.clock.sleep)
+
+    def test_bucket_burst_and_refill(self):
+        bucket = ratelimit.TokenBucket(2)
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+        bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [0.5])
+        self.clock.now += 10
+        # refill is capped at the burst size
+        for i in range(3):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [0.5, 0.5])
+
+    def test_file_bucket_shared(self):
+        path = os.path.join(self.get_temp_dir(), 'bucket.json')
+        first = ratelimit.FileTokenBucket(path, 1)
+        second = ratelimit.FileTokenBucket(path, 1)
+        self.assertEqual(first.take(), 0)
+        self.assertEqual(second.take(), 1.0)
+        self.clock.now += 1
+        self.assertEqual(second.take(), 0)
+        self.assertEqual(first.take(), 1.0)
+
+
+class RateLimiterTest(BaseTest):
+
+    def setUp(self):
+        super().setUp()
+        self.limiter = ratelimit.RateLimiter()
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate('ec2.DescribeInstances=2.5'),
+                         ('ec2.DescribeInstances', 2.5))
+        for value in ('ec2', 'ec2=', 'ec2=x', '=5', 'ec2=0'):
+            self.assertRaises(ValueError, ratelimit.parse_rate, value)
+
+    def test_get_rate(self):
+        self.assertEqual(self.limiter.get_rate('ec2', 'DescribeInstances'), (None, None))
+        self.limiter.configure(['ec2.DescribeInstances=5', 'default=50'])
+        self.assertEqual(
+            self.limiter.get_rate('ec2', 'DescribeInstances'), ('ec2.DescribeInstances', 5))
+        self.assertEqual(self.limiter.get_rate('ec2', 'DescribeVolumes'), ('ec2', 20))
+        self.assertEqual(self.limiter.get_rate('sqs', 'ListQueues'), ('default', 50))
+        with self.limiter.override({'sqs': 2}):
+            self.assertEqual(self.limiter.get_rate('sqs', 'ListQueues'), ('sqs', 2))
+            self.assertEqual(self.limiter.get_rate('ec2', 'DescribeVolumes'), ('ec2', 20))
+        self.assertEqual(self.limiter.get_rate('sqs', 'ListQueues'), ('default', 50))
+
+    def test_override_disabled(self):
+        with self.limiter.override({'sqs.ListQueues': 1}):
+            self.assertEqual(self.limiter.get_rate('sqs', 'ListQueues'), ('sqs.ListQueues', 1))
+            self.assertEqual(self.limiter.get_rate('ec2', 'DescribeVolumes'), (None, None))
+
+    def test_bucket_keys(self):
+        self.limiter.configure({'sqs': 5}, state_dir=self.get_temp_dir())
+        bucket = self.limiter.get_bucket('123', 'us-east-2', 'sqs', 5)
+        self.assertIsInstance(bucket, ratelimit.FileTokenBucket)
+        self.assertEqual(
+            os.path.basename(bucket.path), '123-us-east-2-sqs.json')
+        self.assertIs(self.limiter.get_bucket('123', 'us-east-2', 'sqs', 5), bucket)
+        self.assertIsNot(self.limiter.get_bucket('456', 'us-east-2', 'sqs', 5), bucket)
+        self.limiter.get_bucket('123', 'us-east-2', 'sqs', 10)
+        self.assertEqual((bucket.rate, bucket.burst), (10, 10))
+
+    def test_session_subscriber(self):
+        self.limiter.configure({'sqs.ListQueues': 5})
+        acquired = []
+        self.patch(ratelimit.RateLimiter, 'acquire', lambda self, *args: acquired.append(args))
+
+        factory = SessionFactory('us-east-2')
+        stats = aws.ApiStats(None)
+        factory.add_subscriber(self.limiter.subscriber('123'))
+        factory.add_subscriber(stats)
+        factory.add_subscriber(stats)
+        self.assertEqual(len(factory._subscribers), 2)
+        factory.remove_subscriber(stats)
+        self.assertEqual(len(factory._subscribers), 1)
+
+        session = factory.update(boto3.Session(
+            region_name='us-east-2',
+            aws_access_key_id='xyz', aws_secret_access_key='abc'))
+        client = session.client('sqs')
+        with Stubber(client) as stubber:
+            stubber.add_response('list_queues', {'QueueUrls': []})
+            client.list_queues()
+        self.assertEqual(acquired, [('123', 'us-east-2', 'sqs', 'ListQueues')])
+
+    def test_policy_rate_limits(self):
+        p = self.load_policy({
+            'name': 'limited', 'resource': 'sqs',
+            'rate-limits': {'sqs.ListQueues': 2}})
+        with p.ctx:
+            self.assertEqual(
+                ratelimit.limiter.get_rate('sqs', 'ListQueues'), ('sqs.ListQueues', 2))
+        self.assertEqual(ratelimit.limiter.overrides, [])
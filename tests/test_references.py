@@ -0,0 +1,82 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+from collections import Counter
+
+from c7n import cache
+from c7n.resources.references import ReferenceGraph, ReferenceGraphMixin
+
+from .common import BaseTest
+
+
+class ReferenceGraphTest(BaseTest):
+
+    def get_manager(self):
+        p = self.load_policy({'name': 'snaps', 'resource': 'ebs-snapshot'})
+        fetches = Counter()
+        data = {
+            'asg': [
+                {'AutoScalingGroupName': 'web', 'LaunchConfigurationName': 'web-lc'},
+                {'AutoScalingGroupName': 'api', 'LaunchTemplate': {
+                    'LaunchTemplateId': 'lt-1'}},
+                {'AutoScalingGroupName': 'mixed', 'MixedInstancesPolicy': {
+                    'LaunchTemplate': {'LaunchTemplateSpecification': {
+                        'LaunchTemplateId': 'lt-2'}}}}],
+            'launch-config': [
+                {'LaunchConfigurationName': 'web-lc', 'ImageId': 'ami-1',
+                 'BlockDeviceMappings': [{'Ebs': {'SnapshotId': 'snap-1'}}]},
+                {'LaunchConfigurationName': 'old-lc', 'ImageId': 'ami-2',
+                 'BlockDeviceMappings': [{'Ebs': {'SnapshotId': 'snap-2'}}]}],
+        }
+
+        class Manager:
+
+            def __init__(self, rtype):
+                self.rtype = rtype
+
+            def resources(self):
+                fetches[self.rtype] += 1
+                return data[self.rtype]
+
+        self.patch(p.resource_manager, 'get_resource_manager', Manager)
+        return p.resource_manager, fetches
+
+    def test_graph_edges(self):
+        manager, fetches = self.get_manager()
+        graph = ReferenceGraph(manager)
+        self.assertEqual(graph.get('asg-launch-config'), {'web-lc': {'web'}})
+        self.assertEqual(
+            graph.get('launch-config-snapshot'),
+            {'snap-1': {'web-lc'}, 'snap-2': {'old-lc'}})
+        self.assertEqual(
+            graph.referenced('launch-config-snapshot', 'launch-config-image'),
+            {'snap-1', 'snap-2', 'ami-1', 'ami-2'})
+        self.assertEqual(fetches, {'asg': 1, 'launch-config': 1})
+
+        # without a run snapshot store, graphs don't share state
+        ReferenceGraph(manager).get('asg-launch-config')
+        self.assertEqual(fetches['asg'], 2)
+
+    def test_graph_shared_in_run(self):
+        manager, fetches = self.get_manager()
+        with cache.resource_snapshots():
+            ReferenceGraph(manager).get('launch-config-image')
+            graph = ReferenceGraph(manager)
+            self.assertEqual(
+                graph.get('launch-config-image'),
+                {'ami-1': {'web-lc'}, 'ami-2': {'old-lc'}})
+            graph.get('launch-config-snapshot')
+        self.assertEqual(fetches, {'launch-config': 1})
+
+    def test_graph_mixin(self):
+        manager, fetches = self.get_manager()
+
+        class Usage(ReferenceGraphMixin):
+            pass
+
+        usage = Usage()
+        usage.manager = manager
+        graph = usage.graph
+        self.assertIs(usage.graph, graph)
+        self.assertEqual(graph.manager, manager)
+        usage.reset_graph()
+        self.assertIsNot(usage.graph, graph)
@@ -1,8 +1,21 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import importlib
+import json
 import unittest
 
+from c7n.policy import execution
 from c7n.registry import PluginRegistry
+from c7n.resources import load_resources
+from c7n.resources.element_map import ElementMap, ElementSchemas
+
+
+class LazyPlugin:
+    pass
+
+
+class OtherLazyPlugin:
+    pass
 
 
 class RegistryTest(unittest.TestCase):
@@ -67,3 +80,63 @@ class RegistryTest(unittest.TestCase):
 
         registry.register('concrete', _plugin_impl_func, condition=False)
         self.assertEqual(list(registry.keys()), [])
+
+    def test_register_lazy(self):
+        registry = PluginRegistry('dummy')
+        registry.register_lazy('lazy', '%s.LazyPlugin' % __name__)
+        registry.register('dust', lambda: 1)
+        registry.register_lazy('dust', '%s.OtherLazyPlugin' % __name__)
+        self.assertIn('lazy', registry)
+        self.assertEqual(registry.paths()['lazy'], '%s.LazyPlugin' % __name__)
+        self.assertIsInstance(registry._factories['lazy'], str)
+
+        self.assertEqual(registry.get('lazy'), LazyPlugin)
+        self.assertEqual(LazyPlugin.type, 'lazy')
+        self.assertNotEqual(registry['dust'], OtherLazyPlugin)
+        self.assertEqual(len(list(registry.values())), 2)
+
+    def test_register_lazy_resolve_registers(self):
+        # resolving a plugin can import a module registering another
+        registry = PluginRegistry('dummy')
+        registry.register_lazy('lazy', '%s.LazyPlugin' % __name__)
+        registry.register_lazy('other', '%s.OtherLazyPlugin' % __name__)
+        resolve = registry._resolve
+
+        def _resolve(name):
+            registry.register('other')(OtherLazyPlugin)
+            return resolve(name)
+
+        registry._resolve = _resolve
+        self.assertEqual(
+            dict(registry.items()),
+            {'lazy': LazyPlugin, 'other': OtherLazyPlugin})
+
+    def test_element_map(self):
+        load_resources(('aws.ec2', 'aws.sqs'))
+        from c7n.resources.aws import AWS
+        ec2 = AWS.resources['ec2']
+        for group in ('*', 'arn', 'aws.ec2'):
+            for key, path in ElementMap[group].items():
+                kind, name = key.split('.', 1)
+                registry = getattr(ec2, kind == 'filters' and 'filter_registry' or
+                                   'action_registry')
+                # unless the resource defines its own
+                self.assertIn(registry.paths()[name], (
+                    path, '%s.%s' % (ec2.__module__, registry[name].__qualname__)))
+                self.assertEqual(registry[name].type, name)
+        self.assertNotIn('send-command', AWS.resources['sqs'].action_registry)
+        for name, path in ElementMap['modes'].items():
+            self.assertEqual(execution.paths()[name], path)
+            self.assertEqual(execution[name].type, name)
+
+    def test_element_map_schemas(self):
+        # regenerate with tools/dev/elementmap.py when these change
+        paths = {p for group in ElementMap.values() for p in group.values()}
+        self.assertEqual(set(ElementSchemas), paths)
+        for path, recorded in ElementSchemas.items():
+            module_name, class_name = path.rsplit('.', 1)
+            klass = getattr(importlib.import_module(module_name), class_name)
+            self.assertEqual(
+                recorded['schema'], json.loads(json.dumps(klass.schema)), path)
+            self.assertEqual(
+                recorded['schema_alias'], bool(getattr(klass, 'schema_alias', False)))
@@ -1,6 +1,14 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
-from c7n.reports.csvout import Formatter, strip_output_path
+import gzip
+import io
+import json
+import os
+from datetime import datetime
+
+from c7n.reports.csvout import (
+    Formatter, fs_record_set, iter_record_set, strip_output_path)
+from c7n.utils import dump_records, reset_session_cache
 from .common import BaseTest, load_data
 
 
@@ -146,3 +154,91 @@ class TestMultiReport(BaseTest):
             strip_output_path(p, policy_name) == f"logs/{policy_name}"
             for p in output_paths
         ))
+
+    def test_fs_record_set_formats(self):
+        temp_dir = self.get_temp_dir()
+        self.assertEqual(fs_record_set(temp_dir, 'xyz'), [])
+        dump_records(
+            os.path.join(temp_dir, 'resources.jsonl.gz'),
+            [{'InstanceId': 'i-1'}, {'InstanceId': 'i-2'}])
+        records = fs_record_set(temp_dir, 'xyz')
+        self.assertEqual([r['InstanceId'] for r in records], ['i-1', 'i-2'])
+        self.assertIn('CustodianDate', records[0])
+
+    def test_iter_csv_unique(self):
+        formatter = Formatter(self.load_policy(
+            {'name': 'xyz', 'resource': 'ec2'}).resource_manager.resource_type,
+            include_default_fields=False, extra_fields=['Id=InstanceId', 'Day=day'])
+        records = [
+            {'InstanceId': 'i-1', 'day': '3'},
+            {'InstanceId': 'i-2', 'day': '2'},
+            {'InstanceId': 'i-1', 'day': '1'}]
+        self.assertEqual(
+            list(formatter.iter_csv(iter(records))),
+            [['i-1', '3'], ['i-2', '2']])
+        self.assertEqual(
+            len(list(formatter.iter_csv(iter(records), unique=False))), 3)
+
+
+class FakeS3:
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.fetched = []
+
+    def client(self, service):
+        return self
+
+    def get_paginator(self, op):
+        return self
+
+    def paginate(self, Bucket, Prefix, StartAfter):
+        return [{'Contents': [
+            {'Key': k, 'ETag': etag} for k, (etag, _) in sorted(self.objects.items())
+            if k.startswith(Prefix) and k > StartAfter]}]
+
+    def get_object(self, Bucket, Key):
+        self.fetched.append(Key)
+        return {'Body': io.BytesIO(gzip.compress(
+            json.dumps(self.objects[Key][1]).encode('utf8')))}
+
+
+class RecordSetTest(BaseTest):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(reset_session_cache)
+        self.s3 = FakeS3({
+            'logs/xyz/2021/01/01/00/resources.json.gz': ('"a"', [{'Id': 'old'}]),
+            'logs/xyz/2021/01/02/00/resources.json.gz': ('"b"', [{'Id': 'mid'}]),
+            'logs/xyz/2021/01/03/00/resources.jsonl.gz': ('"c"', [{'Id': 'new'}]),
+            'logs/xyz/2021/01/03/00/other.json.gz': ('"d"', [{'Id': 'skip'}]),
+        })
+
+        def factory():
+            return self.s3
+        factory.region = 'report-test'
+        self.factory = factory
+
+    def get_ids(self, **kw):
+        return [r['Id'] for r in iter_record_set(
+            self.factory, 'bucket', 'logs/xyz', datetime(2021, 1, 1), **kw)]
+
+    def test_record_set_newest_first(self):
+        records = list(iter_record_set(
+            self.factory, 'bucket', 'logs/xyz', datetime(2021, 1, 1), window=1))
+        self.assertEqual([r['Id'] for r in records], ['new', 'mid'])
+        self.assertEqual(records[0]['CustodianDate'], datetime(2021, 1, 3))
+
+    def test_record_set_cache(self):
+        cache_dir = self.get_temp_dir()
+        self.assertEqual(self.get_ids(cache_dir=cache_dir), ['new', 'mid'])
+        self.assertEqual(len(self.s3.fetched), 2)
+
+        # only new or changed objects are fetched on subsequent runs
+        self.s3.objects['logs/xyz/2021/01/02/00/resources.json.gz'] = ('"e"', [{'Id': 'mod'}])
+        self.s3.objects['logs/xyz/2021/01/04/00/resources.json.gz'] = ('"f"', [{'Id': 'next'}])
+        self.assertEqual(self.get_ids(cache_dir=cache_dir), ['next', 'new', 'mod'])
+        self.assertEqual(self.s3.fetched[2:], [
+            'logs/xyz/2021/01/04/00/resources.json.gz',
+            'logs/xyz/2021/01/02/00/resources.json.gz'])
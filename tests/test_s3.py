@@ -16,10 +16,12 @@ from botocore.exceptions import ClientError
 from dateutil.tz import tzutc
 from pytest_terraform import terraform
 
+from c7n.config import Bag
 from c7n.exceptions import PolicyValidationError
 from c7n.executor import MainThreadExecutor
 from c7n.resources import s3
 from c7n.mu import LambdaManager
+from c7n.output import NullBlobOutput
 from c7n.ufuncs import s3crypt
 from c7n.utils import get_account_alias_from_sts
 
@@ -104,6 +106,99 @@ class BucketScanLogTests(TestCase):
             data = json.load(fh)
             self.assertEqual(data, [first_five, next_five, []])
 
+    def test_scan_log_resume(self):
+        first_five = list(range(5))
+        next_five = list(range(5, 10))
+        self.log.__enter__()
+        self.log.add(first_five)
+        self.log.save_checkpoint({"Marker": "key-100"}, 100)
+        # keys logged after the checkpoint are discarded on resume
+        self.log.add(list(range(100, 105)))
+        self.log.fh.close()
+
+        log = s3.BucketScanLog(self.log_dir, "test", resume=True)
+        with log:
+            self.assertTrue(log.checkpoint.pop("Offset"))
+            self.assertEqual(
+                log.checkpoint,
+                {"Bucket": "test", "Marker": {"Marker": "key-100"}, "Count": 100,
+                 "Remediated": 5})
+            self.assertEqual(log.count, 5)
+            log.add(next_five)
+            log.complete()
+
+        with open(log.path) as fh:
+            self.assertEqual(json.load(fh), [first_five, next_five, []])
+        # a completed scan has nothing to resume
+        self.assertFalse(os.path.exists(log.checkpoint_path))
+
+    def test_scan_log_resume_nothing_remediated(self):
+        with self.log:
+            self.log.save_checkpoint({"Marker": "key-100"}, 100)
+        self.assertTrue(os.path.exists(self.log.path))
+
+        log = s3.BucketScanLog(self.log_dir, "test", resume=True)
+        with log:
+            self.assertEqual(log.checkpoint["Marker"], {"Marker": "key-100"})
+            self.assertEqual(log.count, 0)
+            log.save_checkpoint({"Marker": "key-200"}, 200)
+        # an incomplete scan keeps its empty log for the checkpoint
+        with open(log.path) as fh:
+            self.assertEqual(json.load(fh), [[]])
+
+        log = s3.BucketScanLog(self.log_dir, "test", resume=True)
+        with log:
+            self.assertEqual(log.checkpoint["Marker"], {"Marker": "key-200"})
+            log.complete()
+        # which is removed once the scan completes
+        self.assertFalse(os.path.exists(log.path))
+        self.assertFalse(os.path.exists(log.checkpoint_path))
+
+    def test_scan_log_empty(self):
+        with self.log:
+            pass
+        self.assertFalse(os.path.exists(self.log.path))
+
+    def test_scan_log_no_resume(self):
+        self.log.__enter__()
+        self.log.add([1])
+        self.log.save_checkpoint({"Marker": "key-1"}, 1)
+        self.log.fh.close()
+
+        log = s3.BucketScanLog(self.log_dir, "test")
+        with log:
+            self.assertEqual(log.checkpoint, None)
+            log.add([2])
+        with open(log.path) as fh:
+            self.assertEqual(json.load(fh), [[2], []])
+        self.assertFalse(os.path.exists(log.checkpoint_path))
+
+    def test_scan_resume_remote_output(self):
+        action = s3.EncryptExtantKeys(
+            {"type": "encrypt-keys", "resume": True},
+            Bag(data={"name": "s3-encrypt"},
+                ctx=Bag(output=NullBlobOutput(None, {}),
+                        metrics=Bag(put_metric=lambda *args, **kw: None,
+                                    flush=lambda: None))))
+        self.assertTrue(action.resume)
+        with self.assertLogs("custodian.actions", level="WARNING") as logs:
+            self.assertEqual(action.process([]), [])
+        self.assertIn("resume is disabled", logs.output[0])
+        self.assertFalse(action.resume)
+
+    def test_scan_marker(self):
+        action = s3.EncryptExtantKeys({"type": "encrypt-keys"})
+        self.assertEqual(
+            action.get_marker(
+                {"Name": "xyz"},
+                {"Contents": [{"Key": "a"}, {"Key": "b"}], "IsTruncated": True}),
+            {"Marker": "b"})
+        self.assertEqual(
+            action.get_marker(
+                {"Name": "xyz", "Versioning": {"Status": "Enabled"}},
+                {"NextKeyMarker": "b", "NextVersionIdMarker": "v2", "IsTruncated": True}),
+            {"KeyMarker": "b", "VersionIdMarker": "v2"})
+
 
 def destroyBucket(client, bucket):
     for o in client.list_objects(Bucket=bucket).get("Contents", []):
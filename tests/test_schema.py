@@ -1,5 +1,8 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import json
+import os
+
 import mock
 from jsonschema.exceptions import best_match
 
@@ -567,3 +570,64 @@ class SchemaTest(BaseTest):
         self.assertEqual(ElementSchema.doc(F), "")
         self.assertEqual(
             ElementSchema.doc(B), "Hello World\n\nxyz")
+
+    def test_element_validator(self):
+        load_resources(('aws.ec2',))
+        validator = schema.ElementValidator(generate(('aws.ec2',)))
+        valid = {'policies': [{
+            'name': 'ec2-check', 'resource': 'ec2',
+            'filters': [
+                {'tag:App': 'web'}, 'marked-for-op',
+                {'type': 'value', 'key': 'State.Name', 'value': 'running'},
+                {'or': [{'type': 'instance-age', 'days': 3},
+                        {'not': [{'State.Name': 'stopped'}]}]}],
+            'actions': ['stop', {'type': 'mark-for-op', 'op': 'stop', 'days': 3}]}]}
+        self.assertTrue(validator.is_valid(valid))
+
+        full = JsonSchemaValidator(validator.schema)
+        for invalid in (
+                {'type': 'stop', 'bad': 1},
+                'xyz',
+                {'or': [{'type': 'stop'}]},
+                {'type': ['stop']}):
+            data = {'policies': [dict(valid['policies'][0], actions=[invalid])]}
+            self.assertFalse(validator.is_valid(data))
+            self.assertFalse(full.is_valid(data))
+        self.assertFalse(validator.is_valid(
+            {'policies': [dict(valid['policies'][0], resource='aws.sqs')]}))
+        self.assertFalse(validator.is_valid({'policies': [], 'xyz': 1}))
+
+    def test_schema_cache(self):
+        load_resources(('aws.ec2', 'aws.sqs'))
+        cache_dir = self.get_temp_dir()
+        rschema = schema.get_schema(('aws.ec2',), cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        with mock.patch('c7n.schema.generate') as generate_schema:
+            self.assertEqual(
+                schema.get_schema(('aws.ec2',), cache_dir),
+                json.loads(json.dumps(rschema)))
+            self.assertFalse(generate_schema.called)
+
+        self.assertNotEqual(
+            schema.schema_fingerprint(('aws.ec2',)),
+            schema.schema_fingerprint(('aws.sqs',)))
+        schema.get_schema(('aws.sqs',), cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_schema_lazy_elements(self):
+        registry = PluginRegistry('actions')
+        registry.register_lazy('post-item', 'c7n.resources.ssm.PostItem')
+        registry.register_lazy('stop', 'c7n.resources.ec2.Stop')
+        elements = dict(schema.schema_elements(registry))
+        # elements with a recorded schema aren't imported
+        self.assertEqual(list(registry.lazy_paths()), ['post-item'])
+        self.assertIsInstance(elements['post-item'], schema.LazyElement)
+        self.assertEqual(elements['post-item'].type, 'post-item')
+        self.assertTrue(elements['post-item'].schema_alias)
+
+        from c7n.resources.ssm import PostItem
+        self.assertEqual(elements['post-item'].schema, PostItem.schema)
+        self.assertEqual(
+            [e.type for e in ElementSchema.elements(registry, lazy=True)],
+            ['post-item', 'stop'])
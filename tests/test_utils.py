@@ -1,9 +1,12 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import datetime
+import io
 import json
 import ipaddress
 import os
 import tempfile
+import threading
 import time
 
 from botocore.exceptions import ClientError
@@ -517,3 +520,105 @@ def test_parse_date_floor():
     assert utils.parse_date(1) is None
     assert utils.parse_date('3000') is None
     assert utils.parse_date('30') is None
+
+
+class RecordsTest(BaseTest):
+
+    records = [
+        {'InstanceId': 'i-%d' % i, 'LaunchTime': datetime.datetime(2021, 1, 1),
+         'Tags': [{'Key': 'Name', 'Value': 'x' * i}]}
+        for i in range(50)]
+
+    def test_dump_load_records(self):
+        temp_dir = self.get_temp_dir()
+        decoded = json.loads(utils.dumps(self.records))
+        for fmt in ('json', 'json.gz', 'jsonl', 'jsonl.gz'):
+            path = os.path.join(temp_dir, 'resources.%s' % fmt)
+            utils.dump_records(path, self.records)
+            self.assertEqual(list(utils.load_records(path)), decoded)
+
+        path = os.path.join(temp_dir, 'resources.json')
+        with open(path) as fh:
+            self.assertEqual(fh.read(), utils.dumps(self.records, indent=2))
+        with open(os.path.join(temp_dir, 'resources.jsonl')) as fh:
+            self.assertEqual(len(fh.readlines()), 50)
+
+    def test_record_writer(self):
+        temp_dir = self.get_temp_dir()
+        decoded = json.loads(utils.dumps(self.records))
+        for fmt in ('json', 'jsonl.gz'):
+            path = os.path.join(temp_dir, 'resources.%s' % fmt)
+            with self.assertRaises(ValueError):
+                with utils.record_writer(path) as write:
+                    write(self.records[:10])
+                    if fmt == 'json':
+                        self.assertEqual(list(utils.load_records(path)), decoded[:10])
+                    write(self.records[10:20])
+                    raise ValueError()
+            # batches written before an error are kept
+            self.assertEqual(list(utils.load_records(path)), decoded[:20])
+
+        with utils.record_writer(path) as write:
+            pass
+        self.assertEqual(list(utils.load_records(path)), [])
+        with open(os.path.join(temp_dir, 'resources.json')) as fh:
+            self.assertEqual(json.load(fh), decoded[:20])
+
+    def test_iter_records_chunked(self):
+        decoded = json.loads(utils.dumps(self.records))
+        for data in (utils.dumps(self.records, indent=2),
+                     '\n'.join(utils.dumps(r) for r in self.records)):
+            self.assertEqual(
+                list(utils.iter_records(io.StringIO(data), chunk_size=7)), decoded)
+        self.assertEqual(list(utils.iter_records(io.StringIO('[]'))), [])
+        with self.assertRaises(ValueError):
+            list(utils.iter_records(io.StringIO('[{"a": 1}, {"b": '), chunk_size=4))
+
+
+class TagMapTest(BaseTest):
+
+    def test_tag_map(self):
+        r = {'Tags': [
+            {'Key': 'Env', 'Value': 'prod'},
+            {'Key': 'env', 'Value': 'dev'},
+            {'Key': 'Owner', 'Value': 'alice'}]}
+        self.assertEqual(utils.get_tag_map(r), {'Env': 'prod', 'env': 'dev', 'Owner': 'alice'})
+        self.assertEqual(
+            utils.get_tag_map(r, case_sensitive=False), {'env': 'prod', 'owner': 'alice'})
+        self.assertEqual(utils.get_tag_map({}), {})
+        self.assertEqual(utils.get_tag_map({'Tags': None}), {})
+        with self.assertRaises(TypeError):
+            utils.get_tag_map(r)['Env'] = 'qa'
+
+        # mappings are only cached within a tag index scope
+        self.assertIsNot(utils.get_tag_map(r), utils.get_tag_map(r))
+        with utils.tag_index() as index:
+            self.assertIs(utils.get_tag_map(r), utils.get_tag_map(r))
+            self.assertEqual(len(index), 1)
+
+            # the index is per thread
+            maps = []
+            t = threading.Thread(target=lambda: maps.append(utils.get_tag_map(r)))
+            t.start()
+            t.join()
+            self.assertIsNot(maps[0], utils.get_tag_map(r))
+            self.assertEqual(len(index), 1)
+        self.assertIsNone(utils.TAG_INDEX.index)
+
+    def test_tag_map_invalidation(self):
+        r = {'Tags': [{'Key': 'Env', 'Value': 'prod'}]}
+        with utils.tag_index():
+            self.assertEqual(utils.get_tag_map(r)['Env'], 'prod')
+
+            # appends and replacement are detected
+            r['Tags'].append({'Key': 'App', 'Value': 'web'})
+            self.assertEqual(utils.get_tag_map(r)['App'], 'web')
+            r['Tags'] = [{'Key': 'Env', 'Value': 'dev'}]
+            self.assertEqual(utils.get_tag_map(r), {'Env': 'dev'})
+
+            # other in place modifications need explicit invalidation
+            r['Tags'][0]['Value'] = 'qa'
+            self.assertEqual(utils.get_tag_map(r), {'Env': 'dev'})
+            utils.invalidate_tag_map([r])
+            self.assertEqual(utils.get_tag_map(r), {'Env': 'qa'})
+            self.assertEqual(utils.get_tag_map(r, case_sensitive=False), {'env': 'qa'})
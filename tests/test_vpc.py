@@ -713,6 +713,18 @@ class TransitGatewayTest(BaseTest):
         self.assertEqual(len(resources), 1)
         self.assertEqual(resources[0]['ResourceId'], 'vpc-f1516b97')
 
+    def test_tgw_attachment_parent_params(self):
+        from c7n.resources.vpc import TransitGatewayAttachmentQuery
+        q = TransitGatewayAttachmentQuery(None, None)
+        params = {'Filters': [{'Name': 'state', 'Values': ['available']}]}
+        merged = q.get_parent_parameters(params, 'tgw-1', 'transit-gateway-id')
+        q.get_parent_parameters(params, 'tgw-2', 'transit-gateway-id')
+        self.assertEqual(
+            merged['Filters'],
+            [{'Name': 'state', 'Values': ['available']},
+             {'Name': 'transit-gateway-id', 'Values': ['tgw-1']}])
+        self.assertEqual(len(params['Filters']), 1)
+
 
 class NetworkInterfaceTest(BaseTest):
 
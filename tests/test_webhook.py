@@ -4,15 +4,24 @@
 import datetime
 import json
 import mock
+import threading
+import urllib3
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
+from c7n import utils
 from c7n.actions.webhook import Webhook
 from c7n.exceptions import PolicyValidationError
+from c7n.executor import MainThreadExecutor
 from .common import BaseTest
 import os
 
 
 class WebhookTest(BaseTest):
 
+    def setUp(self):
+        super().setUp()
+        self.patch(Webhook, 'executor_factory', MainThreadExecutor)
+
     def test_valid_policy(self):
         policy = {
             "name": "webhook-batch",
@@ -291,6 +300,56 @@ class WebhookTest(BaseTest):
             self.assertEqual(1, proxy_request_mock.call_count)
             self.assertEqual(0, pool_request_mock.call_count)
 
+    def test_process_retries(self):
+        statuses = [503, 429, 200, 404]
+        requests = []
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                requests.append(self.path)
+                self.rfile.read(int(self.headers['Content-Length']))
+                self.send_response(statuses.pop(0))
+                self.send_header('Retry-After', '0')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.addCleanup(server.server_close)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+        self.patch(utils, 'get_proxy_url', lambda url: None)
+
+        url = 'http://127.0.0.1:%d/hook' % server.server_address[1]
+        wh = Webhook(
+            data={'url': url, 'body': 'resource', 'retries': 2, 'retry-delay': 0},
+            manager=self._get_manager())
+        calls = wh.process([{'name': 'test1'}, {'name': 'test2'}])
+
+        self.assertEqual(requests, ['/hook'] * 4)
+        self.assertEqual(
+            [(c['url'], c['status'], c['retries']) for c in calls],
+            [(url, 200, 2), (url, 404, 0)])
+        self.assertTrue(all(c['latency'] >= 0 for c in calls))
+
+    def test_read_retries_idempotent_only(self):
+        for method, retried in (('POST', False), ('PATCH', False), ('PUT', True)):
+            wh = Webhook(
+                data={'url': 'http://foo.com', 'method': method},
+                manager=self._get_manager())
+            retry = wh._build_retry()
+            error = urllib3.exceptions.ReadTimeoutError(None, 'http://foo.com', 'timed out')
+            if retried:
+                self.assertEqual(retry.increment(method, 'http://foo.com', error=error).total, 2)
+            else:
+                with self.assertRaises(urllib3.exceptions.MaxRetryError):
+                    retry.increment(method, 'http://foo.com', error=error)
+            # throttled calls are still retried
+            self.assertTrue(retry.is_retry(method, 429, has_retry_after=True))
+
     def _get_manager(self):
         """The tests don't require real resource data
         or recordings, but they do need a valid manager with
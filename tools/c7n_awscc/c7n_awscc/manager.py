@@ -1,3 +1,4 @@
+import copy
 import json
 from pathlib import Path
 
@@ -24,12 +25,19 @@ def get_index():
     return _IndexData
 
 
-def initialize_resource(resource_name):
-    """Load a resource class from its name"""
+def get_resource_data(resource_name):
+    """Load a resource type's schema"""
     rpath = Path(__file__).parent / "data" / f"aws_{resource_name}.json"
     if not rpath.exists():
         return None
-    rinfo = json.loads(rpath.read_text())
+    return json.loads(rpath.read_text())
+
+
+def initialize_resource(resource_name):
+    """Load a resource class from its name"""
+    rinfo = get_resource_data(resource_name)
+    if rinfo is None:
+        return None
 
     type_info = type(
         "resource_type",
@@ -105,14 +113,17 @@ def get_update_schema(schema, rname):
     read_only = {s.rsplit("/", 1)[-1] for s in schema.get("readOnlyProperties", ())}
 
     updatable = prop_names - (create_only | read_only)
-    update_schema = {
-        "additionalProperties": False,
-        "properties": {u: schema["properties"][u] for u in updatable},
-    }
+    # copied as refs are rewritten in place, leaving the resource's schema intact
+    update_schema = copy.deepcopy(
+        {
+            "additionalProperties": False,
+            "properties": {u: schema["properties"][u] for u in updatable},
+        }
+    )
     update_schema["properties"]["type"] = {"enum": ["update"]}
 
     if "definitions" in schema:
-        update_schema["definitions"] = dict(schema["definitions"])
+        update_schema["definitions"] = copy.deepcopy(schema["definitions"])
         update_refs(update_schema, rname)
 
     return update_schema
@@ -1,3 +1,4 @@
+import collections
 import json
 import logging
 
@@ -6,7 +7,7 @@ from botocore.paginate import Paginator
 import jmespath
 
 from c7n.query import RetryPageIterator
-from c7n.utils import local_session
+from c7n.utils import get_retry, local_session
 
 
 log = logging.getLogger("c7n_awscc.query")
@@ -17,6 +18,18 @@ class CloudControl:
     resources_expr = jmespath.compile("ResourceDescriptions[].Properties")
     ids_expr = jmespath.compile("ResourceDescriptions[].Identifier")
 
+    # concurrent get_resource calls when augmenting
+    max_workers = 5
+    retry = staticmethod(
+        get_retry(
+            (
+                "ThrottlingException",
+                "ServiceInternalErrorException",
+                "NetworkFailureException",
+            )
+        )
+    )
+
     def __init__(self, manager):
         self.manager = manager
 
@@ -45,30 +58,48 @@ class CloudControl:
     def resources(self, query):
         client = local_session(self.manager.session_factory).client("cloudcontrol")
         p = self._get_resource_paginator(client)
+        pages = p.paginate(TypeName=self.manager.resource_type.cfn_type)
 
-        augment = bool(self.get_rl_perm_delta())
-        results = p.paginate(
-            TypeName=self.manager.resource_type.cfn_type
-        ).build_full_result()
-        if not augment:
+        if not self.get_rl_perm_delta():
             # properties are serialized json, in json.. yo dawg :/
-            results = list(map(json.loads, self.resources_expr.search(results)))
-            return results
-        else:
-            return self.get_resources(self.ids_expr.search(results))
+            return [
+                json.loads(r)
+                for page in pages
+                for r in self.resources_expr.search(page) or ()
+            ]
+        # fetch the listed resources while paging through the rest
+        return self.get_resources(
+            i for page in pages for i in self.ids_expr.search(page) or ()
+        )
 
     def get_resources(self, ids, cache=True):
+        """Fetch resources by identifier, with bounded concurrency.
+
+        Results are in order of the given identifiers, resources that
+        can't be fetched are skipped.
+        """
         client = local_session(self.manager.session_factory).client("cloudcontrol")
         resources = []
-        for i in ids:
-            try:
-                r = client.get_resource(
-                    TypeName=self.manager.resource_type.cfn_type, Identifier=i
-                )["ResourceDescription"]["Properties"]
-                resources.append(json.loads(r))
-            except ClientError:
-                continue
-        return resources
+        with self.manager.executor_factory(max_workers=self.max_workers) as w:
+            pending = collections.deque()
+            for i in ids:
+                pending.append(w.submit(self._get_resource, client, i))
+                if len(pending) >= self.max_workers * 2:
+                    resources.append(pending.popleft().result())
+            resources.extend(f.result() for f in pending)
+        return [r for r in resources if r is not None]
+
+    def _get_resource(self, client, identifier):
+        try:
+            r = self.retry(
+                client.get_resource,
+                TypeName=self.manager.resource_type.cfn_type,
+                Identifier=identifier,
+            )
+        except ClientError as e:
+            log.debug("cloud control get %s failed %s", identifier, e)
+            return None
+        return json.loads(r["ResourceDescription"]["Properties"])
 
     def get_rl_perm_delta(self):
         lperms = set(
@@ -85,8 +116,9 @@ class CloudControl:
         remainder = rperms.difference(lperms)
         if not remainder or len(remainder) < 2:
             return False
-        print(
-            f"cloud control {self.manager.type} forces augment {remainder} {lperms} {rperms}"
+        log.debug(
+            "cloud control %s forces augment %s %s %s",
+            self.manager.type, remainder, lperms, rperms
         )
         return remainder
 
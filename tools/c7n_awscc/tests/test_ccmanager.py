@@ -1,4 +1,6 @@
-from c7n_awscc.manager import initialize_resource, get_update_schema
+import json
+
+from c7n_awscc.manager import get_resource_data, initialize_resource, get_update_schema
 
 
 def test_init_resource_access_analyzer():
@@ -18,3 +20,11 @@ def test_update_schema():
         "Logging",
         "type",
     }
+
+
+def test_update_schema_leaves_schema_intact():
+    klass = initialize_resource("eks_cluster")["EksCluster"]
+    assert get_resource_data("eks_cluster") == klass.schema
+    schema = json.dumps(klass.schema, sort_keys=True)
+    get_update_schema(klass.schema, "eks_cluster")
+    assert json.dumps(klass.schema, sort_keys=True) == schema
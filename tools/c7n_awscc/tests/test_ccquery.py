@@ -0,0 +1,40 @@
+import json
+
+from botocore.exceptions import ClientError
+
+from c7n.executor import MainThreadExecutor
+from c7n_awscc.query import CloudControl
+
+
+class Client:
+    def __init__(self, errors):
+        self.errors = errors
+        self.calls = []
+
+    def client(self, service_name):
+        return self
+
+    def get_resource(self, TypeName, Identifier):
+        self.calls.append(Identifier)
+        code = self.errors.get(Identifier) and self.errors[Identifier].pop(0)
+        if code:
+            raise ClientError({"Error": {"Code": code}}, "GetResource")
+        return {
+            "ResourceDescription": {"Properties": json.dumps({"Name": Identifier})}
+        }
+
+
+def test_get_resources(test_awscc, monkeypatch):
+    p = test_awscc.load_policy({"name": "logs", "resource": "awscc.logs_loggroup"})
+    source = p.resource_manager.get_source("describe")
+    client = Client(
+        {"b": ["ThrottlingException"], "c": ["ResourceNotFoundException"]}
+    )
+    monkeypatch.setattr("c7n_awscc.query.local_session", lambda factory: client)
+    monkeypatch.setattr(p.resource_manager, "executor_factory", MainThreadExecutor)
+    monkeypatch.setattr(CloudControl, "max_workers", 1)
+    monkeypatch.setattr("c7n.utils.time.sleep", lambda delay: None)
+
+    resources = source.get_resources(iter("abcd"))
+    assert [r["Name"] for r in resources] == ["a", "b", "d"]
+    assert client.calls == ["a", "b", "b", "c", "d"]
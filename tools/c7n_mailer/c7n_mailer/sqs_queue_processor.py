@@ -124,6 +124,13 @@ class MailerSqsQueueProcessor:
         self.logger.info('No sqs_messages left on the queue, exiting c7n_mailer.')
         return
 
+    def get_payload(self, url):
+        """Fetch a message offloaded to s3 for exceeding the transport's size limit."""
+        bucket, key = url[len('s3://'):].split('/', 1)
+        self.logger.debug("Fetching message payload from %s", url)
+        result = self.session.client('s3').get_object(Bucket=bucket, Key=key)
+        return json.loads(zlib.decompress(result['Body'].read()))
+
     # This function when processing sqs messages will only deliver messages over email or sns
     # If you explicitly declare which tags are aws_usernames (synonymous with ldap uids)
     # in the ldap_uid_tags section of your mailer.yml, we'll do a lookup of those emails
@@ -135,6 +142,8 @@ class MailerSqsQueueProcessor:
         except ValueError:
             pass
         sqs_message = json.loads(zlib.decompress(base64.b64decode(body)))
+        if 'payload' in sqs_message:
+            sqs_message = self.get_payload(sqs_message['payload'])
 
         self.logger.debug("Got account:%s message:%s %s:%d policy:%s recipients:%s" % (
             sqs_message.get('account', 'na'),
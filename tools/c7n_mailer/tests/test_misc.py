@@ -2,8 +2,12 @@
 # SPDX-License-Identifier: Apache-2.0
 # -*- coding: utf-8 -*-
 import argparse
+import io
+import json
 import unittest
 import logging
+import zlib
+
 import boto3
 
 from c7n_mailer import replay
@@ -49,6 +53,23 @@ class AWSMailerTests(unittest.TestCase):
         self.assertIs(mailer_sqs_queue_processor.__class__,
         sqs_queue_processor.MailerSqsQueueProcessor)
 
+    def test_sqs_queue_processor_payload(self):
+        payload = {'policy': {'name': 'big'}, 'resources': [{'Id': 'r-1'}]}
+
+        class S3:
+            def get_object(self, Bucket, Key):
+                assert (Bucket, Key) == ('bucket', 'notify/big/abc.json.zlib')
+                return {'Body': io.BytesIO(zlib.compress(json.dumps(payload).encode('utf8')))}
+
+        class Session:
+            def client(self, service):
+                return S3()
+
+        processor = sqs_queue_processor.MailerSqsQueueProcessor(
+            MAILER_CONFIG, Session(), logging.getLogger('c7n_mailer'))
+        self.assertEqual(
+            processor.get_payload('s3://bucket/notify/big/abc.json.zlib'), payload)
+
     def test_cli_run(self):
         # Generate loggers and make sure they have the right class, for codecov
         self.assertEqual(cli.get_logger().__class__, logging.Logger)
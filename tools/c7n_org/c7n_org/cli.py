@@ -656,12 +656,18 @@ def run_account(account, region, policies_config, output_path,
 @click.option("--metrics", default=False, is_flag=True)
 @click.option("--metrics-uri", default=None, help="Configure provider metrics target")
 @click.option("--dryrun", default=False, is_flag=True)
+@click.option('--rate-limit-dir', default=None, type=click.Path(),
+              help="Share api rate limits across workers via files in this directory")
 @click.option('--debug', default=False, is_flag=True)
 @click.option('-v', '--verbose', default=False, help="Verbose", is_flag=True)
 def run(config, use, output_dir, accounts, tags, region,
         policy, policy_tags, cache_period, cache_path, metrics,
-        dryrun, debug, verbose, metrics_uri):
+        dryrun, debug, verbose, metrics_uri, rate_limit_dir):
     """run a custodian policy across accounts"""
+    if rate_limit_dir:
+        # inherited by worker processes
+        os.environ['C7N_RATE_LIMIT_DIR'] = os.path.abspath(
+            os.path.expanduser(rate_limit_dir))
     accounts_config, custodian_config, executor = init(
         config, use, debug, verbose, accounts, tags, policy, policy_tags=policy_tags)
     policy_counts = Counter()
@@ -0,0 +1,201 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""Micro-benchmarks for performance sensitive code paths.
+
+These run entirely in process against synthetic data, ie.
+
+  python tools/dev/benchmark.py value-filter --count 100000
+"""
+import random
+import subprocess
+import sys
+import time
+
+import click
+
+
+def timed(func, *args):
+    t = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - t
+
+
+def report(label, count, elapsed, baseline=None):
+    msg = "%-24s %8.3fs %8.2fus/resource" % (label, elapsed, elapsed / count * 1e6)
+    if baseline:
+        msg += "  %.1fx" % (baseline / elapsed)
+    click.echo(msg)
+
+
+@click.group()
+def cli():
+    """custodian micro-benchmarks"""
+
+
+@cli.command('value-filter')
+@click.option('--count', default=100000, help="number of synthetic resources")
+def value_filter(count):
+    """compiled vs generic value filter matching."""
+    from c7n.filters.core import ValueFilter
+
+    resources = [{
+        'InstanceId': 'i-%012d' % i,
+        'State': {'Name': random.choice(('running', 'stopped'))},
+        'InstanceType': random.choice(('m5.large', 't3.micro', 'c5.xlarge')),
+        'Tags': [{'Key': 'Key%d' % k, 'Value': 'value-%d' % k} for k in range(10)] + [
+            {'Key': 'Env', 'Value': random.choice(('prod', 'dev', 'staging'))}]}
+        for i in range(count)]
+
+    specs = {
+        'regex': {'key': 'tag:Env', 'value': '^prod', 'op': 'regex'},
+        'in': {'key': 'InstanceType', 'op': 'in',
+               'value': ['m5.large', 'm5.xlarge', 'c5.large', 'c5.xlarge']},
+        'value_regex': {'key': 'InstanceId', 'value_regex': 'i-0*([1-9][0-9]*)',
+                        'value_type': 'integer', 'op': 'gt', 'value': 100},
+        'jmespath': {'key': 'State.Name', 'value': 'running'},
+        'date': {'key': 'tag:Key1', 'value_type': 'date', 'op': 'gt',
+                 'value': '2020-01-01'},
+    }
+    for name, spec in specs.items():
+        spec['type'] = 'value'
+        f = ValueFilter(spec)
+        f.match(resources[0])
+        generic = timed(lambda: [f.match_value(r) for r in resources])
+        compiled = timed(lambda: [f.matcher(r) for r in resources])
+        report('%s generic' % name, count, generic)
+        report('%s compiled' % name, count, compiled, generic)
+
+
+@cli.command('offhours')
+@click.option('--count', default=50000, help="number of synthetic resources")
+@click.option('--schedules', default=30, help="number of distinct schedule tag values")
+def offhours(count, schedules):
+    """memoized vs per resource offhours schedule resolution."""
+    from dateutil import tz as tzutil
+    from c7n.filters.offhours import OffHour
+
+    class Unmemoized(OffHour):
+
+        def resolve_schedule(self, value, time_type):
+            self.schedules.clear()
+            self.parser.cache.clear()
+            schedule, _ = super().resolve_schedule(value, time_type)
+            return schedule, schedule and tzutil.gettz(
+                self.TZ_ALIASES.get(schedule['tz'], schedule['tz']))
+
+        def process_resource_schedule(self, i, value, time_type):
+            self.skip_days = None
+            return super().process_resource_schedule(i, value, time_type)
+
+    values = ['off=(m-f,%d);on=(m-f,%d);tz=%s' % (
+        17 + i % 6, 6 + i % 4, random.choice(('pt', 'et', 'ct', 'utc', 'cet')))
+        for i in range(schedules)]
+    resources = [{
+        'InstanceId': 'i-%012d' % i,
+        'Tags': [{'Key': 'Name', 'Value': 'instance-%d' % i},
+                 {'Key': 'maid_offhours', 'Value': random.choice(values)}]}
+        for i in range(count)]
+
+    data = {'default_tz': 'et', 'skip-days': ['2020-12-25', '2021-01-01']}
+    baseline = timed(Unmemoized(data).process, resources)
+    memoized = timed(OffHour(data).process, resources)
+    report('offhours unmemoized', count, baseline)
+    report('offhours memoized', count, memoized, baseline)
+
+
+@cli.command('arn-resolve')
+@click.option('--count', default=100000, help="number of synthetic arns")
+def arn_resolve(count):
+    """linear scan vs indexed arn resource type resolution."""
+    from c7n.resources import load_resources
+    from c7n.resources.aws import AWS, Arn, ArnResolver
+
+    def linear_resolve_type(arn):
+        arn = Arn.parse(arn)
+        for type_name, klass in AWS.resources.items():
+            if type_name in ('rest-account', 'account') or klass.resource_type.arn is False:
+                continue
+            if arn.service != (klass.resource_type.arn_service or klass.resource_type.service):
+                continue
+            if (type_name in ('asg', 'ecs-task') and
+                    "%s%s" % (klass.resource_type.arn_type, klass.resource_type.arn_separator)
+                    in arn.resource_type):
+                return type_name
+            elif (klass.resource_type.arn_type is not None and
+                    klass.resource_type.arn_type == arn.resource_type):
+                return type_name
+            elif (klass.resource_type.arn_service == arn.service and
+                    klass.resource_type.arn_type == ""):
+                return type_name
+
+    load_resources(('aws.*',))
+    templates = (
+        'arn:aws:ec2:us-east-1:123456789012:instance/i-%012d',
+        'arn:aws:ec2:us-east-1:123456789012:volume/vol-%012d',
+        'arn:aws:lambda:us-east-1:123456789012:function:func-%d',
+        'arn:aws:sqs:us-east-1:123456789012:queue-%d',
+        'arn:aws:sns:us-east-1:123456789012:topic-%d',
+        'arn:aws:dynamodb:us-east-1:123456789012:table/table-%d',
+        'arn:aws:logs:us-east-1:123456789012:log-group:group-%d',
+        'arn:aws:elasticache:us-east-1:123456789012:cluster:cache-%d',
+        'arn:aws:ecs:us-east-1:123456789012:task/cluster/%d',
+        'arn:aws:kms:us-east-1:123456789012:key/key-%d',
+    )
+    arns = [Arn.parse(random.choice(templates) % i) for i in range(count)]
+
+    baseline = timed(lambda: [linear_resolve_type(a) for a in arns])
+    indexed = timed(lambda: [ArnResolver.resolve_type(a) for a in arns])
+    report('arn resolve linear', count, baseline)
+    report('arn resolve indexed', count, indexed, baseline)
+
+
+@cli.command('schema-validate')
+@click.option('--count', default=200, help="number of synthetic policies")
+def schema_validate(count):
+    """generic jsonschema vs type dispatched policy validation."""
+    from c7n.resources import load_resources
+    from c7n.schema import ElementValidator, JsonSchemaValidator, generate
+
+    load_resources(('aws.ec2',))
+    rschema = generate(('aws.ec2',))
+    data = {'policies': [{
+        'name': 'ec2-%d' % i, 'resource': 'aws.ec2',
+        'filters': [
+            {'tag:App': 'web'}, 'marked-for-op',
+            {'type': 'value', 'key': 'State.Name', 'value': 'running'},
+            {'or': [{'type': 'instance-age', 'days': 3}, {'type': 'ebs', 'key': 'Encrypted',
+                                                          'value': False}]}],
+        'actions': ['stop', {'type': 'mark-for-op', 'op': 'stop', 'days': 3}]}
+        for i in range(count)]}
+
+    baseline = timed(lambda: JsonSchemaValidator(rschema).is_valid(data))
+    dispatched = timed(lambda: ElementValidator(rschema).is_valid(data))
+    report('schema generic', count, baseline)
+    report('schema dispatched', count, dispatched, baseline)
+
+
+ENTRY_POINTS = {
+    'cli': 'import c7n.cli',
+    'lambda handler': 'import c7n.handler',
+    'load aws.ec2': "from c7n.resources import load_resources; load_resources(('aws.ec2',))",
+    'load aws.*': "from c7n.resources import load_resources; load_resources(('aws.*',))",
+}
+
+
+@cli.command('import-time')
+@click.option('--runs', default=5, help="fresh interpreters per entry point")
+def import_time(runs):
+    """import time of common entry points, best of runs."""
+    for label, stmt in ENTRY_POINTS.items():
+        timings = []
+        for i in range(runs):
+            output = subprocess.check_output([
+                sys.executable, '-c',
+                'import time; t = time.perf_counter(); %s; '
+                'print(time.perf_counter() - t)' % stmt])
+            timings.append(float(output))
+        click.echo("%-24s %8.3fs" % (label, min(timings)))
+
+
+if __name__ == '__main__':
+    cli()
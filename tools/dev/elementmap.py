@@ -0,0 +1,136 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Generate the aws element map.
+
+Some aws modules register filters, actions and execution modes across
+all resource types. Rather than importing them whenever the aws provider
+loads, their registrations are recorded here so they can be registered
+lazily by class path, see c7n.resources.register_element_map. Their
+schemas are recorded too, so schema generation doesn't import them.
+
+  python tools/dev/elementmap.py -o c7n/resources/element_map.py
+"""
+import importlib
+import json
+
+import click
+
+LAZY_MODULES = (
+    'c7n.resources.securityhub',
+    'c7n.resources.sfn',
+    'c7n.resources.ssm',
+)
+
+HEADER = '''\
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+# Generated via tools/dev/elementmap.py
+'''
+
+
+def lazy_elements(resource_class):
+    """Elements registered on a resource by one of the lazy modules."""
+    elements, overrides = {}, set()
+    for kind, registry in (('filters', resource_class.filter_registry),
+                           ('actions', resource_class.action_registry)):
+        for name, path in registry.paths().items():
+            module = path.rsplit('.', 1)[0]
+            if module in LAZY_MODULES and module != resource_class.__module__:
+                elements['%s.%s' % (kind, name)] = path
+            else:
+                overrides.add('%s.%s' % (kind, name))
+    return elements, overrides
+
+
+def common(resources):
+    """Elements every resource has, unless defining its own of the same name."""
+    found = {}
+    for elements, _ in resources.values():
+        found.update(elements)
+    return {
+        k: v for k, v in sorted(found.items())
+        if all(elements.get(k) == v or k in overrides
+               for elements, overrides in resources.values())}
+
+
+def generate():
+    # import the lazy modules before any resources, so their subscribers
+    # register classes rather than the existing element map's paths.
+    for m in LAZY_MODULES:
+        importlib.import_module(m)
+
+    from c7n.policy import execution
+    from c7n.resources import load_resources
+    from c7n.resources.aws import AWS
+
+    load_resources(('aws.*',))
+    resources = {
+        'aws.%s' % type_name: lazy_elements(klass)
+        for type_name, klass in sorted(AWS.resources.items())}
+    with_arn = {
+        k: v for k, v in resources.items()
+        if AWS.resources[k.split('.', 1)[1]].has_arn()}
+
+    element_map = {
+        'modes': {
+            k: v for k, v in sorted(execution.paths().items())
+            if v.rsplit('.', 1)[0] in LAZY_MODULES},
+        '*': common(resources)}
+    element_map['arn'] = {
+        k: v for k, v in common(with_arn).items() if k not in element_map['*']}
+
+    for rtype, (elements, _) in resources.items():
+        remainder = {
+            k: v for k, v in elements.items()
+            if k not in element_map['*'] and (
+                rtype not in with_arn or k not in element_map['arn'])}
+        if remainder:
+            element_map[rtype] = remainder
+    return element_map
+
+
+def element_schemas(element_map):
+    """The schema of each element class in the map, by class path."""
+    schemas = {}
+    for group in element_map.values():
+        for path in group.values():
+            module_name, class_name = path.rsplit('.', 1)
+            klass = getattr(importlib.import_module(module_name), class_name)
+            schemas[path] = {
+                'schema': klass.schema,
+                'schema_alias': bool(getattr(klass, 'schema_alias', False))}
+    return dict(sorted(schemas.items()))
+
+
+def literal(value, indent=0):
+    """Format a value as a python literal, indented like json."""
+    pad = ' ' * (indent + 4)
+    if isinstance(value, dict) and value:
+        return '{\n%s\n%s}' % (',\n'.join(
+            '%s%r: %s' % (pad, k, literal(v, indent + 4)) for k, v in value.items()),
+            ' ' * indent)
+    if isinstance(value, (list, tuple)) and value:
+        return '[\n%s\n%s]' % (',\n'.join(
+            '%s%s' % (pad, literal(v, indent + 4)) for v in value), ' ' * indent)
+    if isinstance(value, (list, tuple)):
+        return '[]'
+    return repr(value)
+
+
+@click.command()
+@click.option('-o', '--output', type=click.File('w'), default='-')
+def main(output):
+    """generate the aws element map"""
+    element_map = generate()
+    output.write(HEADER)
+    output.write('ElementMap = ')
+    output.write(json.dumps(element_map, indent=4))
+    output.write('\n\n')
+    output.write('ElementSchemas = ')
+    output.write(literal(element_schemas(element_map)))
+    output.write('\n')
+
+
+if __name__ == '__main__':
+    main()